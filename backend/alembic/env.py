@@ -16,9 +16,12 @@ ssl_context.check_hostname = False
 ssl_context.verify_mode = ssl.CERT_NONE
 
 # Import all models for Alembic to detect
-from app.models.reservation import Reservation  # noqa: F401
+from app.models.reservation import Reservation, ReservationSeat  # noqa: F401
 from app.models.restaurant import Restaurant, Seat  # noqa: F401
+from app.models.sales import DailySales  # noqa: F401
 from app.models.user import User  # noqa: F401
+from app.models.waitlist import WaitlistEntry  # noqa: F401
+from app.models.webhook import WebhookEvent  # noqa: F401
 
 config = context.config
 
@@ -27,6 +30,14 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+# モデルに宣言せず、マイグレーションでのみ管理するインデックス
+# （pg_trgm が使えるサーバーにだけ作成するため、autogenerate の比較から除外する）
+MIGRATION_ONLY_INDEXES = {"ix_restaurants_search_document_trgm"}
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    return not (type_ == "index" and name in MIGRATION_ONLY_INDEXES)
+
 
 def get_url():
     return settings.DATABASE_URL
@@ -37,6 +48,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -46,7 +58,9 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection, target_metadata=target_metadata, include_object=include_object
+    )
 
     with context.begin_transaction():
         context.run_migrations()
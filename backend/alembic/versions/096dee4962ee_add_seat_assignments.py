@@ -0,0 +1,47 @@
+"""Add seat combine groups and reservation seat assignments
+
+Revision ID: 096dee4962ee
+Revises: 1488c6ec9df5
+Create Date: 2026-10-18 04:11:10.143796
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '096dee4962ee'
+down_revision: Union[str, None] = '1488c6ec9df5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('reservation_seats',
+    sa.Column('reservation_id', sa.String(length=36), nullable=False),
+    sa.Column('seat_id', sa.String(length=36), nullable=False),
+    sa.Column('restaurant_id', sa.String(length=36), nullable=False),
+    sa.Column('reservation_date', sa.Date(), nullable=False),
+    sa.Column('reservation_time', sa.Time(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+              nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+              nullable=False),
+    sa.ForeignKeyConstraint(['reservation_id'], ['reservations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.ForeignKeyConstraint(['seat_id'], ['seats.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('reservation_id', 'seat_id'),
+    sa.UniqueConstraint('seat_id', 'reservation_date', 'reservation_time',
+                        name='uq_reservation_seats_seat_slot')
+    )
+    op.create_index('ix_reservation_seats_slot', 'reservation_seats',
+                    ['restaurant_id', 'reservation_date', 'reservation_time'], unique=False)
+    op.add_column('seats', sa.Column('combine_group', sa.String(length=50), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('seats', 'combine_group')
+    op.drop_index('ix_reservation_seats_slot', table_name='reservation_seats')
+    op.drop_table('reservation_seats')
@@ -0,0 +1,28 @@
+"""Add index for auto-completing past confirmed reservations
+
+Revision ID: 1488c6ec9df5
+Revises: feb2cd5ed4b0
+Create Date: 2026-10-18 04:04:35.381187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1488c6ec9df5'
+down_revision: Union[str, None] = 'feb2cd5ed4b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_reservations_confirmed_date', 'reservations', ['reservation_date'],
+                    unique=False, postgresql_where=sa.text("status = 'confirmed'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservations_confirmed_date', table_name='reservations',
+                  postgresql_where=sa.text("status = 'confirmed'"))
@@ -0,0 +1,55 @@
+"""Add waitlist entries
+
+Revision ID: 1f5560b08147
+Revises: 371db4b6042a
+Create Date: 2026-10-18 04:21:11.090426
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1f5560b08147'
+down_revision: Union[str, None] = '371db4b6042a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('waitlist_entries',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('customer_id', sa.String(length=36), nullable=False),
+    sa.Column('restaurant_id', sa.String(length=36), nullable=False),
+    sa.Column('reservation_date', sa.Date(), nullable=False),
+    sa.Column('reservation_time', sa.Time(), nullable=False),
+    sa.Column('party_size', sa.Integer(), nullable=False),
+    sa.Column('payment_method', sa.String(length=20), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('notes', sa.String(length=500), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('reservation_id', sa.String(length=36), nullable=True),
+    sa.Column('promoted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+              nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+              nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['reservation_id'], ['reservations.id'], ),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_waitlist_entries_customer', 'waitlist_entries',
+                    ['customer_id', sa.literal_column('created_at DESC')], unique=False)
+    op.create_index('ix_waitlist_entries_waiting', 'waitlist_entries',
+                    ['restaurant_id', 'reservation_date', 'reservation_time', 'created_at'],
+                    unique=False, postgresql_where=sa.text("status = 'waiting'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_waitlist_entries_waiting', table_name='waitlist_entries',
+                  postgresql_where=sa.text("status = 'waiting'"))
+    op.drop_index('ix_waitlist_entries_customer', table_name='waitlist_entries')
+    op.drop_table('waitlist_entries')
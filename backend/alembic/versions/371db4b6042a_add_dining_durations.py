@@ -0,0 +1,47 @@
+"""Add dining durations to restaurants and reservations
+
+Revision ID: 371db4b6042a
+Revises: 096dee4962ee
+Create Date: 2026-10-18 04:16:55.160491
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '371db4b6042a'
+down_revision: Union[str, None] = '096dee4962ee'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('reservations',
+                  sa.Column('duration_minutes', sa.Integer(), server_default=sa.text('120'),
+                            nullable=False))
+    op.add_column('restaurants', sa.Column('dining_duration_minutes', sa.Integer(), nullable=True))
+    # 空席確認で利用時間帯を読むため、利用時間もインデックスに含める
+    op.drop_index('ix_reservations_active_slot', table_name='reservations')
+    op.create_index(
+        'ix_reservations_active_slot',
+        'reservations',
+        ['restaurant_id', 'reservation_date', 'reservation_time'],
+        postgresql_include=['party_size', 'amount', 'payment_method', 'duration_minutes'],
+        postgresql_where=sa.text("status <> 'cancelled'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservations_active_slot', table_name='reservations')
+    op.create_index(
+        'ix_reservations_active_slot',
+        'reservations',
+        ['restaurant_id', 'reservation_date', 'reservation_time'],
+        postgresql_include=['party_size', 'amount', 'payment_method'],
+        postgresql_where=sa.text("status <> 'cancelled'"),
+    )
+    op.drop_column('restaurants', 'dining_duration_minutes')
+    op.drop_column('reservations', 'duration_minutes')
@@ -0,0 +1,59 @@
+"""Add indexes for reservation hot paths
+
+Revision ID: 8b4e2a6c1d57
+Revises: aba931ae7bad
+Create Date: 2026-01-15 14:03:52.117406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b4e2a6c1d57'
+down_revision: Union[str, None] = 'aba931ae7bad'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 空席確認・売上集計: キャンセル以外の予約を店舗・日時で絞り込む
+    op.create_index(
+        'ix_reservations_active_slot',
+        'reservations',
+        ['restaurant_id', 'reservation_date', 'reservation_time'],
+        postgresql_include=['party_size', 'amount', 'payment_method'],
+        postgresql_where=sa.text("status <> 'cancelled'"),
+    )
+    # 店舗の予約一覧
+    op.create_index(
+        'ix_reservations_restaurant_date',
+        'reservations',
+        ['restaurant_id', sa.text('reservation_date DESC'), 'reservation_time'],
+    )
+    # 顧客の予約一覧
+    op.create_index(
+        'ix_reservations_customer_date',
+        'reservations',
+        ['customer_id', sa.text('reservation_date DESC')],
+    )
+    # Webhookでの決済確認
+    op.create_index(
+        'ix_reservations_stripe_payment_intent_id',
+        'reservations',
+        ['stripe_payment_intent_id'],
+        postgresql_where=sa.text('stripe_payment_intent_id IS NOT NULL'),
+    )
+    op.create_index(op.f('ix_restaurants_owner_id'), 'restaurants', ['owner_id'], unique=False)
+    op.create_index(op.f('ix_seats_restaurant_id'), 'seats', ['restaurant_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_seats_restaurant_id'), table_name='seats')
+    op.drop_index(op.f('ix_restaurants_owner_id'), table_name='restaurants')
+    op.drop_index('ix_reservations_stripe_payment_intent_id', table_name='reservations')
+    op.drop_index('ix_reservations_customer_date', table_name='reservations')
+    op.drop_index('ix_reservations_restaurant_date', table_name='reservations')
+    op.drop_index('ix_reservations_active_slot', table_name='reservations')
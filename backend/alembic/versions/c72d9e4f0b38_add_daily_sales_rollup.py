@@ -0,0 +1,56 @@
+"""Add daily_sales rollup
+
+Revision ID: c72d9e4f0b38
+Revises: 8b4e2a6c1d57
+Create Date: 2026-01-22 09:41:17.650233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c72d9e4f0b38'
+down_revision: Union[str, None] = '8b4e2a6c1d57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_sales',
+    sa.Column('restaurant_id', sa.String(length=36), nullable=False),
+    sa.Column('sales_date', sa.Date(), nullable=False),
+    sa.Column('payment_method', sa.String(length=20), nullable=False),
+    sa.Column('reservation_count', sa.Integer(), nullable=False),
+    sa.Column('sales_amount', sa.Integer(), nullable=False),
+    sa.Column('paid_amount', sa.Integer(), nullable=False),
+    sa.Column('refunded_amount', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+              nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+              nullable=False),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('restaurant_id', 'sales_date', 'payment_method')
+    )
+    op.create_index(op.f('ix_daily_sales_sales_date'), 'daily_sales', ['sales_date'], unique=False)
+    # 既存予約からロールアップを作成（scripts/backfill_daily_sales.py と同じ集計）
+    op.execute(
+        """
+        INSERT INTO daily_sales (restaurant_id, sales_date, payment_method, reservation_count,
+                                 sales_amount, paid_amount, refunded_amount)
+        SELECT restaurant_id, reservation_date, payment_method,
+               COUNT(*) FILTER (WHERE status <> 'cancelled'),
+               COALESCE(SUM(amount) FILTER (WHERE status <> 'cancelled'), 0),
+               COALESCE(SUM(amount) FILTER (WHERE payment_status = 'paid'), 0),
+               COALESCE(SUM(amount) FILTER (WHERE payment_status = 'refunded'), 0)
+        FROM reservations
+        GROUP BY restaurant_id, reservation_date, payment_method
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_daily_sales_sales_date'), table_name='daily_sales')
+    op.drop_table('daily_sales')
@@ -0,0 +1,69 @@
+"""Add indexes for keyset pagination of listings
+
+Revision ID: e4a1b7c9d203
+Revises: c72d9e4f0b38
+Create Date: 2026-01-22 10:41:07.553190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a1b7c9d203'
+down_revision: Union[str, None] = 'c72d9e4f0b38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 店舗の予約一覧: (予約日 DESC, 予約時間, id) でページング
+    op.drop_index('ix_reservations_restaurant_date', table_name='reservations')
+    op.create_index(
+        'ix_reservations_restaurant_date',
+        'reservations',
+        ['restaurant_id', sa.text('reservation_date DESC'), 'reservation_time', 'id'],
+    )
+    # 顧客の予約一覧: (予約日 DESC, 予約時間 DESC, id DESC) でページング
+    op.drop_index('ix_reservations_customer_date', table_name='reservations')
+    op.create_index(
+        'ix_reservations_customer_date',
+        'reservations',
+        [
+            'customer_id',
+            sa.text('reservation_date DESC'),
+            sa.text('reservation_time DESC'),
+            sa.text('id DESC'),
+        ],
+    )
+    # 全予約一覧
+    op.create_index(
+        'ix_reservations_date_time_id',
+        'reservations',
+        [sa.text('reservation_date DESC'), sa.text('reservation_time DESC'), sa.text('id DESC')],
+    )
+    # 店舗一覧: ステータスで絞り込み、(登録日時, id) でページング
+    op.create_index(
+        'ix_restaurants_status_created_at',
+        'restaurants',
+        ['status', 'created_at', 'id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_restaurants_status_created_at', table_name='restaurants')
+    op.drop_index('ix_reservations_date_time_id', table_name='reservations')
+    op.drop_index('ix_reservations_customer_date', table_name='reservations')
+    op.create_index(
+        'ix_reservations_customer_date',
+        'reservations',
+        ['customer_id', sa.text('reservation_date DESC')],
+    )
+    op.drop_index('ix_reservations_restaurant_date', table_name='reservations')
+    op.create_index(
+        'ix_reservations_restaurant_date',
+        'reservations',
+        ['restaurant_id', sa.text('reservation_date DESC'), 'reservation_time'],
+    )
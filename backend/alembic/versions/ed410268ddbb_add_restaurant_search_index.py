@@ -0,0 +1,47 @@
+"""Add restaurant search index
+
+Revision ID: ed410268ddbb
+Revises: 1f5560b08147
+Create Date: 2026-10-18 04:22:50.608735
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ed410268ddbb'
+down_revision: Union[str, None] = '1f5560b08147'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('restaurants',
+                  sa.Column('search_document', sa.Text(),
+                            sa.Computed("name || ' ' || genre || ' ' || area || ' ' "
+                                        "|| coalesce(description, '')", persisted=True),
+                            nullable=False))
+    # pg_trgm が使えないサーバーではインデックスを作らず、アプリ側の転置インデックスで検索する
+    bind = op.get_bind()
+    available = bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).first()
+    if available is None:
+        return
+    # 拡張を作成する権限が無いロールでも失敗しないよう、セーブポイント内で試す
+    try:
+        with bind.begin_nested():
+            op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except sa.exc.DBAPIError:
+        return
+    op.create_index('ix_restaurants_search_document_trgm', 'restaurants', ['search_document'],
+                    unique=False, postgresql_using='gin',
+                    postgresql_ops={'search_document': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_restaurants_search_document_trgm")
+    op.drop_column('restaurants', 'search_document')
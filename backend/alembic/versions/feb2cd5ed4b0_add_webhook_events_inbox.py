@@ -0,0 +1,47 @@
+"""Add webhook_events inbox
+
+Revision ID: feb2cd5ed4b0
+Revises: e4a1b7c9d203
+Create Date: 2026-10-18 04:02:39.859383
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'feb2cd5ed4b0'
+down_revision: Union[str, None] = 'e4a1b7c9d203'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('webhook_events',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('type', sa.String(length=100), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+              nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+              nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+              nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_webhook_events_pending', 'webhook_events', ['next_attempt_at'],
+                    unique=False, postgresql_where=sa.text("status = 'pending'"))
+    op.create_index(op.f('ix_webhook_events_status'), 'webhook_events', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_webhook_events_status'), table_name='webhook_events')
+    op.drop_index('ix_webhook_events_pending', table_name='webhook_events',
+                  postgresql_where=sa.text("status = 'pending'"))
+    op.drop_table('webhook_events')
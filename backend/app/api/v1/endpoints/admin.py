@@ -1,32 +1,58 @@
 from datetime import date
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import require_role
-from app.db.session import get_db
-from app.models.reservation import Reservation
+from app.core.security import password_hasher
+from app.db.pagination import NEXT_CURSOR_HEADER, next_cursor
+from app.db.pool import pool_telemetry
+from app.db.session import (
+    engine,
+    get_db,
+    get_read_db,
+    get_read_session_maker,
+    pool_profile,
+    replica_engine,
+    replica_router,
+)
 from app.models.restaurant import Restaurant, RestaurantStatus
-from app.models.user import User
+from app.models.sales import DailySales
+from app.models.webhook import WebhookEvent
 from app.schemas.restaurant import RestaurantListResponse
-from app.services.restaurant import restaurant_service
+from app.services.capacity_ledger import capacity_ledger
+from app.services.reservation_completion import reservation_completion_job
+from app.services.reservation_export import (
+    EXPORT_MEDIA_TYPES,
+    export_filename,
+    reservation_export_service,
+)
+from app.services.restaurant import RESTAURANT_LIST_ORDER, restaurant_service
+from app.services.restaurant_facets import restaurant_facets
+from app.services.user_cache import CurrentUser, user_cache
+from app.services.webhook_inbox import webhook_inbox
 
 router = APIRouter()
 
 
 @router.get("/restaurants", response_model=list[RestaurantListResponse])
 async def list_all_restaurants(
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
-    _current_user: Annotated[User, Depends(require_role(["admin"]))],
+    _current_user: Annotated[CurrentUser, Depends(require_role(["admin"]))],
     status_filter: str | None = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = Query(None, description="前ページのレスポンスの X-Next-Cursor"),
 ) -> list[RestaurantListResponse]:
     restaurants = await restaurant_service.get_list(
-        db, skip=skip, limit=limit, status=status_filter
+        db, skip=skip, limit=limit, status=status_filter, cursor=cursor
     )
+    if cursor_value := next_cursor(RESTAURANT_LIST_ORDER, restaurants, limit):
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
     return [RestaurantListResponse.model_validate(r) for r in restaurants]
 
 
@@ -34,7 +60,7 @@ async def list_all_restaurants(
 async def approve_restaurant(
     restaurant_id: str,
     db: Annotated[AsyncSession, Depends(get_db)],
-    _current_user: Annotated[User, Depends(require_role(["admin"]))],
+    _current_user: Annotated[CurrentUser, Depends(require_role(["admin"]))],
 ) -> RestaurantListResponse:
     restaurant = await restaurant_service.get(db, id=restaurant_id)
     if not restaurant:
@@ -53,7 +79,7 @@ async def approve_restaurant(
 async def suspend_restaurant(
     restaurant_id: str,
     db: Annotated[AsyncSession, Depends(get_db)],
-    _current_user: Annotated[User, Depends(require_role(["admin"]))],
+    _current_user: Annotated[CurrentUser, Depends(require_role(["admin"]))],
 ) -> RestaurantListResponse:
     restaurant = await restaurant_service.get(db, id=restaurant_id)
     if not restaurant:
@@ -70,20 +96,21 @@ async def suspend_restaurant(
 
 @router.get("/sales/summary")
 async def get_sales_summary(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    _current_user: Annotated[User, Depends(require_role(["admin"]))],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    _current_user: Annotated[CurrentUser, Depends(require_role(["admin"]))],
     date_from: date | None = None,
     date_to: date | None = None,
 ) -> dict:
+    # 日次売上ロールアップから集計（予約件数に依存しない）
     query = select(
-        func.count(Reservation.id).label("total_reservations"),
-        func.sum(Reservation.amount).label("total_sales"),
-    ).where(Reservation.status != "cancelled")
+        func.sum(DailySales.reservation_count).label("total_reservations"),
+        func.sum(DailySales.sales_amount).label("total_sales"),
+    )
 
     if date_from:
-        query = query.where(Reservation.reservation_date >= date_from)
+        query = query.where(DailySales.sales_date >= date_from)
     if date_to:
-        query = query.where(Reservation.reservation_date <= date_to)
+        query = query.where(DailySales.sales_date <= date_to)
 
     result = await db.execute(query)
     row = result.one()
@@ -111,30 +138,31 @@ async def get_sales_summary(
 
 @router.get("/sales/by-restaurant")
 async def get_sales_by_restaurant(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    _current_user: Annotated[User, Depends(require_role(["admin"]))],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    _current_user: Annotated[CurrentUser, Depends(require_role(["admin"]))],
     date_from: date | None = None,
     date_to: date | None = None,
     limit: int = 10,
 ) -> list[dict]:
-    query = (
-        select(
-            Restaurant.id,
-            Restaurant.name,
-            func.count(Reservation.id).label("reservations"),
-            func.sum(Reservation.amount).label("sales"),
-        )
-        .join(Reservation, Restaurant.id == Reservation.restaurant_id)
-        .where(Reservation.status != "cancelled")
-        .group_by(Restaurant.id, Restaurant.name)
-        .order_by(func.sum(Reservation.amount).desc())
-        .limit(limit)
-    )
+    # 日次売上ロールアップを店舗ごとに集計し、上位の店舗だけ店舗名と結合する
+    sales_query = select(
+        DailySales.restaurant_id,
+        func.sum(DailySales.reservation_count).label("reservations"),
+        func.sum(DailySales.sales_amount).label("sales"),
+    ).group_by(DailySales.restaurant_id)
 
     if date_from:
-        query = query.where(Reservation.reservation_date >= date_from)
+        sales_query = sales_query.where(DailySales.sales_date >= date_from)
     if date_to:
-        query = query.where(Reservation.reservation_date <= date_to)
+        sales_query = sales_query.where(DailySales.sales_date <= date_to)
+
+    sales = sales_query.having(func.sum(DailySales.reservation_count) > 0).subquery()
+    query = (
+        select(Restaurant.id, Restaurant.name, sales.c.reservations, sales.c.sales)
+        .join(sales, sales.c.restaurant_id == Restaurant.id)
+        .order_by(sales.c.sales.desc())
+        .limit(limit)
+    )
 
     result = await db.execute(query)
     rows = result.all()
@@ -148,3 +176,147 @@ async def get_sales_by_restaurant(
         }
         for row in rows
     ]
+
+
+@router.get("/capacity-ledger/consistency")
+async def check_capacity_ledger_consistency(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    _current_user: Annotated[CurrentUser, Depends(require_role(["admin"]))],
+    repair: bool = False,
+) -> dict:
+    """空席台帳（プロセス内キャッシュ）とDBのずれを確認する
+
+    - repair=true の場合、ずれていた項目をDBの値で修復する
+    - 台帳はプロセスごとに保持されるため、結果はリクエストを処理したワーカーのもの
+    """
+    report = await capacity_ledger.check_consistency(db, repair=repair)
+    return {**report, "stats": capacity_ledger.stats()}
+
+
+@router.get("/diagnostics/password-hasher")
+async def get_password_hasher_stats(
+    _current_user: Annotated[CurrentUser, Depends(require_role(["admin"]))],
+) -> dict:
+    """パスワードハッシュ用ワーカープールの稼働状況（同時実行数・待ち行列）を確認する"""
+    return password_hasher.stats()
+
+
+@router.get("/diagnostics/user-cache")
+async def get_user_cache_stats(
+    _current_user: Annotated[CurrentUser, Depends(require_role(["admin"]))],
+) -> dict:
+    """認証ユーザーキャッシュのヒット率・件数を確認する"""
+    return user_cache.stats()
+
+
+@router.get("/diagnostics/facet-cache")
+async def get_facet_cache_stats(
+    _current_user: Annotated[CurrentUser, Depends(require_role(["admin"]))],
+) -> dict:
+    """店舗一覧のジャンル別・エリア別件数キャッシュのヒット率・件数を確認する"""
+    return restaurant_facets.stats()
+
+
+@router.get("/diagnostics/db-pool")
+async def get_db_pool_stats(
+    _current_user: Annotated[CurrentUser, Depends(require_role(["admin"]))],
+) -> dict:
+    """DBコネクションプールの稼働状況（使用中・オーバーフロー・取得待ち時間）を確認する"""
+    return {
+        "primary": pool_telemetry(engine),
+        "replica": pool_telemetry(replica_engine) if replica_engine is not None else None,
+        "replica_routing": replica_router.stats(),
+        "pgbouncer_mode": pool_profile.pgbouncer,
+        "statement_cache_size": 0 if pool_profile.pgbouncer else pool_profile.statement_cache_size,
+    }
+
+
+@router.get("/diagnostics/webhook-inbox")
+async def get_webhook_inbox_stats(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    _current_user: Annotated[CurrentUser, Depends(require_role(["admin"]))],
+) -> dict:
+    """Webhook受信箱の処理状況（ステータス別件数・再試行・dead件数）を確認する"""
+    return await webhook_inbox.stats(db)
+
+
+@router.get("/diagnostics/reservation-completion")
+async def get_reservation_completion_stats(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    _current_user: Annotated[CurrentUser, Depends(require_role(["admin"]))],
+) -> dict:
+    """過去日の予約の自動完了ジョブの進捗（完了件数・残件数・前回の実行時間）を確認する"""
+    return await reservation_completion_job.stats(db)
+
+
+@router.get("/webhook-events")
+async def list_webhook_events(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    _current_user: Annotated[CurrentUser, Depends(require_role(["admin"]))],
+    status_filter: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+) -> list[dict]:
+    """受信したWebhookイベントを新しい順に取得する（status_filter=dead で処理できなかったもの）"""
+    events = await webhook_inbox.get_list(db, status=status_filter, limit=limit)
+    return [_webhook_event_dict(event) for event in events]
+
+
+@router.post("/webhook-events/{event_id}/retry")
+async def retry_webhook_event(
+    event_id: str,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    _current_user: Annotated[CurrentUser, Depends(require_role(["admin"]))],
+) -> dict:
+    """Webhookイベントを再処理の対象に戻す"""
+    event = await webhook_inbox.requeue(db, event_id=event_id)
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Webhookイベントが見つかりません",
+        )
+    return _webhook_event_dict(event)
+
+
+def _webhook_event_dict(event: WebhookEvent) -> dict:
+    return {
+        "id": event.id,
+        "type": event.type,
+        "status": event.status,
+        "attempts": event.attempts,
+        "next_attempt_at": event.next_attempt_at,
+        "last_error": event.last_error,
+        "processed_at": event.processed_at,
+        "created_at": event.created_at,
+    }
+
+
+@router.get("/reservations/export")
+async def export_reservations(
+    request: Request,
+    _current_user: Annotated[CurrentUser, Depends(require_role(["admin"]))],
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    restaurant_id: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> StreamingResponse:
+    """予約を全件NDJSON/CSVでエクスポートする（件数によらずメモリ使用量は一定）"""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from は date_to 以前の日付を指定してください",
+        )
+
+    session_maker = await get_read_session_maker(request)
+    return StreamingResponse(
+        reservation_export_service.stream(
+            session_maker,
+            export_format=export_format,
+            restaurant_id=restaurant_id,
+            date_from=date_from,
+            date_to=date_to,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename(export_format)}"'
+        },
+    )
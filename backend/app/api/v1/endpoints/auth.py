@@ -15,7 +15,6 @@ from app.core.security import (
     verify_refresh_token,
 )
 from app.db.session import get_db
-from app.models.user import User
 from app.schemas.auth import (
     LoginRequest,
     LogoutResponse,
@@ -27,6 +26,7 @@ from app.schemas.auth import (
 )
 from app.schemas.user import UserResponse
 from app.services.user import user_service
+from app.services.user_cache import CurrentUser
 
 logger = logging.getLogger(__name__)
 
@@ -108,7 +108,7 @@ async def register(
 
 @router.post("/logout", response_model=LogoutResponse)
 async def logout(
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[CurrentUser, Depends(get_current_active_user)],
 ) -> LogoutResponse:
     """
     ログアウトエンドポイント。
@@ -1,3 +1,4 @@
+import json
 import logging
 from typing import Annotated
 
@@ -6,7 +7,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_current_active_user, require_role
 from app.db.session import get_db
-from app.models.user import User
 from app.schemas.payment import (
     PaymentConfirmResponse,
     PaymentIntentRequest,
@@ -17,6 +17,8 @@ from app.schemas.payment import (
 )
 from app.services.payment import PaymentError, payment_service
 from app.services.reservation import reservation_service
+from app.services.user_cache import CurrentUser
+from app.services.webhook_inbox import webhook_inbox
 
 
 logger = logging.getLogger(__name__)
@@ -27,7 +29,7 @@ router = APIRouter()
 @router.post("/create-intent", response_model=PaymentIntentResponse)
 async def create_payment_intent(
     db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[CurrentUser, Depends(get_current_active_user)],
     request: PaymentIntentRequest,
 ) -> PaymentIntentResponse:
     """
@@ -85,6 +87,8 @@ async def confirm_payment_webhook(
     Stripe Webhookから呼ばれる決済確認エンドポイント。
 
     - Stripe-Signatureヘッダーで署名を検証
+    - イベントを受信箱（webhook_events）に保存してすぐに応答し、処理はワーカーが非同期に行う
+    - 同じイベントの再送は受信済みとして無視する
     - payment_intent.succeededイベントで予約のpayment_statusを"paid"に更新
     """
     if not stripe_signature:
@@ -104,43 +108,28 @@ async def confirm_payment_webhook(
             detail=e.message,
         )
 
-    # payment_intent.succeededイベントを処理
-    if event["type"] == "payment_intent.succeeded":
-        payment_intent = event["data"]["object"]
-        payment_intent_id = payment_intent["id"]
-
-        reservation = await payment_service.confirm_payment(
-            db, payment_intent_id=payment_intent_id
+    # 署名検証済みの生ペイロードをそのまま保存する
+    created = await webhook_inbox.enqueue(db, json.loads(payload))
+    if not created:
+        logger.info(f"Webhookイベント {event['id']} は受信済みです")
+        return PaymentConfirmResponse(
+            success=True,
+            reservation_id=None,
+            message=f"イベント {event['id']} は受信済みです",
         )
 
-        if reservation:
-            logger.info(f"Webhook処理完了: 予約ID {reservation.id} の決済を確認")
-            return PaymentConfirmResponse(
-                success=True,
-                reservation_id=reservation.id,
-                message="決済が確認されました",
-            )
-        else:
-            logger.warning(f"Webhook処理: 対応する予約が見つかりません (Payment Intent: {payment_intent_id})")
-            return PaymentConfirmResponse(
-                success=False,
-                reservation_id=None,
-                message="対応する予約が見つかりません",
-            )
-
-    # その他のイベントはログのみ
-    logger.info(f"Webhookイベント受信: {event['type']}")
+    logger.info(f"Webhookイベント受信: {event['id']} ({event['type']})")
     return PaymentConfirmResponse(
         success=True,
         reservation_id=None,
-        message=f"イベント {event['type']} を受信しました",
+        message=f"イベント {event['type']} を受け付けました",
     )
 
 
 @router.post("/refund", response_model=RefundResponse)
 async def refund_payment(
     db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(require_role(["store", "admin"]))],
+    current_user: Annotated[CurrentUser, Depends(require_role(["store", "admin"]))],
     request: RefundRequest,
 ) -> RefundResponse:
     """
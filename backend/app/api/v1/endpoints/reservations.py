@@ -1,41 +1,60 @@
 from datetime import date
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_current_active_user, require_role
-from app.db.session import get_db
+from app.db.pagination import NEXT_CURSOR_HEADER, next_cursor
+from app.db.session import get_db, get_read_db, get_read_session_maker
 from app.models.reservation import ReservationStatus
-from app.models.user import User
 from app.schemas.reservation import (
+    ReservationBulkStatusItem,
+    ReservationBulkStatusResponse,
+    ReservationBulkStatusUpdate,
     ReservationCreate,
     ReservationResponse,
     ReservationUpdate,
 )
-from app.services.reservation import reservation_service
+from app.services.reservation import (
+    CUSTOMER_RESERVATION_ORDER,
+    RESTAURANT_RESERVATION_ORDER,
+    ReservationError,
+    reservation_service,
+)
+from app.services.reservation_export import (
+    EXPORT_MEDIA_TYPES,
+    export_filename,
+    reservation_export_service,
+)
 from app.services.restaurant import restaurant_service
+from app.services.user_cache import CurrentUser
 
 router = APIRouter()
 
 
 @router.get("/my", response_model=list[ReservationResponse])
 async def get_my_reservations(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[CurrentUser, Depends(get_current_active_user)],
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = Query(None, description="前ページのレスポンスの X-Next-Cursor"),
 ) -> list[ReservationResponse]:
     reservations = await reservation_service.get_by_customer(
-        db, customer_id=current_user.id, skip=skip, limit=limit
+        db, customer_id=current_user.id, skip=skip, limit=limit, cursor=cursor
     )
+    if cursor_value := next_cursor(CUSTOMER_RESERVATION_ORDER, reservations, limit):
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
     return [ReservationResponse.model_validate(r) for r in reservations]
 
 
 @router.post("", response_model=ReservationResponse, status_code=status.HTTP_201_CREATED)
 async def create_reservation(
     db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[CurrentUser, Depends(get_current_active_user)],
     reservation_in: ReservationCreate,
 ) -> ReservationResponse:
     restaurant = await restaurant_service.get(db, id=reservation_in.restaurant_id)
@@ -45,9 +64,20 @@ async def create_reservation(
             detail="店舗が見つかりません",
         )
 
-    reservation = await reservation_service.create(
-        db, obj_in=reservation_in, customer_id=current_user.id
-    )
+    try:
+        reservation = await reservation_service.create(
+            db, obj_in=reservation_in, customer_id=current_user.id
+        )
+    except ReservationError as e:
+        if e.code == "capacity_exceeded":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=e.message,
+            ) from e
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=e.message,
+        ) from e
     return ReservationResponse.model_validate(reservation)
 
 
@@ -55,7 +85,7 @@ async def create_reservation(
 async def get_reservation(
     reservation_id: str,
     db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[CurrentUser, Depends(get_current_active_user)],
 ) -> ReservationResponse:
     reservation = await reservation_service.get(db, id=reservation_id)
     if not reservation:
@@ -75,7 +105,7 @@ async def get_reservation(
 async def cancel_reservation(
     reservation_id: str,
     db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[CurrentUser, Depends(get_current_active_user)],
 ) -> ReservationResponse:
     reservation = await reservation_service.get(db, id=reservation_id)
     if not reservation:
@@ -95,19 +125,33 @@ async def cancel_reservation(
         )
 
     update_data = ReservationUpdate(status=ReservationStatus.CANCELLED.value)
-    reservation = await reservation_service.update(db, db_obj=reservation, obj_in=update_data)
+    try:
+        reservation = await reservation_service.update(
+            db,
+            db_obj=reservation,
+            obj_in=update_data,
+            expected_status=ReservationStatus.CONFIRMED.value,
+        )
+    except ReservationError:
+        # 同時に別のリクエストでキャンセル・完了された場合
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="この予約はキャンセルできません",
+        ) from None
     return ReservationResponse.model_validate(reservation)
 
 
 # Store endpoints
 @router.get("/store/list", response_model=list[ReservationResponse])
 async def get_store_reservations(
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(require_role(["store"]))],
+    current_user: Annotated[CurrentUser, Depends(require_role(["store"]))],
     date_filter: date | None = None,
     status_filter: str | None = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = Query(None, description="前ページのレスポンスの X-Next-Cursor"),
 ) -> list[ReservationResponse]:
     restaurant = await restaurant_service.get_by_owner(db, owner_id=current_user.id)
     if not restaurant:
@@ -123,15 +167,81 @@ async def get_store_reservations(
         status=status_filter,
         skip=skip,
         limit=limit,
+        cursor=cursor,
     )
+    if cursor_value := next_cursor(RESTAURANT_RESERVATION_ORDER, reservations, limit):
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
     return [ReservationResponse.model_validate(r) for r in reservations]
 
 
+@router.get("/store/export")
+async def export_store_reservations(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[CurrentUser, Depends(require_role(["store"]))],
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> StreamingResponse:
+    """自店舗の予約を全件NDJSON/CSVでエクスポートする"""
+    restaurant = await restaurant_service.get_by_owner(db, owner_id=current_user.id)
+    if not restaurant:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="店舗が登録されていません",
+        )
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from は date_to 以前の日付を指定してください",
+        )
+
+    session_maker = await get_read_session_maker(request)
+    return StreamingResponse(
+        reservation_export_service.stream(
+            session_maker,
+            export_format=export_format,
+            restaurant_id=restaurant.id,
+            date_from=date_from,
+            date_to=date_to,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename(export_format)}"'
+        },
+    )
+
+
+@router.post("/store/bulk-status", response_model=ReservationBulkStatusResponse)
+async def bulk_update_store_reservation_status(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[CurrentUser, Depends(require_role(["store"]))],
+    request: ReservationBulkStatusUpdate,
+) -> ReservationBulkStatusResponse:
+    """
+    自店舗の確定済み予約を一括で完了またはキャンセルにする。
+
+    - reservation_ids: 予約IDのリスト（最大200件）
+    - status: "completed" または "cancelled"
+    - 予約ごとの結果を返す（他店舗の予約・確定済み以外の予約は変更せずエラーを返す）
+    """
+    results = await reservation_service.bulk_update_status(
+        db,
+        owner_id=current_user.id,
+        reservation_ids=request.reservation_ids,
+        status=request.status,
+    )
+    return ReservationBulkStatusResponse(
+        updated=sum(1 for result in results if result["success"]),
+        results=[ReservationBulkStatusItem(**result) for result in results],
+    )
+
+
 @router.put("/store/{reservation_id}/complete", response_model=ReservationResponse)
 async def complete_reservation(
     reservation_id: str,
     db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(require_role(["store"]))],
+    current_user: Annotated[CurrentUser, Depends(require_role(["store"]))],
 ) -> ReservationResponse:
     reservation = await reservation_service.get(db, id=reservation_id)
     if not reservation:
@@ -148,5 +258,12 @@ async def complete_reservation(
         )
 
     update_data = ReservationUpdate(status=ReservationStatus.COMPLETED.value)
-    reservation = await reservation_service.update(db, db_obj=reservation, obj_in=update_data)
+    try:
+        reservation = await reservation_service.update(db, db_obj=reservation, obj_in=update_data)
+    except ReservationError as e:
+        # キャンセル済みの予約を完了にする際、席を割り当て直せない場合
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=e.message,
+        ) from e
     return ReservationResponse.model_validate(reservation)
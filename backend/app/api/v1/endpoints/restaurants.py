@@ -1,15 +1,18 @@
-from datetime import date, datetime
-from typing import Annotated
+from datetime import date, datetime, time
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import require_role
-from app.db.session import get_db
-from app.models.user import User
+from app.db.pagination import NEXT_CURSOR_HEADER, next_cursor
+from app.db.session import get_db, get_read_db
+from app.models.restaurant import RestaurantStatus
 from app.schemas.restaurant import (
+    AvailabilityGridResponse,
     AvailabilityResponse,
     RestaurantCreate,
+    RestaurantFacetedListResponse,
     RestaurantListResponse,
     RestaurantResponse,
     RestaurantSalesResponse,
@@ -17,29 +20,104 @@ from app.schemas.restaurant import (
     SeatCreate,
     SeatResponse,
 )
-from app.services.restaurant import restaurant_service
+from app.services.restaurant import RESTAURANT_LIST_ORDER, restaurant_service
+from app.services.restaurant_facets import restaurant_facets
+from app.services.user_cache import CurrentUser
 
 router = APIRouter()
 
+# 空席カレンダーで一度に取得できる最大日数
+MAX_AVAILABILITY_GRID_DAYS = 31
 
-@router.get("", response_model=list[RestaurantListResponse])
+
+def _parse_date(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="日付の形式が正しくありません。YYYY-MM-DD形式で指定してください。",
+        ) from None
+
+
+def _parse_time(value: str) -> time:
+    try:
+        return datetime.strptime(value, "%H:%M").time()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="時間の形式が正しくありません。HH:MM形式で指定してください。",
+        ) from None
+
+
+@router.get("", response_model=list[RestaurantListResponse] | RestaurantFacetedListResponse)
 async def list_restaurants(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     genre: str | None = None,
     area: str | None = None,
+    q: str | None = Query(
+        None, max_length=100, description="キーワード（店名・ジャンル・エリア・説明）"
+    ),
     skip: int = 0,
     limit: int = 100,
-) -> list[RestaurantListResponse]:
-    restaurants = await restaurant_service.get_list(
-        db, skip=skip, limit=limit, genre=genre, area=area
-    )
-    return [RestaurantListResponse.model_validate(r) for r in restaurants]
+    cursor: str | None = Query(None, description="前ページのレスポンスの X-Next-Cursor"),
+    date_param: str | None = Query(None, alias="date", description="予約日 (YYYY-MM-DD形式)"),
+    time_param: str | None = Query(None, alias="time", description="予約時間 (HH:MM形式)"),
+    party_size: int | None = Query(None, ge=1, description="人数"),
+    facets: bool = Query(False, description="ジャンル別・エリア別の件数を合わせて返す"),
+) -> list[RestaurantListResponse] | RestaurantFacetedListResponse:
+    """店舗一覧を取得する
+
+    date・time・party_size を指定した場合は、その日時・人数で予約可能な店舗のみを返す。
+    q を指定した場合は、キーワードに部分一致・あいまい一致する店舗を関連度順に返す。
+    facets=true の場合は {items, facets} の形で、一覧と同じ絞り込みでのジャンル別・エリア別の
+    件数を合わせて返す（ジャンル別の件数はジャンルの絞り込みを除いて数える。エリアも同様）。
+    通常の一覧はページが埋まっている場合、次ページのカーソルを X-Next-Cursor ヘッダーで返す。
+    """
+    search_params = (date_param, time_param, party_size)
+    if any(param is not None for param in search_params):
+        if q is not None or facets:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="空席検索では q・facets を指定できません",
+            )
+        if date_param is None or time_param is None or party_size is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="空席検索には date・time・party_size をすべて指定してください",
+            )
+        restaurants = await restaurant_service.search_available(
+            db,
+            reservation_date=_parse_date(date_param),
+            reservation_time=_parse_time(time_param),
+            party_size=party_size,
+            skip=skip,
+            limit=limit,
+            genre=genre,
+            area=area,
+        )
+    else:
+        restaurants = await restaurant_service.get_list(
+            db, skip=skip, limit=limit, genre=genre, area=area, cursor=cursor, q=q
+        )
+        # キーワード検索は関連度順のためカーソルを返さない（skip でページングする）
+        cursor_value = q is None and next_cursor(RESTAURANT_LIST_ORDER, restaurants, limit)
+        if cursor_value:
+            response.headers[NEXT_CURSOR_HEADER] = cursor_value
+    items = [RestaurantListResponse.model_validate(r) for r in restaurants]
+    if facets:
+        counts = await restaurant_facets.get(
+            db, status=RestaurantStatus.ACTIVE.value, genre=genre, area=area, q=q
+        )
+        return RestaurantFacetedListResponse(items=items, facets=counts)
+    return items
 
 
 @router.get("/{restaurant_id}", response_model=RestaurantResponse)
 async def get_restaurant(
     restaurant_id: str,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> RestaurantResponse:
     restaurant = await restaurant_service.get(db, id=restaurant_id)
     if not restaurant:
@@ -53,7 +131,7 @@ async def get_restaurant(
 @router.post("", response_model=RestaurantResponse, status_code=status.HTTP_201_CREATED)
 async def create_restaurant(
     db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(require_role(["store"]))],
+    current_user: Annotated[CurrentUser, Depends(require_role(["store"]))],
     restaurant_in: RestaurantCreate,
 ) -> RestaurantResponse:
     existing = await restaurant_service.get_by_owner(db, owner_id=current_user.id)
@@ -73,7 +151,7 @@ async def create_restaurant(
 async def update_restaurant(
     restaurant_id: str,
     db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(require_role(["store"]))],
+    current_user: Annotated[CurrentUser, Depends(require_role(["store"]))],
     restaurant_in: RestaurantUpdate,
 ) -> RestaurantResponse:
     restaurant = await restaurant_service.get(db, id=restaurant_id)
@@ -95,7 +173,7 @@ async def update_restaurant(
 @router.get("/my/store", response_model=RestaurantResponse)
 async def get_my_restaurant(
     db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(require_role(["store"]))],
+    current_user: Annotated[CurrentUser, Depends(require_role(["store"]))],
 ) -> RestaurantResponse:
     restaurant = await restaurant_service.get_by_owner(db, owner_id=current_user.id)
     if not restaurant:
@@ -110,7 +188,7 @@ async def get_my_restaurant(
 async def add_seat(
     restaurant_id: str,
     db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(require_role(["store"]))],
+    current_user: Annotated[CurrentUser, Depends(require_role(["store"]))],
     seat_in: SeatCreate,
 ) -> SeatResponse:
     restaurant = await restaurant_service.get(db, id=restaurant_id)
@@ -134,7 +212,7 @@ async def delete_seat(
     restaurant_id: str,
     seat_id: str,
     db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(require_role(["store"]))],
+    current_user: Annotated[CurrentUser, Depends(require_role(["store"]))],
 ) -> None:
     restaurant = await restaurant_service.get(db, id=restaurant_id)
     if not restaurant:
@@ -147,6 +225,11 @@ async def delete_seat(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="この店舗を編集する権限がありません",
         )
+    if await restaurant_service.has_upcoming_assignments(db, seat_id=seat_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="この席には今後の予約が割り当てられています",
+        )
 
     await restaurant_service.delete_seat(db, seat_id=seat_id)
 
@@ -154,7 +237,7 @@ async def delete_seat(
 @router.get("/{restaurant_id}/availability", response_model=AvailabilityResponse)
 async def check_availability(
     restaurant_id: str,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     date_param: str = Query(..., alias="date", description="予約日 (YYYY-MM-DD形式)"),
     time_param: str = Query(..., alias="time", description="予約時間 (HH:MM形式)"),
     party_size: int = Query(..., ge=1, description="人数"),
@@ -173,29 +256,58 @@ async def check_availability(
     Returns:
         AvailabilityResponse: 空席状況レスポンス
     """
-    # 日付のパース
-    try:
-        reservation_date = datetime.strptime(date_param, "%Y-%m-%d").date()
-    except ValueError:
+    reservation_date = _parse_date(date_param)
+    reservation_time = _parse_time(time_param)
+
+    return await restaurant_service.check_availability(
+        db,
+        restaurant_id=restaurant_id,
+        reservation_date=reservation_date,
+        reservation_time=reservation_time,
+        party_size=party_size,
+    )
+
+
+@router.get("/{restaurant_id}/availability/grid", response_model=AvailabilityGridResponse)
+async def get_availability_grid(
+    restaurant_id: str,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    date_from_param: str = Query(..., alias="date_from", description="開始日 (YYYY-MM-DD形式)"),
+    date_to_param: str = Query(..., alias="date_to", description="終了日 (YYYY-MM-DD形式)"),
+    party_size: int = Query(..., ge=1, description="人数"),
+    time_from_param: str = Query("11:00", alias="time_from", description="最初の枠 (HH:MM形式)"),
+    time_to_param: str = Query("22:00", alias="time_to", description="最後の枠 (HH:MM形式)"),
+    interval_minutes: int = Query(30, ge=15, le=240, description="枠の間隔（分）"),
+) -> AvailabilityGridResponse:
+    """期間内の空席状況を日付×時間のマトリクスで取得する
+
+    カレンダー表示用。枠ごとに空席確認APIを呼ぶ代わりに、1回の集計クエリで
+    期間内の全枠の空席状況を返す。ゲストユーザーでもアクセス可能。
+    """
+    date_from = _parse_date(date_from_param)
+    date_to = _parse_date(date_to_param)
+    time_from = _parse_time(time_from_param)
+    time_to = _parse_time(time_to_param)
+
+    if date_to < date_from or time_to < time_from:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="日付の形式が正しくありません。YYYY-MM-DD形式で指定してください。",
+            detail="期間の指定が正しくありません",
         )
-
-    # 時間のパース
-    try:
-        reservation_time = datetime.strptime(time_param, "%H:%M").time()
-    except ValueError:
+    if (date_to - date_from).days + 1 > MAX_AVAILABILITY_GRID_DAYS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="時間の形式が正しくありません。HH:MM形式で指定してください。",
+            detail=f"期間は最大{MAX_AVAILABILITY_GRID_DAYS}日までです",
         )
 
-    return await restaurant_service.check_availability(
+    return await restaurant_service.get_availability_grid(
         db,
         restaurant_id=restaurant_id,
-        reservation_date=reservation_date,
-        reservation_time=reservation_time,
+        date_from=date_from,
+        date_to=date_to,
+        time_from=time_from,
+        time_to=time_to,
+        interval_minutes=interval_minutes,
         party_size=party_size,
     )
 
@@ -203,16 +315,18 @@ async def check_availability(
 @router.get("/{restaurant_id}/sales", response_model=RestaurantSalesResponse)
 async def get_restaurant_sales(
     restaurant_id: str,
-    db: Annotated[AsyncSession, Depends(get_db)],
-    current_user: Annotated[User, Depends(require_role(["store"]))],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[CurrentUser, Depends(require_role(["store"]))],
     date_from: date | None = None,
     date_to: date | None = None,
+    granularity: Literal["day", "week", "month"] | None = None,
 ) -> RestaurantSalesResponse:
     """店舗オーナーが自店舗の売上を確認する
 
     - 店舗オーナーのみアクセス可能
     - 日付範囲でフィルタ可能（date_from, date_to）
     - 集計項目：総売上、予約件数、事前決済/現地払い別売上
+    - granularity（day / week / month）指定時は期間ごとの売上推移（series）も返す
     """
     restaurant = await restaurant_service.get(db, id=restaurant_id)
     if not restaurant:
@@ -227,5 +341,9 @@ async def get_restaurant_sales(
         )
 
     return await restaurant_service.get_sales(
-        db, restaurant_id=restaurant_id, date_from=date_from, date_to=date_to
+        db,
+        restaurant_id=restaurant_id,
+        date_from=date_from,
+        date_to=date_to,
+        granularity=granularity,
     )
@@ -1,16 +1,27 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_current_active_user
-from app.models.user import User
+from app.db.session import get_db
 from app.schemas.user import UserResponse
+from app.services.user import user_service
+from app.services.user_cache import CurrentUser
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[CurrentUser, Depends(get_current_active_user)],
 ) -> UserResponse:
-    return UserResponse.model_validate(current_user)
+    # 認証はキャッシュ済みの項目で行い、プロフィール全体はDBから取得する
+    user = await user_service.get(db, id=current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="ユーザーが見つかりません",
+        )
+    return UserResponse.model_validate(user)
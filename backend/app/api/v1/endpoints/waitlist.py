@@ -0,0 +1,82 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.deps import get_current_active_user
+from app.db.session import get_db, get_read_db
+from app.schemas.waitlist import WaitlistCreate, WaitlistEntryResponse
+from app.services.restaurant import restaurant_service
+from app.services.user_cache import CurrentUser
+from app.services.waitlist import WaitlistError, waitlist_service
+
+router = APIRouter()
+
+
+@router.get("/my", response_model=list[WaitlistEntryResponse])
+async def get_my_waitlist(
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    current_user: Annotated[CurrentUser, Depends(get_current_active_user)],
+    skip: int = 0,
+    limit: int = 100,
+) -> list[WaitlistEntryResponse]:
+    entries = await waitlist_service.get_by_customer(
+        db, customer_id=current_user.id, skip=skip, limit=limit
+    )
+    return [WaitlistEntryResponse.model_validate(e) for e in entries]
+
+
+@router.post("", response_model=WaitlistEntryResponse, status_code=status.HTTP_201_CREATED)
+async def join_waitlist(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[CurrentUser, Depends(get_current_active_user)],
+    entry_in: WaitlistCreate,
+) -> WaitlistEntryResponse:
+    restaurant = await restaurant_service.get(db, id=entry_in.restaurant_id)
+    if not restaurant:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="店舗が見つかりません",
+        )
+
+    try:
+        entry = await waitlist_service.join(db, obj_in=entry_in, customer_id=current_user.id)
+    except WaitlistError as e:
+        if e.code in ("seats_available", "already_waiting"):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=e.message,
+            ) from e
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=e.message,
+        ) from e
+    return WaitlistEntryResponse.model_validate(entry)
+
+
+@router.delete("/{entry_id}", response_model=WaitlistEntryResponse)
+async def cancel_waitlist_entry(
+    entry_id: str,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[CurrentUser, Depends(get_current_active_user)],
+) -> WaitlistEntryResponse:
+    entry = await waitlist_service.get(db, id=entry_id)
+    if not entry:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="キャンセル待ちが見つかりません",
+        )
+    if entry.customer_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="このキャンセル待ちを取り消す権限がありません",
+        )
+
+    try:
+        entry = await waitlist_service.cancel(db, db_obj=entry)
+    except WaitlistError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=e.message,
+        ) from e
+    return WaitlistEntryResponse.model_validate(entry)
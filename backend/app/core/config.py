@@ -12,8 +12,27 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
 
+    # Password hashing (bcrypt worker pool)
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # thread / process / inline
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 0  # 0: same as PASSWORD_HASH_WORKERS
+
     # Database
     DATABASE_URL: str = "postgresql+asyncpg://localhost:5432/restaurant_reservation"
+    SQL_ECHO: bool = False  # 全SQLをログ出力する（開発時のみ）
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpgのプリペアドステートメントキャッシュ
+    DB_PGBOUNCER_MODE: bool = False  # PgBouncer（トランザクションプーリング）経由で接続する
+
+    # Read replica (empty: all reads go to the primary)
+    DATABASE_REPLICA_URL: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 2.0
+    READ_YOUR_WRITES_SECONDS: int = 10
 
     # CORS
     CORS_ORIGINS: list[str] = ["http://localhost:3247", "http://127.0.0.1:3247"]
@@ -21,6 +40,47 @@ class Settings(BaseSettings):
     # Stripe
     STRIPE_SECRET_KEY: str = ""
     STRIPE_WEBHOOK_SECRET: str = ""
+    STRIPE_API_VERSION: str = "2025-12-15.clover"  # Stripe-Versionヘッダーで固定するAPIバージョン
+    PAYMENT_GATEWAY: str = "stripe"  # stripe / fake
+    PAYMENT_GATEWAY_TIMEOUT_SECONDS: float = 10.0
+    PAYMENT_GATEWAY_MAX_RETRIES: int = 2
+    PAYMENT_GATEWAY_MAX_CONNECTIONS: int = 20
+    PAYMENT_GATEWAY_FAKE_LATENCY_MS: int = 0
+
+    # Webhook inbox (0 workers: events are stored but not processed by this process)
+    WEBHOOK_WORKERS: int = 2
+    WEBHOOK_BATCH_SIZE: int = 20
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    WEBHOOK_RETRY_BASE_SECONDS: float = 2.0
+    WEBHOOK_RETRY_MAX_SECONDS: float = 600.0
+    WEBHOOK_LEASE_SECONDS: int = 60  # 取り出したイベントの処理期限
+    WEBHOOK_POLL_INTERVAL_SECONDS: float = 1.0
+
+    # Authenticated user cache (0: disabled)
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+
+    # Request metrics exposed at /metrics (Prometheus text format)
+    METRICS_ENABLED: bool = True
+
+    # Per-request SQL statistics (Server-Timing header and warnings; 0: no warning)
+    QUERY_STATS_ENABLED: bool = True
+    QUERY_BUDGET_PER_REQUEST: int = 30
+    REPEATED_QUERY_THRESHOLD: int = 5
+
+    # Restaurant list facet counts cache (0: disabled)
+    FACET_CACHE_TTL_SECONDS: int = 60
+    FACET_CACHE_MAX_SIZE: int = 1000
+
+    # Auto-completion of past reservations (0: disabled)
+    RESERVATION_AUTO_COMPLETE_INTERVAL_SECONDS: int = 3600
+    RESERVATION_AUTO_COMPLETE_CHUNK_SIZE: int = 500
+
+    # Availability
+    CAPACITY_LEDGER_TTL_SECONDS: int = 300
+    DEFAULT_DINING_DURATION_MINUTES: int = 120  # 店舗で未設定の場合の1組の利用時間
+    WAITLIST_PROMOTION_SCAN_LIMIT: int = 50  # キャンセル1回で確認するキャンセル待ちの最大件数
+    SEARCH_INDEX_TTL_SECONDS: int = 300  # 店舗検索用の索引の有効期間・pg_trgm の有無の確認間隔
 
     class Config:
         env_file = ".env"
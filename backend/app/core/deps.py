@@ -7,8 +7,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.db.session import get_db
-from app.models.user import User
 from app.schemas.auth import TokenPayload
+from app.services.user_cache import CurrentUser, user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
@@ -16,7 +16,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login
 async def get_current_user(
     db: Annotated[AsyncSession, Depends(get_db)],
     token: Annotated[str, Depends(oauth2_scheme)],
-) -> User:
+) -> CurrentUser:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="認証情報を検証できませんでした",
@@ -31,17 +31,16 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    from app.services.user import user_service
-
-    user = await user_service.get(db, id=token_data.sub)
+    # キャッシュにあればDBを参照しない（セッションは接続を取得しないまま閉じられる）
+    user = await user_cache.get(db, user_id=token_data.sub)
     if user is None:
         raise credentials_exception
     return user
 
 
 async def get_current_active_user(
-    current_user: Annotated[User, Depends(get_current_user)],
-) -> User:
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> CurrentUser:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="このユーザーは無効化されています")
     return current_user
@@ -49,8 +48,8 @@ async def get_current_active_user(
 
 def require_role(allowed_roles: list[str]):
     async def role_checker(
-        current_user: Annotated[User, Depends(get_current_active_user)],
-    ) -> User:
+        current_user: Annotated[CurrentUser, Depends(get_current_active_user)],
+    ) -> CurrentUser:
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
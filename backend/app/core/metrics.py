@@ -0,0 +1,179 @@
+import time
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# レスポンス時間のヒストグラムの区切り（秒）
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# レスポンスサイズのヒストグラムの区切り（バイト）
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# ルーティングに一致しなかったリクエストのルート名（パスをそのままラベルにしない）
+UNMATCHED_ROUTE = "<unmatched>"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """累積しない区間ごとの件数と合計を持つヒストグラム（出力時に累積する）"""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class RouteMetrics:
+    """1つの (メソッド, ルートのテンプレート) の計測値"""
+
+    __slots__ = ("latency", "size", "statuses")
+
+    def __init__(self) -> None:
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.statuses: dict[int, int] = {}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def route_template(scope: Scope) -> str:
+    """ルーティングで一致したルートのテンプレート（Starlette の OpenTelemetry 連携と同じ求め方）"""
+    path_format = getattr(scope.get("route"), "path_format", None)
+    if not isinstance(path_format, str):
+        return UNMATCHED_ROUTE
+    return scope.get("root_path", "").rstrip("/") + path_format or "/"
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound)) if isinstance(bound, float) else str(bound)
+
+
+class MetricsRegistry:
+    """HTTPリクエストの計測値（ルートごとのレスポンス時間・ステータス・サイズと処理中の件数）
+
+    ルートはパスそのものではなくテンプレート（/api/v1/restaurants/{restaurant_id}）で
+    集計し、ラベルの種類が増え続けないようにする。計測値はプロセスごとに保持する。
+    """
+
+    def __init__(self) -> None:
+        self.routes: dict[tuple[str, str], RouteMetrics] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float, size: int) -> None:
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[(method, route)] = RouteMetrics()
+        metrics.latency.observe(seconds)
+        metrics.size.observe(size)
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def clear(self) -> None:
+        self.routes.clear()
+
+    def _histogram_lines(
+        self, name: str, histograms: list[tuple[str, Histogram]]
+    ) -> list[str]:
+        lines: list[str] = []
+        for labels, histogram in histograms:
+            cumulative = 0
+            # counts は最後に +Inf のバケットを持つため、bounds より1つ多い
+            for bound, count in zip(histogram.bounds, histogram.counts, strict=False):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{{{labels},le="{_format_bound(bound)}"}} {cumulative}'
+                )
+            cumulative += histogram.counts[-1]
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+    def render(self) -> str:
+        """Prometheus のテキスト形式で出力する"""
+        routes = sorted(self.routes.items())
+        labelled = [
+            (f'method="{_escape(method)}",route="{_escape(route)}"', metrics)
+            for (method, route), metrics in routes
+        ]
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being processed.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_requests_total Requests by route template and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        for labels, metrics in labelled:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(f'http_requests_total{{{labels},status="{status}"}} {count}')
+        lines += [
+            "# HELP http_request_duration_seconds Request latency by route template.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        lines += self._histogram_lines(
+            "http_request_duration_seconds",
+            [(labels, metrics.latency) for labels, metrics in labelled],
+        )
+        lines += [
+            "# HELP http_response_size_bytes Response body size by route template.",
+            "# TYPE http_response_size_bytes histogram",
+        ]
+        lines += self._histogram_lines(
+            "http_response_size_bytes", [(labels, metrics.size) for labels, metrics in labelled]
+        )
+        return "\n".join(lines) + "\n"
+
+    def stats(self) -> dict[str, Any]:
+        return {"routes": len(self.routes), "in_flight": self.in_flight}
+
+
+class MetricsMiddleware:
+    """HTTPリクエストごとにレスポンス時間・ステータス・レスポンスサイズを記録するASGIミドルウェア
+
+    BaseHTTPMiddleware を使わず、send をラップしてステータスと本文のバイト数だけを拾う
+    （リクエスト・レスポンスのオブジェクトを作らない）。ルートのテンプレートは、
+    ルーティング時に scope に設定される route から、処理の完了後に求める。
+    """
+
+    def __init__(self, app: ASGIApp, *, registry: MetricsRegistry) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            elif message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            registry.in_flight -= 1
+            registry.observe(scope["method"], route_template(scope), status, elapsed, size)
+
+
+metrics_registry = MetricsRegistry()
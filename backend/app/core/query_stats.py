@@ -0,0 +1,132 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+# バインドパラメータ（$1::VARCHAR など）と、その並び（IN の要素数の違い）をまとめる
+_PARAMETER_LIST = re.compile(r"\$\d+(?:::[\w\[\]]+)?(?:, \$\d+(?:::[\w\[\]]+)?)*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """パラメータとその個数を除いたSQLの形（同じ形のSQLの繰り返しを数えるためのキー）"""
+    return _WHITESPACE.sub(" ", _PARAMETER_LIST.sub("?", statement)).strip()
+
+
+class RequestQueries:
+    """1リクエストの中で実行されたSQLの件数・合計時間・SQLごとの実行回数"""
+
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        # 実行時点では文字列のまま数え、形へのまとめはリクエストの終了時に行う
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def shapes(self) -> Counter[str]:
+        shapes: Counter[str] = Counter()
+        for statement, count in self.statements.items():
+            shapes[statement_shape(statement)] += count
+        return shapes
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"'
+
+
+_current_queries: ContextVar[RequestQueries | None] = ContextVar(
+    "current_queries", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # 開始時刻は実行ごとのコンテキストに持たせる（失敗したSQLの時刻が接続に残らないように）
+    if context is not None and _current_queries.get() is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    queries = _current_queries.get()
+    started = getattr(context, "_query_started", None)
+    if queries is not None and started is not None:
+        queries.record(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """エンジンで実行されるSQLを、実行中のリクエストに記録するイベントを登録する
+
+    イベントは同期エンジンで発火するが、SQLAlchemy の非同期実行は呼び出し元の
+    コンテキストを引き継ぐため、ContextVar からリクエストを参照できる。
+    リクエストの外（バックグラウンドジョブなど）で実行されたSQLは記録しない。
+    """
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """リクエストごとのSQLの件数・合計時間を Server-Timing ヘッダーで返すASGIミドルウェア
+
+    リクエストの終了時に、SQLの件数が query_budget を超えた場合と、同じ形のSQLが
+    repeat_threshold 回以上実行された場合（N+1 の可能性）に警告を出力する。
+    ヘッダーはレスポンスの開始時点までの件数で、ストリーミング中のSQLは警告にのみ含まれる。
+    """
+
+    def __init__(self, app: ASGIApp, *, query_budget: int, repeat_threshold: int) -> None:
+        self.app = app
+        self.query_budget = query_budget
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(SERVER_TIMING_HEADER, queries.server_timing())
+            await send(message)
+
+        token = _current_queries.set(queries)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_queries.reset(token)
+            self._check(scope, queries)
+
+    def _check(self, scope: Scope, queries: RequestQueries) -> None:
+        if not queries.count:
+            return
+        request = f"{scope['method']} {route_template(scope)}"
+        if self.query_budget and queries.count > self.query_budget:
+            logger.warning(
+                f"{request} でSQLが{queries.count}件実行されました"
+                f"（上限 {self.query_budget}件、合計 {queries.seconds * 1000:.1f}ms）"
+            )
+        if self.repeat_threshold:
+            for shape, count in queries.shapes().most_common():
+                if count < self.repeat_threshold:
+                    break
+                logger.warning(
+                    f"{request} で同じ形のSQLが{count}回実行されました（N+1の可能性）: {shape[:200]}"
+                )
+
@@ -1,6 +1,10 @@
+import asyncio
 import secrets
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, TypeVar
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -12,6 +16,8 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # リフレッシュトークンの有効期限（7日間）
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+T = TypeVar("T")
+
 
 def create_access_token(subject: str | Any, expires_delta: timedelta | None = None) -> str:
     if expires_delta:
@@ -47,6 +53,15 @@ def verify_refresh_token(token: str) -> dict[str, Any] | None:
         return None
 
 
+def get_token_subject(token: str) -> str | None:
+    """アクセストークンを検証し、subject（ユーザーID）を返す。無効な場合はNone。"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
 def create_password_reset_token() -> str:
     """パスワードリセット用のセキュアなトークンを生成する。"""
     return secrets.token_urlsafe(32)
@@ -58,3 +73,99 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+class PasswordHasher:
+    """bcryptによるハッシュ化・検証をワーカープールで実行する非同期ファサード
+
+    bcryptは1回あたり数百ミリ秒CPUを使うため、イベントループ上で実行すると
+    その間ほかのリクエストが処理できなくなる。ワーカープールに逃がしつつ、
+    同時実行数をセマフォで制限し、待ち行列の長さを計測する。
+
+    executor:
+        "thread"  - スレッドプール（bcryptはGILを解放するため通常はこれで十分）
+        "process" - プロセスプール
+        "inline"  - イベントループ上で直接実行（従来の動作。比較計測用）
+    """
+
+    def __init__(self, executor: str, max_workers: int, max_concurrency: int) -> None:
+        if executor not in ("thread", "process", "inline"):
+            raise ValueError(f"Unknown password hash executor: {executor}")
+        self.executor_kind = executor
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency or max_workers
+        self._executor: Executor | None = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.executor_kind == "inline":
+            return func(*args)
+
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        queued_at = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+
+        wait_seconds = time.perf_counter() - queued_at
+        self.total_wait_seconds += wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "executor": self.executor_kind,
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "completed": self.completed,
+            "avg_wait_ms": (
+                self.total_wait_seconds / self.completed * 1000 if self.completed else 0.0
+            ),
+            "max_wait_ms": self.max_wait_seconds * 1000,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY,
+)
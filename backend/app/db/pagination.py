@@ -0,0 +1,106 @@
+import base64
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Any
+
+from sqlalchemy import Date, DateTime, Select, Time, and_, or_, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+# 次ページのカーソルを返すレスポンスヘッダー
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    """ページングカーソルが不正"""
+
+
+def _parse_value(column: InstrumentedAttribute, value: Any) -> Any:
+    column_type = column.property.columns[0].type
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Date):
+        return date.fromisoformat(value)
+    if isinstance(column_type, Time):
+        return time.fromisoformat(value)
+    return value
+
+
+def _format_value(value: Any) -> Any:
+    if isinstance(value, date | time | datetime):
+        return value.isoformat()
+    return value
+
+
+@dataclass(frozen=True)
+class KeysetOrder:
+    """キーセット（カーソル）ページングの並び順
+
+    columns は (カラム, 降順か) の組。最後のカラムは一意であること（通常はid）。
+    前ページ最後の行のキーより後ろの行を条件で絞り込むため、OFFSETと違い
+    ページの深さによらず、対応するインデックスを先頭から読むだけで済む。
+    """
+
+    name: str
+    columns: tuple[tuple[InstrumentedAttribute, bool], ...]
+
+    def order_by(self) -> list[Any]:
+        return [
+            column.desc() if descending else column.asc() for column, descending in self.columns
+        ]
+
+    def encode(self, row: Any) -> str:
+        """行のキーから不透明なカーソル文字列を作る"""
+        values = [_format_value(getattr(row, column.key)) for column, _ in self.columns]
+        payload = json.dumps({"k": self.name, "v": values}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> list[Any]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if payload["k"] != self.name or len(payload["v"]) != len(self.columns):
+                raise InvalidCursorError("カーソルが不正です")
+            return [
+                _parse_value(column, value)
+                for (column, _), value in zip(self.columns, payload["v"], strict=True)
+            ]
+        except (ValueError, KeyError, TypeError) as e:
+            raise InvalidCursorError("カーソルが不正です") from e
+
+    def _after(self, values: Sequence[Any]) -> Any:
+        columns = [column for column, _ in self.columns]
+        directions = {descending for _, descending in self.columns}
+        if len(directions) == 1:
+            # 並び順がすべて同じ向きなら行値比較でインデックスの範囲検索になる
+            if directions.pop():
+                return tuple_(*columns) < tuple_(*values)
+            return tuple_(*columns) > tuple_(*values)
+
+        # 向きが混在する場合は (a < x) OR (a = x AND (b > y OR ...)) に展開する
+        condition = None
+        pairs = list(zip(self.columns, values, strict=True))
+        for (column, descending), value in reversed(pairs):
+            beyond = column < value if descending else column > value
+            if condition is None:
+                condition = beyond
+            else:
+                condition = or_(beyond, and_(column == value, condition))
+        # 先頭カラムの範囲条件を重ねて、インデックスの読み始め位置を決められるようにする
+        first_column, first_descending = self.columns[0]
+        first_bound = first_column <= values[0] if first_descending else first_column >= values[0]
+        return and_(first_bound, condition)
+
+    def apply(self, query: Select, cursor: str | None) -> Select:
+        """並び順と、カーソル以降の行に絞り込む条件をクエリに付与する"""
+        if cursor:
+            query = query.where(self._after(self.decode(cursor)))
+        return query.order_by(*self.order_by())
+
+
+def next_cursor(order: KeysetOrder, rows: Sequence[Any], limit: int) -> str | None:
+    """ページが埋まっていれば、次ページ用のカーソルを返す"""
+    if limit <= 0 or len(rows) < limit:
+        return None
+    return order.encode(rows[-1])
@@ -0,0 +1,133 @@
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class PoolProfile:
+    """コネクションプールとasyncpgドライバの設定"""
+
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float
+    pool_recycle: int
+    pool_pre_ping: bool
+    statement_cache_size: int
+    pgbouncer: bool
+
+    @classmethod
+    def from_settings(cls) -> "PoolProfile":
+        return cls(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+            pgbouncer=settings.DB_PGBOUNCER_MODE,
+        )
+
+    def engine_kwargs(self) -> dict[str, Any]:
+        """create_async_engine に渡すプール関連の引数"""
+        return {
+            "poolclass": InstrumentedAsyncPool,
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+        }
+
+    def connect_args(self) -> dict[str, Any]:
+        """asyncpg.connect に渡す引数
+
+        PgBouncer（トランザクションプーリング）経由では、サーバー接続が
+        トランザクションごとに入れ替わるため、プリペアドステートメントを
+        キャッシュできない。キャッシュを無効にし、ステートメント名を一意にする。
+        """
+        if self.pgbouncer:
+            return {
+                "statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        return {"statement_cache_size": self.statement_cache_size}
+
+    def url_query(self) -> dict[str, str]:
+        """SQLAlchemy側のプリペアドステートメントキャッシュの設定（URLクエリ）"""
+        size = 0 if self.pgbouncer else self.statement_cache_size
+        return {"prepared_statement_cache_size": str(size)}
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """接続取得の待ち時間を計測するコネクションプール"""
+
+    def __init__(self, *args: Any, max_overflow: int = 10, **kwargs: Any) -> None:
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        # 負の値はオーバーフローの上限なし（プールが枯渇して待つことはない）
+        self.max_overflow = max_overflow
+        self.checkouts = 0
+        self.failed_checkouts = 0
+        # プールが枯渇していて空きを待った取得の件数・待ち時間
+        self.waiting = 0
+        self.waits = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _is_exhausted(self) -> bool:
+        if self.max_overflow < 0:
+            return False
+        return self.checkedin() == 0 and self.overflow() >= self.max_overflow
+
+    def _do_get(self) -> Any:
+        self.checkouts += 1
+        if not self._is_exhausted():
+            try:
+                return super()._do_get()
+            except Exception:
+                self.failed_checkouts += 1
+                raise
+
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            self.failed_checkouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.waiting -= 1
+            self.waits += 1
+            self.total_wait_seconds += elapsed
+            self.max_wait_seconds = max(self.max_wait_seconds, elapsed)
+
+    def telemetry(self) -> dict[str, Any]:
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self.max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "waiting": self.waiting,
+            "checkouts": self.checkouts,
+            "failed_checkouts": self.failed_checkouts,
+            "waits": self.waits,
+            "avg_wait_ms": (
+                round(self.total_wait_seconds / self.waits * 1000, 3) if self.waits else 0.0
+            ),
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+        }
+
+
+def pool_telemetry(engine: AsyncEngine) -> dict[str, Any]:
+    """エンジンのプールの稼働状況（使用中・オーバーフロー・待ち時間）を返す"""
+    pool = engine.pool
+    if isinstance(pool, InstrumentedAsyncPool):
+        return pool.telemetry()
+    return {"status": pool.status()}
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+from http.cookies import SimpleCookie
+from typing import Any
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import TTLCache
+from app.core.security import get_token_subject
+
+logger = logging.getLogger(__name__)
+
+# 直前に書き込みを行ったクライアントに付与するCookie（値はプライマリ参照を続ける期限のUNIX時刻）
+READ_YOUR_WRITES_COOKIE = "db_primary_until"
+
+# レプリカのセッションであることを示す Session.info のキー
+REPLICA_SESSION_KEY = "replica"
+
+# 書き込みを伴わないHTTPメソッド
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# レプリカの遅延（秒）。WALをすべて再生済みの場合は0とする
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+def is_replica_session(db: AsyncSession) -> bool:
+    """レプリカに接続しているセッションかどうか（キャッシュへの書き込み可否の判定に使う）"""
+    return bool(db.info.get(REPLICA_SESSION_KEY))
+
+
+def _bearer_subject(request: Request) -> str | None:
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return get_token_subject(token)
+
+
+class ReplicaRouter:
+    """読み取り専用リクエストをレプリカとプライマリに振り分ける
+
+    次の場合はプライマリを使う。
+    - レプリカが設定されていない、または遅延の確認に失敗した
+    - レプリカの遅延が許容値を超えている
+    - クライアントが直前に書き込みを行った（read-your-writes）
+      Cookieを送るクライアントはCookieで、Bearerトークンのみのクライアントは
+      プロセス内に記録したユーザーIDで判定する
+    """
+
+    def __init__(
+        self,
+        *,
+        replica_engine: AsyncEngine | None,
+        max_lag_seconds: float,
+        lag_check_interval_seconds: float,
+        read_your_writes_seconds: int,
+    ) -> None:
+        self.replica_engine = replica_engine
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_interval_seconds = lag_check_interval_seconds
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self._recent_writers: TTLCache[str, bool] = TTLCache(
+            maxsize=100_000, ttl_seconds=read_your_writes_seconds
+        )
+        self._lag_seconds: float | None = None
+        self._lag_checked_at = 0.0
+        self._lag_lock = asyncio.Lock()
+        self.routed: dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica_engine is not None
+
+    async def replica_lag(self) -> float | None:
+        """レプリカの遅延（秒）を返す。確認に失敗した場合はNone
+
+        問い合わせ結果は lag_check_interval_seconds の間使い回す。
+        """
+        if self.replica_engine is None:
+            return None
+        if time.monotonic() - self._lag_checked_at < self.lag_check_interval_seconds:
+            return self._lag_seconds
+
+        async with self._lag_lock:
+            # ロック待ちの間に他のリクエストが確認済みであればその結果を使う
+            if time.monotonic() - self._lag_checked_at < self.lag_check_interval_seconds:
+                return self._lag_seconds
+            try:
+                async with self.replica_engine.connect() as conn:
+                    lag = (await conn.execute(REPLICA_LAG_SQL)).scalar()
+                self._lag_seconds = float(lag or 0)
+            except Exception as e:
+                logger.warning(f"レプリカの遅延確認に失敗しました: {e}")
+                self._lag_seconds = None
+            self._lag_checked_at = time.monotonic()
+        return self._lag_seconds
+
+    def mark_write(self, request: Request) -> None:
+        """書き込みを行ったクライアントを記録する（ミドルウェアから呼ぶ）"""
+        subject = _bearer_subject(request)
+        if subject:
+            self._recent_writers.set(subject, True)
+
+    def wrote_recently(self, request: Request) -> bool:
+        until = request.cookies.get(READ_YOUR_WRITES_COOKIE)
+        if until:
+            try:
+                if float(until) > time.time():
+                    return True
+            except ValueError:
+                pass
+        subject = _bearer_subject(request)
+        return bool(subject and self._recent_writers.get(subject))
+
+    async def choose(self, request: Request) -> str:
+        """"replica" または "primary" を返す"""
+        if not self.enabled:
+            target, reason = "primary", "not_configured"
+        elif self.wrote_recently(request):
+            target, reason = "primary", "read_your_writes"
+        else:
+            lag = await self.replica_lag()
+            if lag is None:
+                target, reason = "primary", "replica_unavailable"
+            elif lag > self.max_lag_seconds:
+                target, reason = "primary", "replica_lagging"
+            else:
+                target, reason = "replica", "replica"
+        self.routed[reason] = self.routed.get(reason, 0) + 1
+        return target
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "max_lag_seconds": self.max_lag_seconds,
+            "last_lag_seconds": self._lag_seconds,
+            "read_your_writes_seconds": self.read_your_writes_seconds,
+            "recent_writers": len(self._recent_writers),
+            "routed": dict(self.routed),
+        }
+
+
+class ReadYourWritesMiddleware:
+    """書き込みに成功したクライアントを、しばらくの間プライマリから読ませるASGIミドルウェア
+
+    レスポンスの開始時にステータスを見て記録とCookieの付与を行うため、
+    ストリーミングのレスポンスも本文をバッファせずにそのまま流す。
+    excluded_prefix 配下（認証系）はレプリカ経由の読み取りに影響しないため対象外。
+    """
+
+    def __init__(self, app: ASGIApp, *, router: ReplicaRouter, excluded_prefix: str) -> None:
+        self.app = app
+        self.router = router
+        self.excluded_prefix = excluded_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+            or scope["path"].startswith(self.excluded_prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                self.router.mark_write(Request(scope))
+                headers = MutableHeaders(scope=message)
+                headers.append("set-cookie", self._cookie())
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _cookie(self) -> str:
+        seconds = self.router.read_your_writes_seconds
+        cookie: SimpleCookie = SimpleCookie()
+        cookie[READ_YOUR_WRITES_COOKIE] = str(int(time.time()) + seconds)
+        cookie[READ_YOUR_WRITES_COOKIE]["max-age"] = seconds
+        cookie[READ_YOUR_WRITES_COOKIE]["path"] = "/"
+        cookie[READ_YOUR_WRITES_COOKIE]["httponly"] = True
+        cookie[READ_YOUR_WRITES_COOKIE]["samesite"] = "lax"
+        return cookie.output(header="").strip()
@@ -1,22 +1,58 @@
 import ssl
 from collections.abc import AsyncGenerator
 
+from fastapi import Request
+from sqlalchemy import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
+from app.core.query_stats import instrument_engine
+from app.db.pool import PoolProfile
+from app.db.replica import REPLICA_SESSION_KEY, ReplicaRouter
 
 # Create SSL context for Neon PostgreSQL
 ssl_context = ssl.create_default_context()
 ssl_context.check_hostname = False
 ssl_context.verify_mode = ssl.CERT_NONE
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    connect_args={"ssl": ssl_context},
-)
+pool_profile = PoolProfile.from_settings()
+
+
+def _create_engine(url: str):
+    created = create_async_engine(
+        make_url(url).update_query_dict(pool_profile.url_query()),
+        echo=settings.SQL_ECHO,
+        connect_args={"ssl": ssl_context, **pool_profile.connect_args()},
+        **pool_profile.engine_kwargs(),
+    )
+    if settings.QUERY_STATS_ENABLED:
+        instrument_engine(created)
+    return created
+
+
+engine = _create_engine(settings.DATABASE_URL)
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+replica_engine = (
+    _create_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else None
+)
+replica_session_maker = (
+    async_sessionmaker(
+        replica_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        info={REPLICA_SESSION_KEY: True},
+    )
+    if replica_engine is not None
+    else None
+)
+replica_router = ReplicaRouter(
+    replica_engine=replica_engine,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    lag_check_interval_seconds=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+    read_your_writes_seconds=settings.READ_YOUR_WRITES_SECONDS,
+)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
@@ -24,3 +60,24 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             yield session
         finally:
             await session.close()
+
+
+async def get_read_session_maker(request: Request) -> async_sessionmaker[AsyncSession]:
+    """読み取り用のセッションファクトリ（レプリカが利用可能ならレプリカ）を返す"""
+    if await replica_router.choose(request) == "replica" and replica_session_maker is not None:
+        return replica_session_maker
+    return async_session_maker
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """読み取り専用エンドポイント用のセッション
+
+    レプリカが利用可能ならレプリカに、そうでなければプライマリに接続する。
+    このセッションで書き込みを行わないこと。
+    """
+    session_maker = await get_read_session_maker(request)
+    async with session_maker() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
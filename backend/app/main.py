@@ -1,17 +1,36 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.api.v1.router import api_router
 from app.core.config import settings
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, metrics_registry
+from app.core.query_stats import SERVER_TIMING_HEADER, QueryStatsMiddleware
+from app.core.security import password_hasher
+from app.db.pagination import NEXT_CURSOR_HEADER, InvalidCursorError
+from app.db.replica import ReadYourWritesMiddleware
+from app.db.session import engine, replica_engine, replica_router
+from app.services.payment_gateway import payment_gateway
+from app.services.reservation_completion import reservation_completion_job
+from app.services.webhook_inbox import webhook_inbox
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    await webhook_inbox.start()
+    await reservation_completion_job.start()
     yield
     # Shutdown
+    await reservation_completion_job.stop()
+    await webhook_inbox.stop()
+    password_hasher.shutdown()
+    await payment_gateway.aclose()
+    await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
 
 
 app = FastAPI(
@@ -27,8 +46,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, SERVER_TIMING_HEADER],
 )
 
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+
+# Read-your-writes Middleware（レプリカを使う場合のみ。書き込み直後の読み取りをプライマリへ）
+if replica_router.enabled:
+    app.add_middleware(
+        ReadYourWritesMiddleware,
+        router=replica_router,
+        excluded_prefix=f"{settings.API_V1_STR}/auth/",
+    )
+
+# Query Stats Middleware（リクエストごとのSQLの件数・時間）
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(
+        QueryStatsMiddleware,
+        query_budget=settings.QUERY_BUDGET_PER_REQUEST,
+        repeat_threshold=settings.REPEATED_QUERY_THRESHOLD,
+    )
+
+# Metrics Middleware（最も外側に置き、他のミドルウェアの処理時間も含めて計測する）
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -36,3 +82,11 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """ルートごとのレスポンス時間・ステータス・レスポンスサイズ（Prometheus のテキスト形式）"""
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("", status_code=status.HTTP_404_NOT_FOUND)
+    return PlainTextResponse(metrics_registry.render(), media_type=CONTENT_TYPE)
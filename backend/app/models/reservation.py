@@ -2,7 +2,7 @@ import uuid
 from datetime import date, time
 from enum import Enum
 
-from sqlalchemy import Date, ForeignKey, String, Time
+from sqlalchemy import Date, ForeignKey, Index, String, Time, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base, TimestampMixin
@@ -27,6 +27,52 @@ class PaymentStatus(str, Enum):
 
 class Reservation(Base, TimestampMixin):
     __tablename__ = "reservations"
+    __table_args__ = (
+        # 空席確認・売上集計（キャンセル以外の予約を店舗・日時で絞り込む）
+        Index(
+            "ix_reservations_active_slot",
+            "restaurant_id",
+            "reservation_date",
+            "reservation_time",
+            postgresql_include=["party_size", "amount", "payment_method", "duration_minutes"],
+            postgresql_where=text("status <> 'cancelled'"),
+        ),
+        # 店舗の予約一覧（予約日の降順）
+        Index(
+            "ix_reservations_restaurant_date",
+            "restaurant_id",
+            text("reservation_date DESC"),
+            "reservation_time",
+            "id",
+        ),
+        # 顧客の予約一覧（予約日時の降順）
+        Index(
+            "ix_reservations_customer_date",
+            "customer_id",
+            text("reservation_date DESC"),
+            text("reservation_time DESC"),
+            text("id DESC"),
+        ),
+        # 全予約一覧（予約日時の降順）
+        Index(
+            "ix_reservations_date_time_id",
+            text("reservation_date DESC"),
+            text("reservation_time DESC"),
+            text("id DESC"),
+        ),
+        # 過去日の確定済み予約の自動完了（完了済みになった行はインデックスから外れる）
+        Index(
+            "ix_reservations_confirmed_date",
+            "reservation_date",
+            postgresql_where=text("status = 'confirmed'"),
+        ),
+        # Webhookでの決済確認
+        Index(
+            "ix_reservations_stripe_payment_intent_id",
+            "stripe_payment_intent_id",
+            postgresql_where=text("stripe_payment_intent_id IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -36,6 +82,8 @@ class Reservation(Base, TimestampMixin):
     reservation_date: Mapped[date] = mapped_column(Date)
     reservation_time: Mapped[time] = mapped_column(Time)
     party_size: Mapped[int] = mapped_column()
+    # 席を使う時間（分）。予約時点の店舗の利用時間を記録し、[予約時間, 予約時間 + 利用時間) を占有する
+    duration_minutes: Mapped[int] = mapped_column(server_default=text("120"))
     status: Mapped[str] = mapped_column(String(20), default=ReservationStatus.CONFIRMED.value)
     payment_method: Mapped[str] = mapped_column(String(20))
     payment_status: Mapped[str] = mapped_column(String(20), default=PaymentStatus.PENDING.value)
@@ -50,3 +98,39 @@ class Reservation(Base, TimestampMixin):
     restaurant: Mapped["Restaurant"] = relationship(  # noqa: F821
         back_populates="reservations"
     )
+
+
+class ReservationSeat(Base, TimestampMixin):
+    """予約に割り当てた席
+
+    キャンセル以外の予約ごとに、案内する席（組み合わせの場合は複数）を1行ずつ持つ。
+    キャンセル時に削除する。同じ席が同じ開始時刻に二重に割り当てられないよう一意制約を置く
+    （利用時間の重なりは予約作成時に店舗・予約日単位のロック内で確認する）。
+    """
+
+    __tablename__ = "reservation_seats"
+    __table_args__ = (
+        UniqueConstraint(
+            "seat_id",
+            "reservation_date",
+            "reservation_time",
+            name="uq_reservation_seats_seat_slot",
+        ),
+        # 予約枠ごとの使用中の席
+        Index(
+            "ix_reservation_seats_slot",
+            "restaurant_id",
+            "reservation_date",
+            "reservation_time",
+        ),
+    )
+
+    reservation_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("reservations.id", ondelete="CASCADE"), primary_key=True
+    )
+    seat_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("seats.id", ondelete="CASCADE"), primary_key=True
+    )
+    restaurant_id: Mapped[str] = mapped_column(String(36), ForeignKey("restaurants.id"))
+    reservation_date: Mapped[date] = mapped_column(Date)
+    reservation_time: Mapped[time] = mapped_column(Time)
@@ -1,7 +1,7 @@
 import uuid
 from enum import Enum
 
-from sqlalchemy import ForeignKey, String, Text
+from sqlalchemy import Computed, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base, TimestampMixin
@@ -15,11 +15,17 @@ class RestaurantStatus(str, Enum):
 
 class Restaurant(Base, TimestampMixin):
     __tablename__ = "restaurants"
+    __table_args__ = (
+        # 店舗一覧（ステータスで絞り込み、登録順にキーセットページング）
+        Index("ix_restaurants_status_created_at", "status", "created_at", "id"),
+        # キーワード検索用のトライグラムインデックス（ix_restaurants_search_document_trgm）は
+        # pg_trgm が使えるサーバーにだけマイグレーションで作成するため、ここでは宣言しない
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
-    owner_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"))
+    owner_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), index=True)
     name: Mapped[str] = mapped_column(String(100))
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     genre: Mapped[str] = mapped_column(String(50))
@@ -31,6 +37,16 @@ class Restaurant(Base, TimestampMixin):
     closing_days: Mapped[str | None] = mapped_column(String(100), nullable=True)
     image_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
     status: Mapped[str] = mapped_column(String(20), default=RestaurantStatus.PENDING.value)
+    # 1組が席を使う時間（分）。Noneの場合は DEFAULT_DINING_DURATION_MINUTES
+    dining_duration_minutes: Mapped[int | None] = mapped_column(nullable=True)
+    # キーワード検索の対象（店名・ジャンル・エリア・説明）を連結した生成列
+    search_document: Mapped[str] = mapped_column(
+        Text,
+        Computed(
+            "name || ' ' || genre || ' ' || area || ' ' || coalesce(description, '')",
+            persisted=True,
+        ),
+    )
 
     # Relationships
     owner: Mapped["User"] = relationship(back_populates="store")  # noqa: F821
@@ -46,9 +62,13 @@ class Seat(Base, TimestampMixin):
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
-    restaurant_id: Mapped[str] = mapped_column(String(36), ForeignKey("restaurants.id"))
+    restaurant_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("restaurants.id"), index=True
+    )
     name: Mapped[str] = mapped_column(String(50))
     capacity: Mapped[int] = mapped_column()
+    # 同じグループの席どうしは組み合わせて1組に案内できる（Noneは組み合わせ不可）
+    combine_group: Mapped[str | None] = mapped_column(String(50), nullable=True)
 
     # Relationships
     restaurant: Mapped["Restaurant"] = relationship(back_populates="seats")
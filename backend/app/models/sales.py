@@ -0,0 +1,27 @@
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base, TimestampMixin
+
+
+class DailySales(Base, TimestampMixin):
+    """店舗・日付・支払い方法ごとの売上ロールアップ
+
+    予約の作成・更新、決済確認・返金のたびに差分で更新される。
+    reservation_count / sales_amount はキャンセル以外の予約、
+    paid_amount / refunded_amount は決済済み・返金済みの予約の金額を集計する。
+    """
+
+    __tablename__ = "daily_sales"
+
+    restaurant_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("restaurants.id"), primary_key=True
+    )
+    sales_date: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    payment_method: Mapped[str] = mapped_column(String(20), primary_key=True)
+    reservation_count: Mapped[int] = mapped_column(default=0)
+    sales_amount: Mapped[int] = mapped_column(default=0)  # Amount in JPY
+    paid_amount: Mapped[int] = mapped_column(default=0)
+    refunded_amount: Mapped[int] = mapped_column(default=0)
@@ -0,0 +1,55 @@
+import uuid
+from datetime import date, datetime, time
+from enum import Enum
+
+from sqlalchemy import Date, DateTime, ForeignKey, Index, String, Time, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base, TimestampMixin
+
+
+class WaitlistStatus(str, Enum):
+    WAITING = "waiting"
+    PROMOTED = "promoted"
+    CANCELLED = "cancelled"
+
+
+class WaitlistEntry(Base, TimestampMixin):
+    """予約枠のキャンセル待ち
+
+    満席の (店舗, 予約日, 予約時間) に対する予約リクエストを登録順に保持する。
+    キャンセルで席が空くと、キャンセルと同じトランザクションで先頭から順に
+    案内できるリクエストを予約に変換し（promoted）、作成した予約を reservation_id に記録する。
+    """
+
+    __tablename__ = "waitlist_entries"
+    __table_args__ = (
+        # キャンセル時に、空いた時間帯と利用時間が重なる順番待ちを登録順に取り出す
+        Index(
+            "ix_waitlist_entries_waiting",
+            "restaurant_id",
+            "reservation_date",
+            "reservation_time",
+            "created_at",
+            postgresql_where=text("status = 'waiting'"),
+        ),
+        # 顧客のキャンセル待ち一覧
+        Index("ix_waitlist_entries_customer", "customer_id", text("created_at DESC")),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    customer_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"))
+    restaurant_id: Mapped[str] = mapped_column(String(36), ForeignKey("restaurants.id"))
+    reservation_date: Mapped[date] = mapped_column(Date)
+    reservation_time: Mapped[time] = mapped_column(Time)
+    party_size: Mapped[int] = mapped_column()
+    payment_method: Mapped[str] = mapped_column(String(20))
+    amount: Mapped[int] = mapped_column()  # Amount in JPY
+    notes: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    status: Mapped[str] = mapped_column(String(20), default=WaitlistStatus.WAITING.value)
+    reservation_id: Mapped[str | None] = mapped_column(
+        String(36), ForeignKey("reservations.id"), nullable=True
+    )
+    promoted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
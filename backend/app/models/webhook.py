@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import DateTime, Index, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base, TimestampMixin
+
+
+class WebhookEventStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSED = "processed"
+    DEAD = "dead"
+
+
+class WebhookEvent(Base, TimestampMixin):
+    """受信したWebhookイベントの受信箱
+
+    主キーはStripeのイベントIDで、同じイベントの再送は挿入時に無視される。
+    ワーカーは next_attempt_at を過ぎた pending のイベントを取り出して処理し、
+    失敗した場合は next_attempt_at を先送りして再試行、上限に達したら dead にする。
+    処理中のイベントも next_attempt_at を処理期限まで先送りしておくため、
+    ワーカーが処理中に停止しても期限を過ぎれば再び取り出される。
+    """
+
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        # 処理待ちイベントの取り出し
+        Index(
+            "ix_webhook_events_pending",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    type: Mapped[str] = mapped_column(String(100))
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB)
+    status: Mapped[str] = mapped_column(
+        String(20), default=WebhookEventStatus.PENDING.value, index=True
+    )
+    attempts: Mapped[int] = mapped_column(default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,6 +1,7 @@
 from datetime import date, datetime, time
+from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ReservationBase(BaseModel):
@@ -28,6 +29,7 @@ class ReservationResponse(ReservationBase):
     status: str
     payment_status: str
     stripe_payment_intent_id: str | None
+    duration_minutes: int
     created_at: datetime
     updated_at: datetime
 
@@ -42,3 +44,21 @@ class ReservationWithRestaurant(ReservationResponse):
 class ReservationWithCustomer(ReservationResponse):
     customer_name: str
     customer_email: str
+
+
+class ReservationBulkStatusUpdate(BaseModel):
+    reservation_ids: list[str] = Field(min_length=1, max_length=200)
+    status: Literal["completed", "cancelled"]
+
+
+class ReservationBulkStatusItem(BaseModel):
+    reservation_id: str
+    success: bool
+    status: str | None = None
+    error: str | None = None
+    message: str | None = None
+
+
+class ReservationBulkStatusResponse(BaseModel):
+    updated: int
+    results: list[ReservationBulkStatusItem]
@@ -1,11 +1,12 @@
-from datetime import datetime
+from datetime import date, datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class SeatBase(BaseModel):
     name: str
     capacity: int
+    combine_group: str | None = None
 
 
 class SeatCreate(SeatBase):
@@ -30,6 +31,8 @@ class RestaurantBase(BaseModel):
     opening_hours: str
     closing_days: str | None = None
     image_url: str | None = None
+    # 1組が席を使う時間（分）。未設定の場合はシステムの既定値
+    dining_duration_minutes: int | None = Field(default=None, ge=15, le=720)
 
 
 class RestaurantCreate(RestaurantBase):
@@ -47,6 +50,7 @@ class RestaurantUpdate(BaseModel):
     opening_hours: str | None = None
     closing_days: str | None = None
     image_url: str | None = None
+    dining_duration_minutes: int | None = Field(default=None, ge=15, le=720)
 
 
 class RestaurantResponse(RestaurantBase):
@@ -75,6 +79,34 @@ class RestaurantListResponse(BaseModel):
         from_attributes = True
 
 
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class RestaurantFacets(BaseModel):
+    """店舗一覧のジャンル別・エリア別の件数"""
+    total: int
+    genre: list[FacetCount]
+    area: list[FacetCount]
+
+
+class RestaurantFacetedListResponse(BaseModel):
+    items: list[RestaurantListResponse]
+    facets: RestaurantFacets
+
+
+class SalesBucket(BaseModel):
+    """期間（日・週・月）ごとの売上"""
+    period_start: date
+    total_sales: int
+    total_reservations: int
+    online_sales: int
+    online_reservations: int
+    onsite_sales: int
+    onsite_reservations: int
+
+
 class RestaurantSalesResponse(BaseModel):
     """店舗売上レスポンススキーマ"""
     restaurant_id: str
@@ -86,6 +118,8 @@ class RestaurantSalesResponse(BaseModel):
     online_reservations: int
     onsite_sales: int
     onsite_reservations: int
+    granularity: str | None = None
+    series: list[SalesBucket] = []
 
 
 class AvailabilityResponse(BaseModel):
@@ -96,3 +130,28 @@ class AvailabilityResponse(BaseModel):
     time: str
     party_size: int
     message: str | None = None
+
+
+class AvailabilitySlot(BaseModel):
+    """空席カレンダーの1枠"""
+    time: str
+    reserved: int
+    remaining_capacity: int
+    available: bool
+
+
+class AvailabilityDay(BaseModel):
+    """空席カレンダーの1日分"""
+    date: str
+    slots: list[AvailabilitySlot]
+
+
+class AvailabilityGridResponse(BaseModel):
+    """空席カレンダーレスポンススキーマ"""
+    restaurant_id: str
+    party_size: int
+    interval_minutes: int
+    dining_duration_minutes: int = 0
+    total_capacity: int
+    days: list[AvailabilityDay] = []
+    message: str | None = None
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from app.schemas.reservation import ReservationBase
+
+
+class WaitlistCreate(ReservationBase):
+    pass
+
+
+class WaitlistEntryResponse(ReservationBase):
+    id: str
+    customer_id: str
+    status: str
+    reservation_id: str | None
+    promoted_at: datetime | None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,371 @@
+import logging
+import time as time_module
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, time
+from typing import Any
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.replica import is_replica_session
+from app.models.reservation import Reservation
+from app.models.restaurant import Restaurant, Seat
+from app.services.occupancy import (
+    DayKey,
+    DayOccupancy,
+    Stay,
+    build_days,
+    dining_duration,
+    stays_query,
+    to_minutes,
+)
+from app.services.table_assignment import SeatSpec, TableLayout
+
+logger = logging.getLogger(__name__)
+
+# 整合性チェックで一度に照合する店舗・予約日の数
+CONSISTENCY_CHECK_CHUNK_SIZE = 500
+
+
+@dataclass
+class RestaurantCapacity:
+    """店舗のステータス・席構成・1組の利用時間（分）のスナップショット"""
+
+    status: str
+    layout: TableLayout
+    dining_duration_minutes: int
+    loaded_at: float
+
+    @property
+    def seat_count(self) -> int:
+        return self.layout.seat_count
+
+    @property
+    def total_capacity(self) -> int:
+        return self.layout.total_capacity
+
+
+@dataclass
+class DayEntry:
+    """店舗の1日分の予約の利用時間帯（キャンセル以外）
+
+    席のビットセットは layout の席の並びに対応する。店舗の席構成が変わった場合は読み込み直す。
+    """
+
+    occupancy: DayOccupancy
+    layout: TableLayout
+    loaded_at: float
+
+
+def _seat_layout(rows: Any) -> TableLayout:
+    return TableLayout.from_seats(
+        SeatSpec(id=row.seat_id, capacity=row.capacity, combine_group=row.combine_group)
+        for row in rows
+        if row.seat_id is not None
+    )
+
+
+def _restaurant_seats_query() -> Any:
+    return select(
+        Restaurant.id,
+        Restaurant.status,
+        Restaurant.dining_duration_minutes,
+        Seat.id.label("seat_id"),
+        Seat.capacity,
+        Seat.combine_group,
+    ).outerjoin(Seat, Seat.restaurant_id == Restaurant.id)
+
+
+class CapacityLedger:
+    """店舗の席構成と、(店舗ID, 予約日) ごとの予約の利用時間帯を保持するプロセス内台帳
+
+    - 初回参照時にDBから読み込む（遅延ウォームアップ）
+    - 予約作成・更新、席の追加・削除時にライトスルーで更新する
+    - 他プロセスでの更新はTTL経過後の再読み込みと整合性チェックで吸収する
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._restaurants: dict[str, RestaurantCapacity] = {}
+        self._days: dict[DayKey, DayEntry] = {}
+        # ライトスルー更新の世代番号。読み込み中に更新が入った場合は結果をキャッシュしない
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _is_fresh(self, loaded_at: float) -> bool:
+        return time_module.monotonic() - loaded_at < self.ttl_seconds
+
+    async def get_restaurant(
+        self, db: AsyncSession, *, restaurant_id: str
+    ) -> RestaurantCapacity | None:
+        """店舗のステータス・席構成・利用時間を返す。店舗が存在しない場合はNone"""
+        entry = self._restaurants.get(restaurant_id)
+        if entry is not None and self._is_fresh(entry.loaded_at):
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        generation = self._generation
+        result = await db.execute(
+            _restaurant_seats_query().where(Restaurant.id == restaurant_id)
+        )
+        rows = result.all()
+        if not rows:
+            self._restaurants.pop(restaurant_id, None)
+            return None
+
+        entry = RestaurantCapacity(
+            status=rows[0].status,
+            layout=_seat_layout(rows),
+            dining_duration_minutes=dining_duration(rows[0].dining_duration_minutes),
+            loaded_at=time_module.monotonic(),
+        )
+        # レプリカから読んだ値は古い可能性があるためキャッシュしない
+        if generation == self._generation and not is_replica_session(db):
+            self._restaurants[restaurant_id] = entry
+        return entry
+
+    async def get_day(
+        self,
+        db: AsyncSession,
+        *,
+        restaurant_id: str,
+        reservation_date: date,
+        layout: TableLayout,
+    ) -> DayOccupancy:
+        """指定日の予約（キャンセル以外）の利用時間帯と使用する席を返す"""
+        key = (restaurant_id, reservation_date)
+        entry = self._days.get(key)
+        if (
+            entry is not None
+            and self._is_fresh(entry.loaded_at)
+            and (entry.layout is layout or entry.layout == layout)
+        ):
+            self.hits += 1
+            return entry.occupancy
+
+        self.misses += 1
+        generation = self._generation
+        result = await db.execute(
+            stays_query().where(
+                Reservation.restaurant_id == restaurant_id,
+                Reservation.reservation_date == reservation_date,
+            )
+        )
+        occupancy = build_days(result.all(), lambda _: layout).get(key, DayOccupancy())
+        if generation == self._generation and not is_replica_session(db):
+            self._days[key] = DayEntry(
+                occupancy=occupancy, layout=layout, loaded_at=time_module.monotonic()
+            )
+        return occupancy
+
+    @property
+    def generation(self) -> int:
+        """ライトスルー更新の世代番号（DB読み込み前に取得し、prime_daysに渡す）"""
+        return self._generation
+
+    def prime_days(
+        self,
+        *,
+        restaurant_id: str,
+        days: dict[date, DayOccupancy],
+        layout: TableLayout,
+        generation: int,
+    ) -> None:
+        """一括読み込みの結果（日ごとの予約の利用時間帯）で台帳をウォームアップする
+
+        読み込み中にライトスルー更新が入った場合は、結果が古い可能性があるため何もしない。
+        """
+        if generation != self._generation:
+            return
+        now = time_module.monotonic()
+        for reservation_date, occupancy in days.items():
+            self._days[(restaurant_id, reservation_date)] = DayEntry(
+                occupancy=occupancy, layout=layout, loaded_at=now
+            )
+
+    def apply_reservation(
+        self,
+        *,
+        restaurant_id: str,
+        reservation_date: date,
+        reservation_id: str,
+        reservation_time: time,
+        duration_minutes: int,
+        party_size: int,
+        seat_ids: Iterable[str] = (),
+    ) -> None:
+        """予約の作成（キャンセルの取り消し）を台帳に反映する（コミット後に呼ぶ）"""
+        self._generation += 1
+        entry = self._days.get((restaurant_id, reservation_date))
+        if entry is not None:
+            start = to_minutes(reservation_time)
+            entry.occupancy.add(
+                reservation_id,
+                Stay(
+                    start=start,
+                    end=start + duration_minutes,
+                    party_size=party_size,
+                    seats=entry.layout.mask(seat_ids),
+                ),
+            )
+
+    def release_reservation(
+        self, *, restaurant_id: str, reservation_date: date, reservation_id: str
+    ) -> None:
+        """予約のキャンセルを台帳に反映する（コミット後に呼ぶ）"""
+        self._generation += 1
+        entry = self._days.get((restaurant_id, reservation_date))
+        if entry is not None:
+            entry.occupancy.remove(reservation_id)
+
+    def invalidate_restaurant(self, restaurant_id: str) -> None:
+        """店舗情報を破棄し、次回参照時に再読み込みさせる（席の追加・削除時もこれを呼ぶ）
+
+        日ごとの利用時間帯は、次回参照時に席構成の変化を検出して読み込み直される。
+        """
+        self._generation += 1
+        self._restaurants.pop(restaurant_id, None)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._restaurants.clear()
+        self._days.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "restaurants": len(self._restaurants),
+            "days": len(self._days),
+            "hits": self.hits,
+            "misses": self.misses,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    async def check_consistency(self, db: AsyncSession, *, repair: bool = False) -> dict[str, Any]:
+        """台帳の内容をDBと照合し、ずれ（ドリフト）を報告する
+
+        Args:
+            db: データベースセッション
+            repair: Trueの場合、ずれていた項目をDBの値で上書きする
+
+        Returns:
+            照合件数とずれていた項目の一覧
+        """
+        generation = self._generation
+        restaurant_drifts: list[dict[str, Any]] = []
+        day_drifts: list[dict[str, Any]] = []
+
+        restaurant_ids = list(self._restaurants)
+        seat_rows: dict[str, list[Any]] = {}
+        for i in range(0, len(restaurant_ids), CONSISTENCY_CHECK_CHUNK_SIZE):
+            chunk = restaurant_ids[i : i + CONSISTENCY_CHECK_CHUNK_SIZE]
+            result = await db.execute(_restaurant_seats_query().where(Restaurant.id.in_(chunk)))
+            for row in result.all():
+                seat_rows.setdefault(row.id, []).append(row)
+        actual_restaurants: dict[str, tuple[str, TableLayout, int]] = {
+            restaurant_id: (
+                rows[0].status,
+                _seat_layout(rows),
+                dining_duration(rows[0].dining_duration_minutes),
+            )
+            for restaurant_id, rows in seat_rows.items()
+        }
+
+        def describe(
+            value: tuple[str, TableLayout, int] | None,
+        ) -> tuple[str, int, int, int] | None:
+            if value is None:
+                return None
+            return (value[0], value[1].seat_count, value[1].total_capacity, value[2])
+
+        for restaurant_id in restaurant_ids:
+            entry = self._restaurants.get(restaurant_id)
+            if entry is None:
+                continue
+            actual = actual_restaurants.get(restaurant_id)
+            current = (entry.status, entry.layout, entry.dining_duration_minutes)
+            if actual is None or current != actual:
+                restaurant_drifts.append(
+                    {
+                        "restaurant_id": restaurant_id,
+                        "ledger": describe(current),
+                        "database": describe(actual),
+                    }
+                )
+
+        day_keys = list(self._days)
+        actual_days: dict[DayKey, DayOccupancy] = {}
+        for i in range(0, len(day_keys), CONSISTENCY_CHECK_CHUNK_SIZE):
+            chunk = day_keys[i : i + CONSISTENCY_CHECK_CHUNK_SIZE]
+            result = await db.execute(
+                stays_query().where(
+                    tuple_(Reservation.restaurant_id, Reservation.reservation_date).in_(chunk)
+                )
+            )
+            layouts = {key[0]: self._days[key].layout for key in chunk if key in self._days}
+            actual_days.update(build_days(result.all(), layouts.__getitem__))
+
+        for key in day_keys:
+            day = self._days.get(key)
+            if day is None:
+                continue
+            actual = actual_days.get(key, DayOccupancy())
+            if day.occupancy != actual:
+                ledger_stays = day.occupancy.stays
+                database_stays = actual.stays
+                day_drifts.append(
+                    {
+                        "restaurant_id": key[0],
+                        "date": key[1].isoformat(),
+                        "ledger": len(ledger_stays),
+                        "database": len(database_stays),
+                        "reservation_ids": sorted(
+                            reservation_id
+                            for reservation_id in ledger_stays.keys() | database_stays.keys()
+                            if ledger_stays.get(reservation_id)
+                            != database_stays.get(reservation_id)
+                        ),
+                    }
+                )
+
+        if restaurant_drifts or day_drifts:
+            logger.warning(
+                f"空席台帳のずれを検出: 店舗 {len(restaurant_drifts)}件, 予約日 {len(day_drifts)}件"
+            )
+
+        # 照合中にライトスルー更新が入った場合は、DBの値が古い可能性があるため修復しない
+        repaired = False
+        if repair and generation == self._generation:
+            now = time_module.monotonic()
+            for drift in restaurant_drifts:
+                restaurant_id = drift["restaurant_id"]
+                actual = actual_restaurants.get(restaurant_id)
+                if actual is None:
+                    self._restaurants.pop(restaurant_id, None)
+                else:
+                    self._restaurants[restaurant_id] = RestaurantCapacity(
+                        status=actual[0],
+                        layout=actual[1],
+                        dining_duration_minutes=actual[2],
+                        loaded_at=now,
+                    )
+            for key in day_keys:
+                day = self._days.get(key)
+                if day is not None:
+                    day.occupancy = actual_days.get(key, DayOccupancy())
+                    day.loaded_at = now
+            repaired = True
+
+        return {
+            "checked_restaurants": len(restaurant_ids),
+            "checked_days": len(day_keys),
+            "restaurant_drifts": restaurant_drifts,
+            "day_drifts": day_drifts,
+            "repaired": repaired,
+        }
+
+
+capacity_ledger = CapacityLedger(ttl_seconds=settings.CAPACITY_LEDGER_TTL_SECONDS)
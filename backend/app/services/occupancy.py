@@ -0,0 +1,148 @@
+from bisect import bisect_left, insort
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import date, time
+from typing import Any
+
+from sqlalchemy import Select, func, select
+
+from app.core.config import settings
+from app.models.reservation import Reservation, ReservationSeat, ReservationStatus
+from app.services.table_assignment import TableLayout
+
+DayKey = tuple[str, date]
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def to_minutes(value: time) -> int:
+    """時刻を0時からの分に変換する"""
+    return value.hour * 60 + value.minute
+
+
+def from_minutes(minutes: int) -> time:
+    """0時からの分（0以上、1日未満）を時刻に変換する"""
+    return time(minutes // 60, minutes % 60)
+
+
+def dining_duration(minutes: int | None) -> int:
+    """店舗の利用時間（分）。未設定の場合は既定値"""
+    return minutes or settings.DEFAULT_DINING_DURATION_MINUTES
+
+
+@dataclass(frozen=True)
+class Stay:
+    """1件の予約が席を使う時間帯 [start, end)（0時からの分）と人数・使用する席のビットセット"""
+
+    start: int
+    end: int
+    party_size: int
+    seats: int
+
+
+class DayOccupancy:
+    """店舗の1日分の予約の利用時間帯を保持し、時間帯ごとの使用状況を答えるインデックス
+
+    予約を開始時刻順に並べ、最長の利用時間を覚えておく。[start, end) と重なる予約は
+    開始時刻が (start - 最長の利用時間, end) にあるものに限られるため、二分探索で候補を
+    絞ってから終了時刻を確認する（O(log n + k)）。重なる予約の最大同時人数は、
+    候補の開始・終了をイベントとして時刻順に走査して求める（スイープライン）。
+    """
+
+    def __init__(self, stays: dict[str, Stay] | None = None) -> None:
+        self._stays: dict[str, Stay] = {}
+        self._starts: list[tuple[int, str]] = []
+        self._max_duration = 0
+        for reservation_id, stay in (stays or {}).items():
+            self.add(reservation_id, stay)
+
+    def __len__(self) -> int:
+        return len(self._stays)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, DayOccupancy) and self._stays == other._stays
+
+    @property
+    def stays(self) -> dict[str, Stay]:
+        return dict(self._stays)
+
+    def add(self, reservation_id: str, stay: Stay) -> None:
+        self.remove(reservation_id)
+        self._stays[reservation_id] = stay
+        insort(self._starts, (stay.start, reservation_id))
+        self._max_duration = max(self._max_duration, stay.end - stay.start)
+
+    def remove(self, reservation_id: str) -> Stay | None:
+        # 最長の利用時間は縮めない（候補が増えるだけで結果は変わらない）
+        stay = self._stays.pop(reservation_id, None)
+        if stay is not None:
+            del self._starts[bisect_left(self._starts, (stay.start, reservation_id))]
+        return stay
+
+    def overlapping(self, start: int, end: int) -> Iterator[Stay]:
+        """[start, end) と利用時間が重なる予約"""
+        lo = bisect_left(self._starts, (start - self._max_duration + 1, ""))
+        hi = bisect_left(self._starts, (end, ""))
+        for _, reservation_id in self._starts[lo:hi]:
+            stay = self._stays[reservation_id]
+            if stay.end > start:
+                yield stay
+
+    def occupied_seats(self, start: int, end: int) -> int:
+        """[start, end) のどこかで使用中の席のビットセット"""
+        bits = 0
+        for stay in self.overlapping(start, end):
+            bits |= stay.seats
+        return bits
+
+    def max_concurrent(self, start: int, end: int) -> int:
+        """[start, end) の間の最大同時利用人数"""
+        events: list[tuple[int, int]] = []
+        for stay in self.overlapping(start, end):
+            events.append((max(stay.start, start), stay.party_size))
+            events.append((stay.end, -stay.party_size))
+        # 同時刻では退店を先に数える（[start, end) は終了時刻を含まない）
+        events.sort()
+        current = peak = 0
+        for _, delta in events:
+            current += delta
+            peak = max(peak, current)
+        return peak
+
+
+def stays_query() -> Select:
+    """キャンセル以外の予約の利用時間帯と割り当てた席を1予約1行で取得するクエリ（条件は呼び出し元で追加）"""
+    return (
+        select(
+            Reservation.id,
+            Reservation.restaurant_id,
+            Reservation.reservation_date,
+            Reservation.reservation_time,
+            Reservation.duration_minutes,
+            Reservation.party_size,
+            func.array_agg(ReservationSeat.seat_id)
+            .filter(ReservationSeat.seat_id.is_not(None))
+            .label("seat_ids"),
+        )
+        .outerjoin(ReservationSeat, ReservationSeat.reservation_id == Reservation.id)
+        .where(Reservation.status != ReservationStatus.CANCELLED.value)
+        .group_by(Reservation.id)
+    )
+
+
+def build_days(
+    rows: Any, layout_of: Callable[[str], TableLayout]
+) -> dict[DayKey, DayOccupancy]:
+    """stays_query の結果を (店舗ID, 予約日) ごとの DayOccupancy にまとめる"""
+    days: dict[DayKey, DayOccupancy] = {}
+    for row in rows:
+        start = to_minutes(row.reservation_time)
+        stay = Stay(
+            start=start,
+            end=start + row.duration_minutes,
+            party_size=row.party_size,
+            seats=layout_of(row.restaurant_id).mask(row.seat_ids or ()),
+        )
+        key = (row.restaurant_id, row.reservation_date)
+        days.setdefault(key, DayOccupancy()).add(row.id, stay)
+    return days
@@ -1,12 +1,12 @@
 import logging
 from typing import Any
 
-import stripe
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
 from app.models.reservation import PaymentStatus, Reservation
+from app.services.payment_gateway import PaymentGatewayError, payment_gateway
 from app.services.reservation import reservation_service
+from app.services.sales_rollup import sales_rollup_service
 from app.schemas.reservation import ReservationUpdate
 
 
@@ -23,9 +23,6 @@ class PaymentError(Exception):
 
 
 class PaymentService:
-    def __init__(self):
-        stripe.api_key = settings.STRIPE_SECRET_KEY
-
     async def create_payment_intent(
         self, db: AsyncSession, *, reservation_id: str
     ) -> dict[str, Any]:
@@ -49,7 +46,7 @@ class PaymentService:
         # 既にPayment Intentが存在する場合は、それを返す
         if reservation.stripe_payment_intent_id:
             try:
-                payment_intent = stripe.PaymentIntent.retrieve(
+                payment_intent = await payment_gateway.retrieve_payment_intent(
                     reservation.stripe_payment_intent_id
                 )
                 if payment_intent.status in ["requires_payment_method", "requires_confirmation"]:
@@ -58,12 +55,18 @@ class PaymentService:
                         "payment_intent_id": payment_intent.id,
                         "amount": reservation.amount,
                     }
-            except stripe.error.StripeError as e:
+            except PaymentGatewayError as e:
                 logger.warning(f"既存のPayment Intent取得エラー: {e}")
 
         # 新しいPayment Intentを作成
+        # 冪等キーは「予約 + 置き換え対象のPayment Intent」単位にし、
+        # リトライや二重送信で同じ予約に複数のPayment Intentが作られないようにする
+        idempotency_key = (
+            f"reservation-{reservation_id}-intent-"
+            f"{reservation.stripe_payment_intent_id or 'initial'}"
+        )
         try:
-            payment_intent = stripe.PaymentIntent.create(
+            payment_intent = await payment_gateway.create_payment_intent(
                 amount=reservation.amount,
                 currency="jpy",
                 metadata={
@@ -71,7 +74,7 @@ class PaymentService:
                     "customer_id": reservation.customer_id,
                     "restaurant_id": reservation.restaurant_id,
                 },
-                automatic_payment_methods={"enabled": True},
+                idempotency_key=idempotency_key,
             )
 
             # 予約にPayment Intent IDを保存
@@ -91,21 +94,25 @@ class PaymentService:
                 "amount": reservation.amount,
             }
 
-        except stripe.error.StripeError as e:
+        except PaymentGatewayError as e:
             logger.error(f"Stripe Payment Intent作成エラー: {e}")
             raise PaymentError(f"決済の初期化に失敗しました: {str(e)}", "stripe_error")
 
     async def confirm_payment(
         self, db: AsyncSession, *, payment_intent_id: str
     ) -> Reservation | None:
-        """決済完了を確認し、予約ステータスを更新する（Webhook用）"""
+        """決済完了を確認し、予約ステータスを更新する（Webhook用）
+
+        予約の行はロックして読み直す（同時に処理されるキャンセル・返金と売上の集計がずれないように）。
+        """
         from sqlalchemy import select
 
         # payment_intent_idから予約を検索
         result = await db.execute(
-            select(Reservation).where(
-                Reservation.stripe_payment_intent_id == payment_intent_id
-            )
+            select(Reservation)
+            .where(Reservation.stripe_payment_intent_id == payment_intent_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
         )
         reservation = result.scalar_one_or_none()
 
@@ -119,7 +126,11 @@ class PaymentService:
             return reservation
 
         # ステータスを更新
+        sales_before = sales_rollup_service.contribution(reservation)
         reservation.payment_status = PaymentStatus.PAID.value
+        await sales_rollup_service.apply_change(
+            db, before=sales_before, after=sales_rollup_service.contribution(reservation)
+        )
         await db.commit()
         await db.refresh(reservation)
 
@@ -130,7 +141,11 @@ class PaymentService:
     async def refund_payment(
         self, db: AsyncSession, *, reservation_id: str
     ) -> dict[str, Any]:
-        """予約に対して返金処理を実行する"""
+        """予約に対して返金処理を実行する
+
+        返金後のステータス更新は、予約の行をロックして読み直した状態を基準にする
+        （Stripeへの通信中は行をロックしない）。
+        """
         # 予約を取得
         reservation = await reservation_service.get(db, id=reservation_id)
         if not reservation:
@@ -156,12 +171,19 @@ class PaymentService:
 
         # Stripe返金処理
         try:
-            refund = stripe.Refund.create(
-                payment_intent=reservation.stripe_payment_intent_id,
+            refund = await payment_gateway.create_refund(
+                payment_intent_id=reservation.stripe_payment_intent_id,
+                idempotency_key=f"reservation-{reservation_id}-refund",
             )
 
-            # 予約のpayment_statusを更新
+            # 予約のpayment_statusを更新（返金中に他の更新が入った場合も売上の差分がずれないよう、
+            # ロックして読み直した状態から差分を計算する）
+            await reservation_service.lock(db, reservation_id=reservation_id)
+            sales_before = sales_rollup_service.contribution(reservation)
             reservation.payment_status = PaymentStatus.REFUNDED.value
+            await sales_rollup_service.apply_change(
+                db, before=sales_before, after=sales_rollup_service.contribution(reservation)
+            )
             await db.commit()
             await db.refresh(reservation)
 
@@ -177,21 +199,18 @@ class PaymentService:
                 "reservation_id": reservation_id,
             }
 
-        except stripe.error.StripeError as e:
+        except PaymentGatewayError as e:
             logger.error(f"Stripe返金処理エラー: {e}")
             raise PaymentError(f"返金処理に失敗しました: {str(e)}", "stripe_error")
 
     def verify_webhook_signature(self, payload: bytes, signature: str) -> dict[str, Any]:
         """Webhookの署名を検証する"""
         try:
-            event = stripe.Webhook.construct_event(
-                payload, signature, settings.STRIPE_WEBHOOK_SECRET
-            )
-            return event
-        except stripe.error.SignatureVerificationError as e:
-            logger.error(f"Webhook署名検証エラー: {e}")
-            raise PaymentError("Webhook署名の検証に失敗しました", "invalid_signature")
-        except ValueError as e:
+            return payment_gateway.construct_event(payload, signature)
+        except PaymentGatewayError as e:
+            if e.code == "invalid_signature":
+                logger.error(f"Webhook署名検証エラー: {e}")
+                raise PaymentError("Webhook署名の検証に失敗しました", "invalid_signature")
             logger.error(f"Webhookペイロードエラー: {e}")
             raise PaymentError("無効なペイロードです", "invalid_payload")
 
@@ -0,0 +1,350 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import random
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlencode
+
+import httpx
+import stripe
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# リトライ対象のHTTPステータス（レート制限・サーバーエラー）
+RETRYABLE_STATUS_CODES = {409, 429, 500, 502, 503, 504}
+
+
+class PaymentGatewayError(Exception):
+    """決済ゲートウェイ呼び出しのエラー"""
+
+    def __init__(self, message: str, code: str = "gateway_error"):
+        self.message = message
+        self.code = code
+        super().__init__(self.message)
+
+
+@dataclass
+class GatewayPaymentIntent:
+    id: str
+    client_secret: str
+    status: str
+    amount: int
+
+
+@dataclass
+class GatewayRefund:
+    id: str
+    amount: int
+    status: str
+
+
+class PaymentGateway(ABC):
+    """決済ゲートウェイの非同期インターフェース"""
+
+    def __init__(self, webhook_secret: str) -> None:
+        self.webhook_secret = webhook_secret
+
+    @abstractmethod
+    async def create_payment_intent(
+        self, *, amount: int, currency: str, metadata: dict[str, str], idempotency_key: str
+    ) -> GatewayPaymentIntent: ...
+
+    @abstractmethod
+    async def retrieve_payment_intent(self, payment_intent_id: str) -> GatewayPaymentIntent: ...
+
+    @abstractmethod
+    async def create_refund(
+        self, *, payment_intent_id: str, idempotency_key: str
+    ) -> GatewayRefund: ...
+
+    def construct_event(self, payload: bytes, signature: str) -> dict[str, Any]:
+        """Webhookの署名（Stripe-Signature形式）を検証し、イベントを返す
+
+        HMACの計算のみでネットワーク通信は行わない。
+        """
+        try:
+            event = stripe.Webhook.construct_event(payload, signature, self.webhook_secret)
+        except stripe.error.SignatureVerificationError as e:
+            raise PaymentGatewayError(str(e), "invalid_signature") from e
+        except ValueError as e:
+            raise PaymentGatewayError(str(e), "invalid_payload") from e
+        return event
+
+    async def aclose(self) -> None:  # noqa: B027
+        """接続プールなどのリソースを解放する（解放するものが無い実装では何もしない）"""
+
+
+def _flatten_form(data: dict[str, Any], prefix: str = "") -> list[tuple[str, str]]:
+    """ネストしたdictをStripe APIのフォーム形式（metadata[key]=value）に変換する"""
+    items: list[tuple[str, str]] = []
+    for key, value in data.items():
+        name = f"{prefix}[{key}]" if prefix else key
+        if isinstance(value, dict):
+            items.extend(_flatten_form(value, name))
+        elif isinstance(value, bool):
+            items.append((name, "true" if value else "false"))
+        else:
+            items.append((name, str(value)))
+    return items
+
+
+class StripeGateway(PaymentGateway):
+    """Stripe REST APIを非同期HTTPクライアントで呼び出すゲートウェイ
+
+    - 接続はプロセス内で使い回す（コネクションプール）
+    - タイムアウトを設定し、ネットワークエラー・429・5xxは指数バックオフでリトライする
+    - POSTにはIdempotency-Keyを付与し、リトライしても二重に作成されないようにする
+    - Stripe-VersionヘッダーでAPIバージョンを固定し、アカウント既定のバージョン変更の影響を受けない
+    """
+
+    base_url = "https://api.stripe.com/v1"
+
+    def __init__(
+        self,
+        *,
+        secret_key: str,
+        webhook_secret: str,
+        api_version: str,
+        timeout_seconds: float,
+        max_retries: int,
+        max_connections: int,
+    ) -> None:
+        super().__init__(webhook_secret)
+        self.secret_key = secret_key
+        self.api_version = api_version
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.max_connections = max_connections
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                auth=(self.secret_key, ""),
+                headers={"Stripe-Version": self.api_version},
+                timeout=httpx.Timeout(self.timeout_seconds),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        data: dict[str, Any] | None = None,
+        idempotency_key: str | None = None,
+    ) -> dict[str, Any]:
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else {}
+        content = None
+        if data:
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+            content = urlencode(_flatten_form(data))
+        client = self._get_client()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.request(method, path, content=content, headers=headers)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise PaymentGatewayError(f"Stripe APIに接続できませんでした: {e}") from e
+                logger.warning(f"Stripe API通信エラー（リトライ {attempt + 1}回目）: {e}")
+            else:
+                if response.status_code < 400:
+                    return response.json()
+                if (
+                    response.status_code not in RETRYABLE_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    try:
+                        error = response.json().get("error", {})
+                    except ValueError:
+                        error = {}
+                    raise PaymentGatewayError(
+                        error.get("message", f"Stripe APIエラー ({response.status_code})"),
+                        error.get("code", "gateway_error"),
+                    )
+                logger.warning(
+                    f"Stripe APIエラー {response.status_code}（リトライ {attempt + 1}回目）"
+                )
+
+            # 指数バックオフ（ジッター付き）
+            await asyncio.sleep(min(0.5 * 2**attempt, 8.0) * random.uniform(0.5, 1.0))
+
+        raise PaymentGatewayError("Stripe APIの呼び出しに失敗しました")
+
+    async def create_payment_intent(
+        self, *, amount: int, currency: str, metadata: dict[str, str], idempotency_key: str
+    ) -> GatewayPaymentIntent:
+        body = await self._request(
+            "POST",
+            "/payment_intents",
+            data={
+                "amount": amount,
+                "currency": currency,
+                "metadata": metadata,
+                "automatic_payment_methods": {"enabled": True},
+            },
+            idempotency_key=idempotency_key,
+        )
+        return GatewayPaymentIntent(
+            id=body["id"],
+            client_secret=body["client_secret"],
+            status=body["status"],
+            amount=body["amount"],
+        )
+
+    async def retrieve_payment_intent(self, payment_intent_id: str) -> GatewayPaymentIntent:
+        body = await self._request("GET", f"/payment_intents/{payment_intent_id}")
+        return GatewayPaymentIntent(
+            id=body["id"],
+            client_secret=body["client_secret"],
+            status=body["status"],
+            amount=body["amount"],
+        )
+
+    async def create_refund(
+        self, *, payment_intent_id: str, idempotency_key: str
+    ) -> GatewayRefund:
+        body = await self._request(
+            "POST",
+            "/refunds",
+            data={"payment_intent": payment_intent_id},
+            idempotency_key=idempotency_key,
+        )
+        return GatewayRefund(id=body["id"], amount=body["amount"], status=body["status"])
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class FakePaymentGateway(PaymentGateway):
+    """プロセス内で完結する決済ゲートウェイ（負荷試験・ローカル開発用）
+
+    Payment Intent・返金をメモリ上に保持し、Idempotency-Keyの重複は同じ結果を返す。
+    signed_event() でStripeと同じ形式の署名付きWebhookイベントを生成できる。
+    """
+
+    def __init__(self, *, webhook_secret: str, latency_seconds: float = 0.0) -> None:
+        super().__init__(webhook_secret)
+        self.latency_seconds = latency_seconds
+        self.payment_intents: dict[str, GatewayPaymentIntent] = {}
+        self.refunds: dict[str, GatewayRefund] = {}
+        self._idempotent_results: dict[str, GatewayPaymentIntent | GatewayRefund] = {}
+
+    async def _simulate_latency(self) -> None:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+
+    async def create_payment_intent(
+        self, *, amount: int, currency: str, metadata: dict[str, str], idempotency_key: str
+    ) -> GatewayPaymentIntent:
+        await self._simulate_latency()
+        existing = self._idempotent_results.get(idempotency_key)
+        if isinstance(existing, GatewayPaymentIntent):
+            return existing
+
+        intent_id = f"pi_fake_{uuid.uuid4().hex[:24]}"
+        intent = GatewayPaymentIntent(
+            id=intent_id,
+            client_secret=f"{intent_id}_secret_{uuid.uuid4().hex[:16]}",
+            status="requires_payment_method",
+            amount=amount,
+        )
+        self.payment_intents[intent_id] = intent
+        self._idempotent_results[idempotency_key] = intent
+        return intent
+
+    async def retrieve_payment_intent(self, payment_intent_id: str) -> GatewayPaymentIntent:
+        await self._simulate_latency()
+        intent = self.payment_intents.get(payment_intent_id)
+        if intent is None:
+            raise PaymentGatewayError(
+                f"No such payment_intent: '{payment_intent_id}'", "resource_missing"
+            )
+        return intent
+
+    async def create_refund(
+        self, *, payment_intent_id: str, idempotency_key: str
+    ) -> GatewayRefund:
+        await self._simulate_latency()
+        existing = self._idempotent_results.get(idempotency_key)
+        if isinstance(existing, GatewayRefund):
+            return existing
+
+        intent = await self.retrieve_payment_intent(payment_intent_id)
+        refund = GatewayRefund(
+            id=f"re_fake_{uuid.uuid4().hex[:24]}", amount=intent.amount, status="succeeded"
+        )
+        self.refunds[refund.id] = refund
+        self._idempotent_results[idempotency_key] = refund
+        return refund
+
+    def sign_payload(self, payload: bytes, timestamp: int | None = None) -> str:
+        """ペイロードにStripe-Signatureヘッダーと同じ形式の署名を付ける"""
+        timestamp = timestamp or int(time.time())
+        signed = f"{timestamp}.".encode() + payload
+        signature = hmac.new(self.webhook_secret.encode(), signed, hashlib.sha256).hexdigest()
+        return f"t={timestamp},v1={signature}"
+
+    def signed_event(
+        self, event_type: str, data_object: dict[str, Any], event_id: str | None = None
+    ) -> tuple[bytes, str]:
+        """署名付きWebhookイベント（ペイロードとStripe-Signatureヘッダー）を生成する"""
+        payload = json.dumps(
+            {
+                "id": event_id or f"evt_fake_{uuid.uuid4().hex[:24]}",
+                "object": "event",
+                "type": event_type,
+                "created": int(time.time()),
+                "data": {"object": data_object},
+            }
+        ).encode()
+        return payload, self.sign_payload(payload)
+
+    def succeed_payment_intent(self, payment_intent_id: str) -> tuple[bytes, str]:
+        """Payment Intentを決済完了にし、payment_intent.succeeded イベントを返す"""
+        intent = self.payment_intents[payment_intent_id]
+        intent.status = "succeeded"
+        return self.signed_event(
+            "payment_intent.succeeded",
+            {
+                "id": intent.id,
+                "object": "payment_intent",
+                "amount": intent.amount,
+                "status": intent.status,
+            },
+        )
+
+
+def create_payment_gateway() -> PaymentGateway:
+    if settings.PAYMENT_GATEWAY == "fake":
+        return FakePaymentGateway(
+            webhook_secret=settings.STRIPE_WEBHOOK_SECRET or "whsec_fake",
+            latency_seconds=settings.PAYMENT_GATEWAY_FAKE_LATENCY_MS / 1000,
+        )
+    return StripeGateway(
+        secret_key=settings.STRIPE_SECRET_KEY,
+        webhook_secret=settings.STRIPE_WEBHOOK_SECRET,
+        api_version=settings.STRIPE_API_VERSION,
+        timeout_seconds=settings.PAYMENT_GATEWAY_TIMEOUT_SECONDS,
+        max_retries=settings.PAYMENT_GATEWAY_MAX_RETRIES,
+        max_connections=settings.PAYMENT_GATEWAY_MAX_CONNECTIONS,
+    )
+
+
+payment_gateway = create_payment_gateway()
@@ -1,10 +1,90 @@
-from datetime import date
+import logging
+from dataclasses import replace
+from datetime import date, time
+from typing import Any
 
-from sqlalchemy import and_, select
+from sqlalchemy import String, and_, any_, delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.reservation import Reservation
+from app.core.config import settings
+from app.db.pagination import KeysetOrder
+from app.models.reservation import (
+    Reservation,
+    ReservationSeat,
+    ReservationStatus,
+)
+from app.models.restaurant import Restaurant, Seat
+from app.models.waitlist import WaitlistEntry, WaitlistStatus
 from app.schemas.reservation import ReservationCreate, ReservationUpdate
+from app.services.capacity_ledger import capacity_ledger
+from app.services.occupancy import (
+    MINUTES_PER_DAY,
+    DayOccupancy,
+    Stay,
+    build_days,
+    dining_duration,
+    from_minutes,
+    stays_query,
+    to_minutes,
+)
+from app.services.sales_rollup import sales_rollup_service
+from app.services.table_assignment import SeatSpec, TableLayout, assign_tables
+
+logger = logging.getLogger(__name__)
+
+# 一覧のキーセットページングの並び順（それぞれ対応するインデックスがある）
+CUSTOMER_RESERVATION_ORDER = KeysetOrder(
+    "reservations_by_customer",
+    (
+        (Reservation.reservation_date, True),
+        (Reservation.reservation_time, True),
+        (Reservation.id, True),
+    ),
+)
+RESTAURANT_RESERVATION_ORDER = KeysetOrder(
+    "reservations_by_restaurant",
+    (
+        (Reservation.reservation_date, True),
+        (Reservation.reservation_time, False),
+        (Reservation.id, False),
+    ),
+)
+ALL_RESERVATION_ORDER = KeysetOrder(
+    "reservations",
+    (
+        (Reservation.reservation_date, True),
+        (Reservation.reservation_time, True),
+        (Reservation.id, True),
+    ),
+)
+
+
+# 一括変更で取得・返却する列（売上ロールアップの寄与の計算に必要な列を含む）
+BULK_COLUMNS = (
+    Reservation.id,
+    Reservation.restaurant_id,
+    Reservation.reservation_date,
+    Reservation.reservation_time,
+    Reservation.party_size,
+    Reservation.duration_minutes,
+    Reservation.status,
+    Reservation.payment_method,
+    Reservation.payment_status,
+    Reservation.amount,
+)
+
+# 一括変更できる変更後のステータス（いずれも確定済みの予約からの変更）
+BULK_TARGET_STATUSES = (ReservationStatus.COMPLETED.value, ReservationStatus.CANCELLED.value)
+
+
+class ReservationError(Exception):
+    """予約処理のエラー"""
+
+    def __init__(self, message: str, code: str = "reservation_error"):
+        self.message = message
+        self.code = code
+        super().__init__(self.message)
 
 
 class ReservationService:
@@ -12,16 +92,34 @@ class ReservationService:
         result = await db.execute(select(Reservation).where(Reservation.id == id))
         return result.scalar_one_or_none()
 
-    async def get_by_customer(
-        self, db: AsyncSession, *, customer_id: str, skip: int = 0, limit: int = 100
-    ) -> list[Reservation]:
+    async def lock(self, db: AsyncSession, *, reservation_id: str) -> Reservation | None:
+        """予約の行をトランザクション終了まで行ロックし、最新の状態で読み直す
+
+        セッションに読み込み済みの予約オブジェクトもロック後の値で上書きされる。
+        """
         result = await db.execute(
             select(Reservation)
-            .where(Reservation.customer_id == customer_id)
-            .order_by(Reservation.reservation_date.desc())
-            .offset(skip)
-            .limit(limit)
+            .where(Reservation.id == reservation_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
         )
+        return result.scalar_one_or_none()
+
+    async def get_by_customer(
+        self,
+        db: AsyncSession,
+        *,
+        customer_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+    ) -> list[Reservation]:
+        query = CUSTOMER_RESERVATION_ORDER.apply(
+            select(Reservation).where(Reservation.customer_id == customer_id), cursor
+        )
+        if not cursor:
+            query = query.offset(skip)
+        result = await db.execute(query.limit(limit))
         return list(result.scalars().all())
 
     async def get_by_restaurant(
@@ -33,6 +131,7 @@ class ReservationService:
         status: str | None = None,
         skip: int = 0,
         limit: int = 100,
+        cursor: str | None = None,
     ) -> list[Reservation]:
         query = select(Reservation).where(Reservation.restaurant_id == restaurant_id)
 
@@ -41,11 +140,11 @@ class ReservationService:
         if status:
             query = query.where(Reservation.status == status)
 
-        query = query.order_by(
-            Reservation.reservation_date.desc(), Reservation.reservation_time
-        ).offset(skip).limit(limit)
+        query = RESTAURANT_RESERVATION_ORDER.apply(query, cursor)
+        if not cursor:
+            query = query.offset(skip)
 
-        result = await db.execute(query)
+        result = await db.execute(query.limit(limit))
         return list(result.scalars().all())
 
     async def get_all(
@@ -56,6 +155,7 @@ class ReservationService:
         date_to: date | None = None,
         skip: int = 0,
         limit: int = 100,
+        cursor: str | None = None,
     ) -> list[Reservation]:
         query = select(Reservation)
 
@@ -67,37 +167,573 @@ class ReservationService:
                 )
             )
 
-        query = query.order_by(Reservation.reservation_date.desc()).offset(skip).limit(limit)
-        result = await db.execute(query)
+        query = ALL_RESERVATION_ORDER.apply(query, cursor)
+        if not cursor:
+            query = query.offset(skip)
+        result = await db.execute(query.limit(limit))
         return list(result.scalars().all())
 
+    async def _lock_day(
+        self, db: AsyncSession, *, restaurant_id: str, reservation_date: date
+    ) -> None:
+        """店舗・予約日単位のトランザクションロックを取得する
+
+        利用時間が重なる別の時刻の予約とも席を取り合うため、同じ店舗・同じ日の予約作成を
+        直列化する（別の日・別の店舗の予約とは競合しない）。ロックはコミット時に解放される。
+        """
+        await db.execute(
+            select(
+                func.pg_advisory_xact_lock(
+                    func.hashtextextended(f"reservation-day:{restaurant_id}:{reservation_date}", 0)
+                )
+            )
+        )
+
+    async def _load_seating(
+        self, db: AsyncSession, *, restaurant_id: str, reservation_date: date
+    ) -> tuple[TableLayout, int, DayOccupancy]:
+        """店舗の席構成・1組の利用時間（分）と、指定日の予約の利用時間帯を取得する
+
+        店舗・予約日単位のロックを取得した後に呼ぶ（ロック中はその日の席の使用状況が変わらない）。
+        """
+        result = await db.execute(
+            select(
+                Restaurant.dining_duration_minutes,
+                Seat.id,
+                Seat.capacity,
+                Seat.combine_group,
+            )
+            .outerjoin(Seat, Seat.restaurant_id == Restaurant.id)
+            .where(Restaurant.id == restaurant_id)
+        )
+        rows = result.all()
+        layout = TableLayout.from_seats(
+            SeatSpec(id=row.id, capacity=row.capacity, combine_group=row.combine_group)
+            for row in rows
+            if row.id is not None
+        )
+        duration = dining_duration(rows[0].dining_duration_minutes if rows else None)
+
+        result = await db.execute(
+            stays_query().where(
+                Reservation.restaurant_id == restaurant_id,
+                Reservation.reservation_date == reservation_date,
+            )
+        )
+        day = build_days(result.all(), lambda _: layout).get(
+            (restaurant_id, reservation_date), DayOccupancy()
+        )
+        return layout, duration, day
+
+    def _find_tables(
+        self,
+        layout: TableLayout,
+        day: DayOccupancy,
+        *,
+        reservation_time: time,
+        duration_minutes: int,
+        party_size: int,
+    ) -> int | None:
+        """[予約時間, 予約時間 + 利用時間) の間ずっと空いている席から人数分の席を選ぶ"""
+        start = to_minutes(reservation_time)
+        end = start + duration_minutes
+        return assign_tables(
+            layout,
+            occupied=day.occupied_seats(start, end),
+            reserved=day.max_concurrent(start, end),
+            party_size=party_size,
+        )
+
     async def create(
         self, db: AsyncSession, *, obj_in: ReservationCreate, customer_id: str
     ) -> Reservation:
+        """予約を作成する
+
+        店舗・予約日単位のロックを取得した上で、予約時間から店舗の利用時間の間ずっと
+        空いている席に人数分の席を割り当て、予約・席の割り当て・売上ロールアップの
+        更新を1トランザクションで行う。
+
+        Raises:
+            ReservationError: 人数が不正、または案内できる席が無い場合
+        """
+        if obj_in.party_size < 1:
+            raise ReservationError("人数は1名以上で指定してください", "invalid_party_size")
+
+        await self._lock_day(
+            db, restaurant_id=obj_in.restaurant_id, reservation_date=obj_in.reservation_date
+        )
+        layout, duration, day = await self._load_seating(
+            db, restaurant_id=obj_in.restaurant_id, reservation_date=obj_in.reservation_date
+        )
+        tables = self._find_tables(
+            layout,
+            day,
+            reservation_time=obj_in.reservation_time,
+            duration_minutes=duration,
+            party_size=obj_in.party_size,
+        )
+        if tables is None:
+            await db.rollback()
+            raise ReservationError(
+                f"指定された日時に{obj_in.party_size}名で案内できる席がありません",
+                "capacity_exceeded",
+            )
+
         db_obj = Reservation(
             customer_id=customer_id,
             restaurant_id=obj_in.restaurant_id,
             reservation_date=obj_in.reservation_date,
             reservation_time=obj_in.reservation_time,
             party_size=obj_in.party_size,
+            duration_minutes=duration,
             payment_method=obj_in.payment_method,
             amount=obj_in.amount,
             notes=obj_in.notes,
         )
         db.add(db_obj)
+        await db.flush()
+        seat_ids = layout.seat_ids(tables)
+        self._add_seat_assignments(db, reservation=db_obj, seat_ids=seat_ids)
+        await sales_rollup_service.apply_change(
+            db, before=None, after=sales_rollup_service.contribution(db_obj)
+        )
         await db.commit()
         await db.refresh(db_obj)
+        self._publish_reservation(db_obj, seat_ids)
         return db_obj
 
+    def _add_seat_assignments(
+        self, db: AsyncSession, *, reservation: Reservation, seat_ids: list[str]
+    ) -> None:
+        db.add_all(
+            ReservationSeat(
+                reservation_id=reservation.id,
+                seat_id=seat_id,
+                restaurant_id=reservation.restaurant_id,
+                reservation_date=reservation.reservation_date,
+                reservation_time=reservation.reservation_time,
+            )
+            for seat_id in seat_ids
+        )
+
+    async def _release_seats(self, db: AsyncSession, *, reservation_ids: list[str]) -> None:
+        """予約への席の割り当てを削除する"""
+        await db.execute(
+            delete(ReservationSeat).where(
+                ReservationSeat.reservation_id == any_(literal(reservation_ids, ARRAY(String)))
+            )
+        )
+
+    def _publish_reservation(self, reservation: Any, seat_ids: list[str]) -> None:
+        """席を割り当てた予約を空席台帳に反映する（コミット後に呼ぶ）"""
+        capacity_ledger.apply_reservation(
+            restaurant_id=reservation.restaurant_id,
+            reservation_date=reservation.reservation_date,
+            reservation_id=reservation.id,
+            reservation_time=reservation.reservation_time,
+            duration_minutes=reservation.duration_minutes,
+            party_size=reservation.party_size,
+            seat_ids=seat_ids,
+        )
+
+    def _publish_cancellation(self, reservation: Any) -> None:
+        """キャンセルした予約を空席台帳から外す（コミット後に呼ぶ）"""
+        capacity_ledger.release_reservation(
+            restaurant_id=reservation.restaurant_id,
+            reservation_date=reservation.reservation_date,
+            reservation_id=reservation.id,
+        )
+
+    async def find_tables(
+        self,
+        db: AsyncSession,
+        *,
+        restaurant_id: str,
+        reservation_date: date,
+        reservation_time: time,
+        party_size: int,
+    ) -> tuple[TableLayout, int | None]:
+        """店舗・予約日単位のロックを取得し、DBの最新の状態で人数分の席を割り当てられるか調べる
+
+        ロックはトランザクションの終了（コミット・ロールバック）まで保持される。
+
+        Returns:
+            (店舗の席構成, 割り当てられる席のビットセット。案内できなければNone)
+        """
+        await self._lock_day(db, restaurant_id=restaurant_id, reservation_date=reservation_date)
+        layout, duration, day = await self._load_seating(
+            db, restaurant_id=restaurant_id, reservation_date=reservation_date
+        )
+        tables = self._find_tables(
+            layout,
+            day,
+            reservation_time=reservation_time,
+            duration_minutes=duration,
+            party_size=party_size,
+        )
+        return layout, tables
+
+    async def _promote_waitlist(
+        self,
+        db: AsyncSession,
+        *,
+        restaurant_id: str,
+        reservation_date: date,
+        start: int,
+        end: int,
+    ) -> list[tuple[Reservation, list[str]]]:
+        """キャンセルで空いた時間帯 [start, end) と利用時間が重なるキャンセル待ちを予約に変換する
+
+        呼び出し元のトランザクション内で、席の割り当てを解放した後に実行する。
+        店舗・予約日単位のロックを取得し、候補を部分インデックスから登録順に
+        WAITLIST_PROMOTION_SCAN_LIMIT 件まで取り出して、案内できるものから順に予約を作成する
+        （先頭が案内できなくても、後ろの少人数のリクエストは案内する）。
+
+        Returns:
+            作成した予約と割り当てた席IDの一覧（空席台帳への反映はコミット後に呼び出し元で行う）
+        """
+        await self._lock_day(db, restaurant_id=restaurant_id, reservation_date=reservation_date)
+        layout, duration, day = await self._load_seating(
+            db, restaurant_id=restaurant_id, reservation_date=reservation_date
+        )
+
+        # 予約時間が (start - 利用時間, end) にあるリクエストだけが空いた時間帯と重なる
+        conditions = [
+            WaitlistEntry.restaurant_id == restaurant_id,
+            WaitlistEntry.reservation_date == reservation_date,
+            WaitlistEntry.status == WaitlistStatus.WAITING.value,
+        ]
+        if start - duration >= 0:
+            conditions.append(WaitlistEntry.reservation_time > from_minutes(start - duration))
+        if end < MINUTES_PER_DAY:
+            conditions.append(WaitlistEntry.reservation_time < from_minutes(end))
+        result = await db.execute(
+            select(WaitlistEntry)
+            .where(*conditions)
+            .order_by(WaitlistEntry.created_at, WaitlistEntry.id)
+            .limit(settings.WAITLIST_PROMOTION_SCAN_LIMIT)
+            .with_for_update(skip_locked=True)
+        )
+
+        promoted: list[tuple[Reservation, list[str]]] = []
+        for entry in result.scalars().all():
+            tables = self._find_tables(
+                layout,
+                day,
+                reservation_time=entry.reservation_time,
+                duration_minutes=duration,
+                party_size=entry.party_size,
+            )
+            if tables is None:
+                continue
+
+            reservation = Reservation(
+                customer_id=entry.customer_id,
+                restaurant_id=restaurant_id,
+                reservation_date=reservation_date,
+                reservation_time=entry.reservation_time,
+                party_size=entry.party_size,
+                duration_minutes=duration,
+                payment_method=entry.payment_method,
+                amount=entry.amount,
+                notes=entry.notes,
+            )
+            db.add(reservation)
+            await db.flush()
+            seat_ids = layout.seat_ids(tables)
+            self._add_seat_assignments(db, reservation=reservation, seat_ids=seat_ids)
+            await sales_rollup_service.apply_change(
+                db, before=None, after=sales_rollup_service.contribution(reservation)
+            )
+            # 後続のリクエストの判定に、いま割り当てた席を含める
+            stay_start = to_minutes(entry.reservation_time)
+            day.add(
+                reservation.id,
+                Stay(
+                    start=stay_start,
+                    end=stay_start + duration,
+                    party_size=entry.party_size,
+                    seats=tables,
+                ),
+            )
+            entry.status = WaitlistStatus.PROMOTED.value
+            entry.reservation_id = reservation.id
+            entry.promoted_at = func.now()
+            promoted.append((reservation, seat_ids))
+
+        if promoted:
+            logger.info(
+                f"キャンセル待ち {len(promoted)} 件を予約に変換しました"
+                f"（店舗 {restaurant_id}, {reservation_date}）"
+            )
+        return promoted
+
     async def update(
-        self, db: AsyncSession, *, db_obj: Reservation, obj_in: ReservationUpdate
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: Reservation,
+        obj_in: ReservationUpdate,
+        expected_status: str | None = None,
     ) -> Reservation:
+        """予約を更新する
+
+        変更前の状態は予約の行をロックして読み直したものを使う（同じ予約への同時の
+        キャンセルなどで、席の解放・売上・キャンセル待ちの案内が二重に行われないように）。
+
+        Raises:
+            ReservationError: ロック後のステータスが expected_status と異なる場合、
+                またはキャンセルを取り消す際に案内できる席が無い場合
+        """
+        await self.lock(db, reservation_id=db_obj.id)
+        if expected_status is not None and db_obj.status != expected_status:
+            await db.rollback()
+            raise ReservationError("この予約のステータスは変更できません", "invalid_status")
+
+        was_counted = db_obj.status != ReservationStatus.CANCELLED.value
+        sales_before = sales_rollup_service.contribution(db_obj)
         update_data = obj_in.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_obj, field, value)
+
+        # キャンセル状態が変わった場合は席の割り当てと空席台帳に反映
+        is_counted = db_obj.status != ReservationStatus.CANCELLED.value
+        seat_ids: list[str] = []
+        if was_counted and not is_counted:
+            await self._release_seats(db, reservation_ids=[db_obj.id])
+        elif is_counted and not was_counted:
+            # キャンセルを取り消す場合は、予約時の利用時間で改めて席を割り当てる
+            await self._lock_day(
+                db, restaurant_id=db_obj.restaurant_id, reservation_date=db_obj.reservation_date
+            )
+            layout, _, day = await self._load_seating(
+                db, restaurant_id=db_obj.restaurant_id, reservation_date=db_obj.reservation_date
+            )
+            tables = self._find_tables(
+                layout,
+                day,
+                reservation_time=db_obj.reservation_time,
+                duration_minutes=db_obj.duration_minutes,
+                party_size=db_obj.party_size,
+            )
+            if tables is None:
+                await db.rollback()
+                raise ReservationError(
+                    f"指定された日時に{db_obj.party_size}名で案内できる席がありません",
+                    "capacity_exceeded",
+                )
+            seat_ids = layout.seat_ids(tables)
+            self._add_seat_assignments(db, reservation=db_obj, seat_ids=seat_ids)
+        await sales_rollup_service.apply_change(
+            db, before=sales_before, after=sales_rollup_service.contribution(db_obj)
+        )
+        # キャンセルで空いた席にキャンセル待ちを案内する（同じトランザクションで確定する）
+        promoted: list[tuple[Reservation, list[str]]] = []
+        if was_counted and not is_counted:
+            start = to_minutes(db_obj.reservation_time)
+            promoted = await self._promote_waitlist(
+                db,
+                restaurant_id=db_obj.restaurant_id,
+                reservation_date=db_obj.reservation_date,
+                start=start,
+                end=start + db_obj.duration_minutes,
+            )
         await db.commit()
         await db.refresh(db_obj)
+
+        if was_counted and not is_counted:
+            self._publish_cancellation(db_obj)
+        elif is_counted and not was_counted:
+            self._publish_reservation(db_obj, seat_ids)
+        for reservation, promoted_seat_ids in promoted:
+            self._publish_reservation(reservation, promoted_seat_ids)
         return db_obj
 
+    async def bulk_update_status(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: str,
+        reservation_ids: list[str],
+        status: str,
+    ) -> list[dict[str, Any]]:
+        """店舗オーナーの複数の予約を、確定済みから完了またはキャンセルに一括で変更する
+
+        所有者の確認は予約と店舗を結合した1回の問い合わせで行い（対象行は行ロックする）、
+        変更は1回の UPDATE ... WHERE id = ANY(...) RETURNING で適用する。
+        キャンセルの場合は席の割り当て・売上ロールアップ・空席台帳を、
+        集計行ごとにまとめて反映する。
+
+        Returns:
+            reservation_ids の順に、予約ごとの結果（success, status, error, message）
+        """
+        if status not in BULK_TARGET_STATUSES:
+            raise ReservationError("変更後のステータスが不正です", "invalid_status")
+
+        reservation_ids = list(dict.fromkeys(reservation_ids))
+        result = await db.execute(
+            select(*BULK_COLUMNS, Restaurant.owner_id)
+            .join(Restaurant, Restaurant.id == Reservation.restaurant_id)
+            .where(Reservation.id == any_(literal(reservation_ids, ARRAY(String))))
+            .with_for_update(of=Reservation)
+        )
+        found = {row.id: row for row in result.all()}
+
+        errors: dict[str, tuple[str, str]] = {}
+        eligible: list[str] = []
+        for reservation_id in reservation_ids:
+            row = found.get(reservation_id)
+            if row is None:
+                errors[reservation_id] = ("not_found", "予約が見つかりません")
+            elif row.owner_id != owner_id:
+                errors[reservation_id] = ("forbidden", "この予約を更新する権限がありません")
+            elif row.status != ReservationStatus.CONFIRMED.value:
+                errors[reservation_id] = ("invalid_status", "この予約のステータスは変更できません")
+            else:
+                eligible.append(reservation_id)
+
+        updated: dict[str, Any] = {}
+        if eligible:
+            result = await db.execute(
+                update(Reservation)
+                .where(
+                    Reservation.id == any_(literal(eligible, ARRAY(String))),
+                    Reservation.status == ReservationStatus.CONFIRMED.value,
+                )
+                .values(status=status, updated_at=func.now())
+                .returning(*BULK_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )
+            updated = {row.id: row for row in result.all()}
+
+        cancelled = status == ReservationStatus.CANCELLED.value and bool(updated)
+        promoted: list[tuple[Reservation, list[str]]] = []
+        if cancelled:
+            await self._release_seats(db, reservation_ids=list(updated))
+            await sales_rollup_service.apply_changes(
+                db,
+                [
+                    (
+                        sales_rollup_service.contribution(found[reservation_id]),
+                        sales_rollup_service.contribution(row),
+                    )
+                    for reservation_id, row in updated.items()
+                ],
+            )
+            # 店舗・予約日ごとに、空いた時間帯全体に対してキャンセル待ちを案内する
+            windows: dict[tuple[str, date], tuple[int, int]] = {}
+            for row in updated.values():
+                start = to_minutes(row.reservation_time)
+                end = start + row.duration_minutes
+                day_key = (row.restaurant_id, row.reservation_date)
+                if day_key in windows:
+                    start = min(start, windows[day_key][0])
+                    end = max(end, windows[day_key][1])
+                windows[day_key] = (start, end)
+            for (restaurant_id, reservation_date), (start, end) in sorted(windows.items()):
+                promoted.extend(
+                    await self._promote_waitlist(
+                        db,
+                        restaurant_id=restaurant_id,
+                        reservation_date=reservation_date,
+                        start=start,
+                        end=end,
+                    )
+                )
+        await db.commit()
+        if cancelled:
+            for row in updated.values():
+                self._publish_cancellation(row)
+            for reservation, seat_ids in promoted:
+                self._publish_reservation(reservation, seat_ids)
+
+        results = []
+        for reservation_id in reservation_ids:
+            if reservation_id in updated:
+                results.append(
+                    {"reservation_id": reservation_id, "success": True, "status": status}
+                )
+                continue
+            code, message = errors.get(
+                reservation_id, ("conflict", "この予約は他の操作で更新されました")
+            )
+            row = found.get(reservation_id)
+            results.append(
+                {
+                    "reservation_id": reservation_id,
+                    "success": False,
+                    "status": row.status if row is not None and code != "forbidden" else None,
+                    "error": code,
+                    "message": message,
+                }
+            )
+        return results
+
+    async def assign_missing_seats(
+        self, db: AsyncSession, *, date_from: date | None = None
+    ) -> tuple[int, int]:
+        """席が割り当てられていない予約（席単位の割り当て導入前の予約）に席を割り当てる
+
+        date_from（既定は今日）以降のキャンセル以外の予約が対象。店舗・予約日ごとにロックし、
+        予約時間順（同じ時間は人数の多い順）に、利用時間の間ずっと空いている席を割り当てて
+        コミットする。席が足りずに割り当てられなかった予約は、そのまま（人数のみ数える状態で）残す。
+
+        Returns:
+            (割り当てた予約数, 割り当てられなかった予約数)
+        """
+        date_from = date_from or date.today()
+        unassigned_filter = (
+            Reservation.reservation_date >= date_from,
+            Reservation.status != ReservationStatus.CANCELLED.value,
+            ReservationSeat.reservation_id.is_(None),
+        )
+        result = await db.execute(
+            select(Reservation.restaurant_id, Reservation.reservation_date)
+            .outerjoin(ReservationSeat, ReservationSeat.reservation_id == Reservation.id)
+            .where(*unassigned_filter)
+            .distinct()
+            .order_by(Reservation.restaurant_id, Reservation.reservation_date)
+        )
+        day_keys = result.all()
+
+        assigned = unassigned = 0
+        for restaurant_id, reservation_date in day_keys:
+            await self._lock_day(db, restaurant_id=restaurant_id, reservation_date=reservation_date)
+            layout, _, day = await self._load_seating(
+                db, restaurant_id=restaurant_id, reservation_date=reservation_date
+            )
+            result = await db.execute(
+                select(Reservation)
+                .outerjoin(ReservationSeat, ReservationSeat.reservation_id == Reservation.id)
+                .where(
+                    Reservation.restaurant_id == restaurant_id,
+                    Reservation.reservation_date == reservation_date,
+                    *unassigned_filter,
+                )
+                .order_by(
+                    Reservation.reservation_time,
+                    Reservation.party_size.desc(),
+                    Reservation.created_at,
+                )
+            )
+            for reservation in result.scalars().all():
+                stay = day.stays[reservation.id]
+                # 予約自身は同時利用人数に既に含まれているため、空いている席だけで判定する
+                tables = layout.find_tables(
+                    day.occupied_seats(stay.start, stay.end), reservation.party_size
+                )
+                if tables is None:
+                    unassigned += 1
+                    continue
+                day.add(reservation.id, replace(stay, seats=tables))
+                self._add_seat_assignments(
+                    db, reservation=reservation, seat_ids=layout.seat_ids(tables)
+                )
+                assigned += 1
+            await db.commit()
+        # 他プロセスの空席台帳はTTL経過後に読み込み直される
+        capacity_ledger.clear()
+        return assigned, unassigned
+
 
 reservation_service = ReservationService()
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from datetime import date, datetime, timezone
+from typing import Any
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session import async_session_maker
+from app.models.reservation import Reservation, ReservationStatus
+
+logger = logging.getLogger(__name__)
+
+
+class ReservationCompletionJob:
+    """予約日を過ぎた確定済み予約を定期的に完了にするバックグラウンドジョブ
+
+    chunk_size 件ずつ、対象行を FOR UPDATE SKIP LOCKED で選んで1回のUPDATEで更新し、
+    チャンクごとにコミットする。行ロックはチャンク1つ分の短い間しか保持せず、
+    他のトランザクションがロック中の行は飛ばすため、予約の更新を待たせることも、
+    複数のワーカーで同時に実行して同じ行を取り合うこともない。
+
+    確定済みから完了への変更は席の割り当て・売上ロールアップ・空席台帳の
+    いずれにも影響しない（どれもキャンセル以外を数える）ため、状態のみを更新する。
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        *,
+        interval_seconds: float,
+        chunk_size: int,
+    ) -> None:
+        self.session_maker = session_maker
+        self.interval_seconds = interval_seconds
+        self.chunk_size = chunk_size
+        self._task: asyncio.Task | None = None
+        self._stop = asyncio.Event()
+        self.runs = 0
+        self.chunks = 0
+        self.completed = 0
+        self.running = False
+        self.last_run_at: datetime | None = None
+        self.last_run_completed = 0
+        self.last_run_seconds = 0.0
+        self.last_error: str | None = None
+
+    async def _complete_chunk(self, *, before: date) -> int:
+        targets = (
+            select(Reservation.id)
+            .where(
+                Reservation.status == ReservationStatus.CONFIRMED.value,
+                Reservation.reservation_date < before,
+            )
+            .limit(self.chunk_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with self.session_maker() as session:
+            result = await session.execute(
+                update(Reservation)
+                .where(
+                    Reservation.id.in_(targets),
+                    # サブクエリで選んだ後に他で更新された行は対象外にする
+                    Reservation.status == ReservationStatus.CONFIRMED.value,
+                )
+                .values(status=ReservationStatus.COMPLETED.value, updated_at=func.now())
+                .returning(Reservation.id)
+                .execution_options(synchronize_session=False)
+            )
+            count = len(result.all())
+            await session.commit()
+        return count
+
+    async def run_once(self, *, before: date | None = None) -> int:
+        """before（既定は今日）より前の確定済み予約をすべて完了にし、件数を返す"""
+        before = before or date.today()
+        started = time.perf_counter()
+        self.running = True
+        self.last_run_completed = 0
+        try:
+            while not self._stop.is_set():
+                count = await self._complete_chunk(before=before)
+                if count:
+                    self.chunks += 1
+                    self.completed += count
+                    self.last_run_completed += count
+                if count < self.chunk_size:
+                    break
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+        finally:
+            self.running = False
+            self.runs += 1
+            self.last_run_at = datetime.now(timezone.utc)
+            self.last_run_seconds = time.perf_counter() - started
+
+        if self.last_run_completed:
+            logger.info(
+                f"過去日の予約 {self.last_run_completed} 件を完了にしました"
+                f"（{self.last_run_seconds:.1f}秒）"
+            )
+        return self.last_run_completed
+
+    async def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"予約の自動完了に失敗しました: {e}")
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._stop.wait(), timeout=self.interval_seconds)
+
+    async def start(self) -> None:
+        if self._task is not None or self.interval_seconds <= 0:
+            return
+        self._stop.clear()
+        self._task = asyncio.create_task(self._loop(), name="reservation-completion")
+
+    async def stop(self) -> None:
+        """ジョブを停止する。実行中のチャンクはコミットまで完了させる"""
+        if self._task is None:
+            return
+        self._stop.set()
+        await self._task
+        self._task = None
+
+    async def stats(self, db: AsyncSession) -> dict[str, Any]:
+        remaining = await db.execute(
+            select(func.count()).where(
+                Reservation.status == ReservationStatus.CONFIRMED.value,
+                Reservation.reservation_date < date.today(),
+            )
+        )
+        return {
+            "enabled": self._task is not None,
+            "interval_seconds": self.interval_seconds,
+            "chunk_size": self.chunk_size,
+            "running": self.running,
+            "runs": self.runs,
+            "chunks": self.chunks,
+            "completed": self.completed,
+            "last_run_at": self.last_run_at,
+            "last_run_completed": self.last_run_completed,
+            "last_run_seconds": round(self.last_run_seconds, 3),
+            "last_error": self.last_error,
+            "remaining": remaining.scalar_one(),
+        }
+
+
+reservation_completion_job = ReservationCompletionJob(
+    async_session_maker,
+    interval_seconds=settings.RESERVATION_AUTO_COMPLETE_INTERVAL_SECONDS,
+    chunk_size=settings.RESERVATION_AUTO_COMPLETE_CHUNK_SIZE,
+)
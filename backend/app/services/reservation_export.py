@@ -0,0 +1,120 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Sequence
+from datetime import date
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.reservation import Reservation
+
+# エクスポートする列（帳票の列順）
+EXPORT_COLUMNS = (
+    Reservation.id,
+    Reservation.restaurant_id,
+    Reservation.customer_id,
+    Reservation.reservation_date,
+    Reservation.reservation_time,
+    Reservation.party_size,
+    Reservation.status,
+    Reservation.payment_method,
+    Reservation.payment_status,
+    Reservation.amount,
+    Reservation.created_at,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# サーバーサイドカーソルから一度に取得する行数（= 1チャンクの行数）
+EXPORT_CHUNK_SIZE = 2000
+
+
+def _json_value(value: Any) -> Any:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def export_filename(export_format: str) -> str:
+    return f"reservations.{export_format}"
+
+
+class ReservationExportService:
+    """予約をサーバーサイドカーソルで読みながらNDJSON/CSVとして逐次出力する
+
+    全件をメモリに載せず、EXPORT_CHUNK_SIZE 行ずつ取得・整形して送り出すため、
+    件数によらずメモリ使用量は一定になる。
+    """
+
+    def _build_query(
+        self,
+        *,
+        restaurant_id: str | None,
+        date_from: date | None,
+        date_to: date | None,
+    ):
+        query = select(*EXPORT_COLUMNS)
+        if restaurant_id:
+            query = query.where(Reservation.restaurant_id == restaurant_id)
+        if date_from:
+            query = query.where(Reservation.reservation_date >= date_from)
+        if date_to:
+            query = query.where(Reservation.reservation_date <= date_to)
+        return query.order_by(
+            Reservation.reservation_date, Reservation.reservation_time, Reservation.id
+        )
+
+    def _format_chunk(self, rows: Sequence[Any], export_format: str) -> bytes:
+        if export_format == "ndjson":
+            return "".join(
+                json.dumps(
+                    {
+                        field: _json_value(value)
+                        for field, value in zip(EXPORT_FIELDS, row, strict=True)
+                    },
+                    ensure_ascii=False,
+                )
+                + "\n"
+                for row in rows
+            ).encode()
+
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+    async def stream(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        *,
+        export_format: str,
+        restaurant_id: str | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+    ) -> AsyncIterator[bytes]:
+        """エクスポート内容をチャンク単位で返す非同期イテレータ
+
+        レスポンスの送信中に使うため、リクエストのセッションとは別に
+        専用のセッションを開き、出力が終わるまで保持する。
+        """
+        if export_format == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(EXPORT_FIELDS)
+            yield buffer.getvalue().encode()
+
+        query = self._build_query(
+            restaurant_id=restaurant_id, date_from=date_from, date_to=date_to
+        ).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+
+        async with session_maker() as session:
+            result = await session.stream(query)
+            async for rows in result.partitions():
+                yield self._format_chunk(rows, export_format)
+
+
+reservation_export_service = ReservationExportService()
@@ -1,18 +1,49 @@
-from datetime import date, time
+from datetime import date, datetime, time, timedelta
 
-from sqlalchemy import and_, func, select
+from sqlalchemy import Date, Select, cast, extract, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.reservation import PaymentMethod, Reservation, ReservationStatus
+from app.db.pagination import KeysetOrder
+from app.db.replica import is_replica_session
+from app.models.reservation import (
+    PaymentMethod,
+    Reservation,
+    ReservationSeat,
+    ReservationStatus,
+)
 from app.models.restaurant import Restaurant, RestaurantStatus, Seat
+from app.models.sales import DailySales
 from app.schemas.restaurant import (
+    AvailabilityDay,
+    AvailabilityGridResponse,
     AvailabilityResponse,
+    AvailabilitySlot,
     RestaurantCreate,
     RestaurantSalesResponse,
     RestaurantUpdate,
+    SalesBucket,
     SeatCreate,
 )
+from app.services.capacity_ledger import capacity_ledger
+from app.services.occupancy import (
+    DayOccupancy,
+    build_days,
+    dining_duration,
+    stays_query,
+    to_minutes,
+)
+from app.services.restaurant_facets import restaurant_facets
+from app.services.restaurant_search import restaurant_search
+from app.services.table_assignment import SeatSpec, TableLayout, assign_tables
+
+# 空席検索で一度に読み込む候補店舗の数
+SEARCH_BATCH_SIZE = 50
+
+# 店舗一覧のキーセットページングの並び順（登録順）
+RESTAURANT_LIST_ORDER = KeysetOrder(
+    "restaurants", ((Restaurant.created_at, False), (Restaurant.id, False))
+)
 
 
 class RestaurantService:
@@ -30,18 +61,14 @@ class RestaurantService:
         )
         return result.scalar_one_or_none()
 
-    async def get_list(
+    def _apply_list_filters(
         self,
-        db: AsyncSession,
+        query: Select,
         *,
-        skip: int = 0,
-        limit: int = 100,
         status: str | None = None,
         genre: str | None = None,
         area: str | None = None,
-    ) -> list[Restaurant]:
-        query = select(Restaurant)
-
+    ) -> Select:
         if status:
             query = query.where(Restaurant.status == status)
         else:
@@ -51,11 +78,169 @@ class RestaurantService:
             query = query.where(Restaurant.genre == genre)
         if area:
             query = query.where(Restaurant.area == area)
+        return query
 
-        query = query.offset(skip).limit(limit)
-        result = await db.execute(query)
+    async def get_list(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        status: str | None = None,
+        genre: str | None = None,
+        area: str | None = None,
+        cursor: str | None = None,
+        q: str | None = None,
+    ) -> list[Restaurant]:
+        """店舗一覧を取得する
+
+        q を指定した場合はキーワード検索の結果を関連度順に返す（cursor は使わない）。
+        """
+        query = self._apply_list_filters(select(Restaurant), status=status, genre=genre, area=area)
+        if q is not None:
+            return await restaurant_search.search(
+                db,
+                query=query,
+                q=q,
+                status=status or RestaurantStatus.ACTIVE.value,
+                genre=genre,
+                area=area,
+                skip=skip,
+                limit=limit,
+            )
+
+        query = RESTAURANT_LIST_ORDER.apply(query, cursor)
+        if not cursor:
+            query = query.offset(skip)
+        result = await db.execute(query.limit(limit))
         return list(result.scalars().all())
 
+    async def search_available(
+        self,
+        db: AsyncSession,
+        *,
+        reservation_date: date,
+        reservation_time: time,
+        party_size: int,
+        skip: int = 0,
+        limit: int = 100,
+        genre: str | None = None,
+        area: str | None = None,
+    ) -> list[Restaurant]:
+        """指定日時・人数で予約可能な店舗を検索する
+
+        get_list と同じ絞り込みに加えて、席の合計キャパシティと、指定時刻に利用中の
+        （開始済みで終了前の）予約人数の合計を店舗ごとに集計・結合し、空き人数が人数以上の
+        店舗を候補として取得する（必要条件）。候補ごとに席構成とその日の予約の利用時間帯を
+        まとめて読み込み、店舗の利用時間の間ずっと空いている席を割り当てられる店舗だけを返す。
+        """
+        capacity_subquery = (
+            select(
+                Seat.restaurant_id,
+                func.sum(Seat.capacity).label("total_capacity"),
+            )
+            .group_by(Seat.restaurant_id)
+            .subquery()
+        )
+        start_minutes = extract("epoch", Reservation.reservation_time) / 60
+        reserved_subquery = (
+            select(
+                Reservation.restaurant_id,
+                func.sum(Reservation.party_size).label("reserved_count"),
+            )
+            .where(
+                Reservation.reservation_date == reservation_date,
+                Reservation.reservation_time <= reservation_time,
+                start_minutes + Reservation.duration_minutes > to_minutes(reservation_time),
+                Reservation.status != ReservationStatus.CANCELLED.value,
+            )
+            .group_by(Reservation.restaurant_id)
+            .subquery()
+        )
+        remaining_capacity = capacity_subquery.c.total_capacity - func.coalesce(
+            reserved_subquery.c.reserved_count, 0
+        )
+
+        query = (
+            select(Restaurant)
+            .join(capacity_subquery, capacity_subquery.c.restaurant_id == Restaurant.id)
+            .outerjoin(reserved_subquery, reserved_subquery.c.restaurant_id == Restaurant.id)
+            .where(remaining_capacity >= party_size)
+        )
+        query = self._apply_list_filters(query, genre=genre, area=area).order_by(Restaurant.id)
+
+        # 候補を順に読み、席を割り当てられる店舗が skip + limit 件集まるまで続ける
+        batch_size = max(skip + limit, SEARCH_BATCH_SIZE)
+        matched: list[Restaurant] = []
+        offset = 0
+        while len(matched) < skip + limit:
+            result = await db.execute(query.offset(offset).limit(batch_size))
+            candidates = list(result.scalars().all())
+            if not candidates:
+                break
+            seatable = await self._seatable_restaurants(
+                db,
+                restaurants=candidates,
+                reservation_date=reservation_date,
+                reservation_time=reservation_time,
+                party_size=party_size,
+            )
+            matched.extend(restaurant for restaurant in candidates if restaurant.id in seatable)
+            if len(candidates) < batch_size:
+                break
+            offset += batch_size
+        return matched[skip : skip + limit]
+
+    async def _seatable_restaurants(
+        self,
+        db: AsyncSession,
+        *,
+        restaurants: list[Restaurant],
+        reservation_date: date,
+        reservation_time: time,
+        party_size: int,
+    ) -> set[str]:
+        """候補の店舗のうち、指定時刻から店舗の利用時間の間、人数分の席を割り当てられる店舗のIDを返す"""
+        restaurant_ids = [restaurant.id for restaurant in restaurants]
+        seats: dict[str, list[SeatSpec]] = {}
+        result = await db.execute(
+            select(Seat.restaurant_id, Seat.id, Seat.capacity, Seat.combine_group).where(
+                Seat.restaurant_id.in_(restaurant_ids)
+            )
+        )
+        for row in result.all():
+            seats.setdefault(row.restaurant_id, []).append(
+                SeatSpec(id=row.id, capacity=row.capacity, combine_group=row.combine_group)
+            )
+        layouts = {
+            restaurant_id: TableLayout.from_seats(seats.get(restaurant_id, ()))
+            for restaurant_id in restaurant_ids
+        }
+
+        result = await db.execute(
+            stays_query().where(
+                Reservation.restaurant_id.in_(restaurant_ids),
+                Reservation.reservation_date == reservation_date,
+            )
+        )
+        days = build_days(result.all(), layouts.__getitem__)
+
+        start = to_minutes(reservation_time)
+        seatable: set[str] = set()
+        for restaurant in restaurants:
+            layout = layouts[restaurant.id]
+            day = days.get((restaurant.id, reservation_date), DayOccupancy())
+            end = start + dining_duration(restaurant.dining_duration_minutes)
+            tables = assign_tables(
+                layout,
+                occupied=day.occupied_seats(start, end),
+                reserved=day.max_concurrent(start, end),
+                party_size=party_size,
+            )
+            if tables is not None:
+                seatable.add(restaurant.id)
+        return seatable
+
     async def create(
         self, db: AsyncSession, *, obj_in: RestaurantCreate, owner_id: str
     ) -> Restaurant:
@@ -71,10 +256,13 @@ class RestaurantService:
             opening_hours=obj_in.opening_hours,
             closing_days=obj_in.closing_days,
             image_url=obj_in.image_url,
+            dining_duration_minutes=obj_in.dining_duration_minutes,
         )
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        restaurant_search.invalidate()
+        restaurant_facets.clear()
         return db_obj
 
     async def update(
@@ -85,6 +273,10 @@ class RestaurantService:
             setattr(db_obj, field, value)
         await db.commit()
         await db.refresh(db_obj)
+        if "dining_duration_minutes" in update_data:
+            capacity_ledger.invalidate_restaurant(db_obj.id)
+        restaurant_search.invalidate()
+        restaurant_facets.clear()
         return db_obj
 
     async def update_status(
@@ -93,6 +285,9 @@ class RestaurantService:
         db_obj.status = status
         await db.commit()
         await db.refresh(db_obj)
+        capacity_ledger.invalidate_restaurant(db_obj.id)
+        restaurant_search.invalidate()
+        restaurant_facets.clear()
         return db_obj
 
     async def add_seat(
@@ -102,18 +297,34 @@ class RestaurantService:
             restaurant_id=restaurant_id,
             name=obj_in.name,
             capacity=obj_in.capacity,
+            combine_group=obj_in.combine_group,
         )
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        capacity_ledger.invalidate_restaurant(restaurant_id)
         return db_obj
 
+    async def has_upcoming_assignments(self, db: AsyncSession, *, seat_id: str) -> bool:
+        """今日以降の予約が割り当てられている席かどうか"""
+        result = await db.execute(
+            select(ReservationSeat.reservation_id)
+            .where(
+                ReservationSeat.seat_id == seat_id,
+                ReservationSeat.reservation_date >= date.today(),
+            )
+            .limit(1)
+        )
+        return result.first() is not None
+
     async def delete_seat(self, db: AsyncSession, *, seat_id: str) -> None:
+        """席を削除する（過去の予約への割り当ても合わせて削除される）"""
         result = await db.execute(select(Seat).where(Seat.id == seat_id))
         seat = result.scalar_one_or_none()
         if seat:
             await db.delete(seat)
             await db.commit()
+            capacity_ledger.invalidate_restaurant(seat.restaurant_id)
 
     async def get_sales(
         self,
@@ -122,77 +333,83 @@ class RestaurantService:
         restaurant_id: str,
         date_from: date | None = None,
         date_to: date | None = None,
+        granularity: str | None = None,
     ) -> RestaurantSalesResponse:
-        """店舗の売上を集計する"""
-        # 総売上・予約件数を取得（キャンセル以外）
-        base_query = select(
-            func.count(Reservation.id).label("total_reservations"),
-            func.coalesce(func.sum(Reservation.amount), 0).label("total_sales"),
-        ).where(
-            Reservation.restaurant_id == restaurant_id,
-            Reservation.status != "cancelled",
-        )
-
-        if date_from:
-            base_query = base_query.where(Reservation.reservation_date >= date_from)
-        if date_to:
-            base_query = base_query.where(Reservation.reservation_date <= date_to)
-
-        result = await db.execute(base_query)
-        row = result.one()
-        total_reservations = row.total_reservations or 0
-        total_sales = row.total_sales or 0
-
-        # 事前決済（online）の売上・件数を取得
-        online_query = select(
-            func.count(Reservation.id).label("online_reservations"),
-            func.coalesce(func.sum(Reservation.amount), 0).label("online_sales"),
-        ).where(
-            Reservation.restaurant_id == restaurant_id,
-            Reservation.status != "cancelled",
-            Reservation.payment_method == PaymentMethod.ONLINE.value,
-        )
-
-        if date_from:
-            online_query = online_query.where(Reservation.reservation_date >= date_from)
-        if date_to:
-            online_query = online_query.where(Reservation.reservation_date <= date_to)
-
-        online_result = await db.execute(online_query)
-        online_row = online_result.one()
-        online_reservations = online_row.online_reservations or 0
-        online_sales = online_row.online_sales or 0
-
-        # 現地払い（onsite）の売上・件数を取得
-        onsite_query = select(
-            func.count(Reservation.id).label("onsite_reservations"),
-            func.coalesce(func.sum(Reservation.amount), 0).label("onsite_sales"),
-        ).where(
-            Reservation.restaurant_id == restaurant_id,
-            Reservation.status != "cancelled",
-            Reservation.payment_method == PaymentMethod.ONSITE.value,
-        )
+        """店舗の売上を集計する
 
+        日次売上ロールアップ（daily_sales）から、総売上と事前決済（online）・
+        現地払い（onsite）別の売上を条件付き集計（FILTER句）で1回のクエリにまとめて取得する。
+        予約件数ではなく日数に比例するため、履歴が増えても集計時間は変わらない。
+        granularity（day / week / month）を指定した場合は期間ごとにGROUP BYし、
+        時系列（series）と合計を同じ1回のクエリから組み立てる。
+        """
+        is_online = DailySales.payment_method == PaymentMethod.ONLINE.value
+        is_onsite = DailySales.payment_method == PaymentMethod.ONSITE.value
+        columns = [
+            func.coalesce(func.sum(DailySales.reservation_count), 0).label("total_reservations"),
+            func.coalesce(func.sum(DailySales.sales_amount), 0).label("total_sales"),
+            func.coalesce(func.sum(DailySales.reservation_count).filter(is_online), 0).label(
+                "online_reservations"
+            ),
+            func.coalesce(func.sum(DailySales.sales_amount).filter(is_online), 0).label(
+                "online_sales"
+            ),
+            func.coalesce(func.sum(DailySales.reservation_count).filter(is_onsite), 0).label(
+                "onsite_reservations"
+            ),
+            func.coalesce(func.sum(DailySales.sales_amount).filter(is_onsite), 0).label(
+                "onsite_sales"
+            ),
+        ]
+
+        conditions = [DailySales.restaurant_id == restaurant_id]
         if date_from:
-            onsite_query = onsite_query.where(Reservation.reservation_date >= date_from)
+            conditions.append(DailySales.sales_date >= date_from)
         if date_to:
-            onsite_query = onsite_query.where(Reservation.reservation_date <= date_to)
-
-        onsite_result = await db.execute(onsite_query)
-        onsite_row = onsite_result.one()
-        onsite_reservations = onsite_row.onsite_reservations or 0
-        onsite_sales = onsite_row.onsite_sales or 0
+            conditions.append(DailySales.sales_date <= date_to)
+
+        series: list[SalesBucket] = []
+        if granularity:
+            period_start = cast(func.date_trunc(granularity, DailySales.sales_date), Date)
+            query = (
+                select(period_start.label("period_start"), *columns)
+                .where(*conditions)
+                .group_by(period_start)
+                .having(func.sum(DailySales.reservation_count) > 0)
+                .order_by(period_start)
+            )
+            result = await db.execute(query)
+            series = [SalesBucket.model_validate(row, from_attributes=True) for row in result.all()]
+            totals = {
+                field: sum(getattr(bucket, field) for bucket in series)
+                for field in (
+                    "total_sales",
+                    "total_reservations",
+                    "online_sales",
+                    "online_reservations",
+                    "onsite_sales",
+                    "onsite_reservations",
+                )
+            }
+        else:
+            result = await db.execute(select(*columns).where(*conditions))
+            row = result.one()
+            totals = {
+                "total_sales": row.total_sales or 0,
+                "total_reservations": row.total_reservations or 0,
+                "online_sales": row.online_sales or 0,
+                "online_reservations": row.online_reservations or 0,
+                "onsite_sales": row.onsite_sales or 0,
+                "onsite_reservations": row.onsite_reservations or 0,
+            }
 
         return RestaurantSalesResponse(
             restaurant_id=restaurant_id,
             date_from=date_from,
             date_to=date_to,
-            total_sales=total_sales,
-            total_reservations=total_reservations,
-            online_sales=online_sales,
-            online_reservations=online_reservations,
-            onsite_sales=onsite_sales,
-            onsite_reservations=onsite_reservations,
+            granularity=granularity,
+            series=series,
+            **totals,
         )
 
     async def check_availability(
@@ -207,7 +424,10 @@ class RestaurantService:
         """店舗の空席状況を確認する
 
         指定された日時・人数で予約可能かどうかを判定する。
-        店舗の席の合計キャパシティと既存予約の人数を比較して判定。
+        予約時間から店舗の利用時間の間ずっと空いている席（テーブル）に、人数分の席を
+        割り当てられるかで判定する（前後の時間の予約と利用時間が重なる席は使えない）。
+        席構成とその日の予約の利用時間帯はプロセス内の空席台帳から取得し、
+        未読み込みの場合のみDBを参照する。
 
         Args:
             db: データベースセッション
@@ -222,8 +442,8 @@ class RestaurantService:
         date_str = reservation_date.isoformat()
         time_str = reservation_time.strftime("%H:%M")
 
-        # 店舗と席情報を取得
-        restaurant = await self.get(db, id=restaurant_id)
+        # 店舗のステータスと席キャパシティを台帳から取得
+        restaurant = await capacity_ledger.get_restaurant(db, restaurant_id=restaurant_id)
         if not restaurant:
             return AvailabilityResponse(
                 available=False,
@@ -245,9 +465,8 @@ class RestaurantService:
                 message="この店舗は現在予約を受け付けていません",
             )
 
-        # 席情報を取得
-        seats = restaurant.seats
-        if not seats:
+        # 席情報を確認
+        if restaurant.seat_count == 0:
             return AvailabilityResponse(
                 available=False,
                 restaurant_id=restaurant_id,
@@ -257,39 +476,34 @@ class RestaurantService:
                 message="この店舗には席が登録されていません",
             )
 
-        # 店舗の総キャパシティを計算
-        total_capacity = sum(seat.capacity for seat in seats)
-
-        # 人数が最大キャパシティを超えている場合
-        if party_size > total_capacity:
+        # 1組に案内できる最大人数（単独のテーブル、または組み合わせ可能なテーブルの合計）
+        max_party_size = restaurant.layout.max_party_size
+        if party_size > max_party_size:
             return AvailabilityResponse(
                 available=False,
                 restaurant_id=restaurant_id,
                 date=date_str,
                 time=time_str,
                 party_size=party_size,
-                message=f"指定された人数（{party_size}名）は店舗の最大収容人数（{total_capacity}名）を超えています",
+                message=f"指定された人数（{party_size}名）は1組で案内できる最大人数（{max_party_size}名）を超えています",
             )
 
-        # 同じ日時の既存予約を取得（キャンセル以外）
-        existing_reservations_query = select(
-            func.coalesce(func.sum(Reservation.party_size), 0).label("reserved_count")
-        ).where(
-            and_(
-                Reservation.restaurant_id == restaurant_id,
-                Reservation.reservation_date == reservation_date,
-                Reservation.reservation_time == reservation_time,
-                Reservation.status != ReservationStatus.CANCELLED.value,
-            )
+        # その日の予約の利用時間帯を台帳から取得し、利用時間と重なる予約を調べる（キャンセル以外）
+        day = await capacity_ledger.get_day(
+            db,
+            restaurant_id=restaurant_id,
+            reservation_date=reservation_date,
+            layout=restaurant.layout,
         )
-        result = await db.execute(existing_reservations_query)
-        row = result.one()
-        reserved_count = row.reserved_count or 0
-
-        # 空き人数を計算
-        available_capacity = total_capacity - reserved_count
-
-        if party_size <= available_capacity:
+        start = to_minutes(reservation_time)
+        end = start + restaurant.dining_duration_minutes
+        tables = assign_tables(
+            restaurant.layout,
+            occupied=day.occupied_seats(start, end),
+            reserved=day.max_concurrent(start, end),
+            party_size=party_size,
+        )
+        if tables is not None:
             return AvailabilityResponse(
                 available=True,
                 restaurant_id=restaurant_id,
@@ -305,8 +519,123 @@ class RestaurantService:
                 date=date_str,
                 time=time_str,
                 party_size=party_size,
-                message=f"指定された日時の空き人数は{available_capacity}名です",
+                message=f"指定された日時に{party_size}名で案内できる席がありません",
             )
 
+    async def get_availability_grid(
+        self,
+        db: AsyncSession,
+        *,
+        restaurant_id: str,
+        date_from: date,
+        date_to: date,
+        time_from: time,
+        time_to: time,
+        interval_minutes: int,
+        party_size: int,
+    ) -> AvailabilityGridResponse:
+        """期間内の全予約枠の空席状況をまとめて取得する
+
+        席構成の取得1回と、期間内の予約の利用時間帯・割り当てた席の取得1回で
+        日付×時間の空席マトリクスを組み立てる。各枠は、予約時間から店舗の利用時間の間に
+        使用中の席のビットセットに対して席の割り当てを試して判定する。
+        読み込んだ日ごとの利用時間帯は空席台帳のウォームアップにも使う。
+
+        Args:
+            db: データベースセッション
+            restaurant_id: 店舗ID
+            date_from: 開始日
+            date_to: 終了日（この日を含む）
+            time_from: 最初の枠の時間
+            time_to: 最後の枠の時間（この時間を含む）
+            interval_minutes: 枠の間隔（分）
+            party_size: 人数
+
+        Returns:
+            AvailabilityGridResponse: 空席カレンダーレスポンス
+        """
+        restaurant = await capacity_ledger.get_restaurant(db, restaurant_id=restaurant_id)
+        message = None
+        if not restaurant:
+            message = "店舗が見つかりません"
+        elif restaurant.status != RestaurantStatus.ACTIVE.value:
+            message = "この店舗は現在予約を受け付けていません"
+        elif restaurant.seat_count == 0:
+            message = "この店舗には席が登録されていません"
+        if message or not restaurant:
+            return AvailabilityGridResponse(
+                restaurant_id=restaurant_id,
+                party_size=party_size,
+                interval_minutes=interval_minutes,
+                dining_duration_minutes=restaurant.dining_duration_minutes if restaurant else 0,
+                total_capacity=restaurant.total_capacity if restaurant else 0,
+                message=message,
+            )
+
+        # 枠の時間一覧（time_from から interval_minutes 刻みで time_to まで）
+        slot_times: list[time] = []
+        current = datetime.combine(date_from, time_from)
+        last = datetime.combine(date_from, time_to)
+        while current <= last:
+            slot_times.append(current.time())
+            current += timedelta(minutes=interval_minutes)
+
+        # 期間内の予約（キャンセル以外）の利用時間帯と割り当てた席を日ごとにまとめる。
+        # 前後の時間の予約とも利用時間が重なるため、時間帯で絞らず日単位で読み込む
+        layout = restaurant.layout
+        generation = capacity_ledger.generation
+        result = await db.execute(
+            stays_query().where(
+                Reservation.restaurant_id == restaurant_id,
+                Reservation.reservation_date >= date_from,
+                Reservation.reservation_date <= date_to,
+            )
+        )
+        loaded_days = build_days(result.all(), lambda _: layout)
+
+        total_capacity = restaurant.total_capacity
+        duration = restaurant.dining_duration_minutes
+        days: list[AvailabilityDay] = []
+        grid_days: dict[date, DayOccupancy] = {}
+        current_date = date_from
+        while current_date <= date_to:
+            day = loaded_days.get((restaurant_id, current_date), DayOccupancy())
+            grid_days[current_date] = day
+            slots: list[AvailabilitySlot] = []
+            for slot_time in slot_times:
+                start = to_minutes(slot_time)
+                end = start + duration
+                reserved = day.max_concurrent(start, end)
+                occupied = day.occupied_seats(start, end)
+                tables = assign_tables(
+                    layout, occupied=occupied, reserved=reserved, party_size=party_size
+                )
+                slots.append(
+                    AvailabilitySlot(
+                        time=slot_time.strftime("%H:%M"),
+                        reserved=reserved,
+                        remaining_capacity=min(
+                            layout.free_capacity(occupied), max(total_capacity - reserved, 0)
+                        ),
+                        available=tables is not None,
+                    )
+                )
+            days.append(AvailabilityDay(date=current_date.isoformat(), slots=slots))
+            current_date += timedelta(days=1)
+
+        if not is_replica_session(db):
+            capacity_ledger.prime_days(
+                restaurant_id=restaurant_id, days=grid_days, layout=layout, generation=generation
+            )
+
+        return AvailabilityGridResponse(
+            restaurant_id=restaurant_id,
+            party_size=party_size,
+            interval_minutes=interval_minutes,
+            dining_duration_minutes=duration,
+            total_capacity=total_capacity,
+            days=days,
+        )
+
 
 restaurant_service = RestaurantService()
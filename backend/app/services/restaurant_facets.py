@@ -0,0 +1,94 @@
+from typing import Any
+
+from sqlalchemy import and_, func, select, true, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.restaurant import Restaurant
+from app.schemas.restaurant import FacetCount, RestaurantFacets
+from app.services.restaurant_search import restaurant_search
+
+# (ステータス, ジャンル, エリア, キーワード)
+FacetKey = tuple[str, str | None, str | None, str | None]
+
+
+class RestaurantFacetCounter:
+    """店舗一覧のジャンル別・エリア別の件数（ファセット）
+
+    件数は GROUPING SETS ((genre), (area), ()) の1回の集計クエリで求める。
+    ジャンル別の件数はジャンル以外の絞り込み（エリア・キーワード）、エリア別の件数は
+    エリア以外の絞り込みを適用して数える（選択中の項目以外に切り替えた場合の件数を示すため）。
+    絞り込みの組み合わせごとに結果をキャッシュし、店舗の登録・更新時にすべて破棄する。
+    """
+
+    def __init__(self, *, maxsize: int, ttl_seconds: float) -> None:
+        self._cache: TTLCache[FacetKey, RestaurantFacets] = TTLCache(
+            maxsize=maxsize, ttl_seconds=ttl_seconds
+        )
+
+    async def get(
+        self,
+        db: AsyncSession,
+        *,
+        status: str,
+        genre: str | None = None,
+        area: str | None = None,
+        q: str | None = None,
+    ) -> RestaurantFacets:
+        key = (status, genre or None, area or None, q)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        genre_condition = Restaurant.genre == genre if genre else true()
+        area_condition = Restaurant.area == area if area else true()
+        query = (
+            select(
+                Restaurant.genre,
+                Restaurant.area,
+                func.grouping(Restaurant.genre, Restaurant.area).label("grouping"),
+                func.count().filter(area_condition).label("genre_count"),
+                func.count().filter(genre_condition).label("area_count"),
+                func.count().filter(and_(genre_condition, area_condition)).label("total"),
+            )
+            .where(Restaurant.status == status)
+            .group_by(
+                func.grouping_sets(
+                    tuple_(Restaurant.genre), tuple_(Restaurant.area), tuple_()
+                )
+            )
+        )
+        if q is not None:
+            query = query.where(await restaurant_search.match_condition(db, q=q, status=status))
+        result = await db.execute(query)
+
+        genres: list[FacetCount] = []
+        areas: list[FacetCount] = []
+        total = 0
+        for row in result.all():
+            # grouping のビット: 1 = エリアで集約（ジャンル別）、2 = ジャンルで集約（エリア別）
+            if row.grouping == 1 and row.genre_count:
+                genres.append(FacetCount(value=row.genre, count=row.genre_count))
+            elif row.grouping == 2 and row.area_count:
+                areas.append(FacetCount(value=row.area, count=row.area_count))
+            elif row.grouping == 3:
+                total = row.total
+        facets = RestaurantFacets(
+            total=total,
+            genre=sorted(genres, key=lambda facet: (-facet.count, facet.value)),
+            area=sorted(areas, key=lambda facet: (-facet.count, facet.value)),
+        )
+        self._cache.set(key, facets)
+        return facets
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return self._cache.stats()
+
+
+restaurant_facets = RestaurantFacetCounter(
+    maxsize=settings.FACET_CACHE_MAX_SIZE, ttl_seconds=settings.FACET_CACHE_TTL_SECONDS
+)
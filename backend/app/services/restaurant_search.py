@@ -0,0 +1,351 @@
+import asyncio
+import heapq
+import logging
+import math
+import re
+import time as time_module
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    String,
+    and_,
+    any_,
+    false,
+    func,
+    literal,
+    or_,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.restaurant import Restaurant
+
+logger = logging.getLogger(__name__)
+
+# キーワードとして扱う語の最大数（それ以降の語は無視する）
+MAX_SEARCH_TERMS = 5
+
+# あいまい一致とみなす語の類似度（pg_trgm の word_similarity_threshold の既定値と同じ）
+WORD_SIMILARITY_THRESHOLD = 0.6
+
+TRIGRAM_INDEX_NAME = "ix_restaurants_search_document_trgm"
+
+_WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+def search_terms(q: str) -> list[str]:
+    """検索文字列を空白（全角を含む）で区切った語の一覧"""
+    return q.split()[:MAX_SEARCH_TERMS]
+
+
+def trigrams(value: str) -> set[str]:
+    """pg_trgm と同様に、英数字の連続を語として前に空白2つ・後ろに空白1つを補い3文字ずつに分ける"""
+    result: set[str] = set()
+    for word in _WORD_PATTERN.findall(value.casefold()):
+        padded = f"  {word} "
+        result.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _bigrams(value: str) -> set[str]:
+    """英数字の連続の中の2文字ずつの部分文字列"""
+    return {
+        word[i : i + 2]
+        for word in _WORD_PATTERN.findall(value.casefold())
+        for i in range(len(word) - 1)
+    }
+
+
+@dataclass(frozen=True)
+class _Document:
+    id: str
+    text: str
+    status: str
+    genre: str
+    area: str
+
+
+class SearchIndex:
+    """pg_trgm が使えない環境向けの、プロセス内のトライグラム転置インデックス
+
+    店舗の検索対象（search_document）と店名のトライグラムから、店舗の番号の集合への
+    対応（ポスティング）を保持する。語ごとに、語のトライグラムのポスティングを数え上げて
+    語のトライグラムのうち店舗側に含まれる割合（pg_trgm の word_similarity の近似）を求め、
+    しきい値以上の店舗と、語を部分文字列として含む店舗を一致とする。部分一致の候補は、
+    3文字以上の語は語の内側のトライグラムのポスティングの積集合、2文字の語は
+    2文字ずつの部分文字列のポスティングから求める（それ以外は全件を確認する）。
+    """
+
+    def __init__(self, documents: list[_Document], loaded_at: float) -> None:
+        self.documents = documents
+        self.loaded_at = loaded_at
+        self.postings: dict[str, set[int]] = {}
+        self.name_postings: dict[str, set[int]] = {}
+        self.bigram_postings: dict[str, set[int]] = {}
+        self.by_status: dict[str, set[int]] = {}
+        self.by_genre: dict[str, set[int]] = {}
+        self.by_area: dict[str, set[int]] = {}
+        for number, document in enumerate(documents):
+            self.by_status.setdefault(document.status, set()).add(number)
+            self.by_genre.setdefault(document.genre, set()).add(number)
+            self.by_area.setdefault(document.area, set()).add(number)
+
+    @classmethod
+    def build(cls, rows: Sequence[Any], loaded_at: float) -> "SearchIndex":
+        """登録順に並んだ店舗の行（id・name・search_document・status・genre・area）から構築する"""
+        index = cls(
+            [
+                _Document(
+                    id=row.id,
+                    text=row.search_document.casefold(),
+                    status=row.status,
+                    genre=row.genre,
+                    area=row.area,
+                )
+                for row in rows
+            ],
+            loaded_at,
+        )
+        for number, row in enumerate(rows):
+            index.add(number, name=row.name, search_document=row.search_document)
+        return index
+
+    def add(self, number: int, *, name: str, search_document: str) -> None:
+        for trigram in trigrams(search_document):
+            self.postings.setdefault(trigram, set()).add(number)
+        for trigram in trigrams(name):
+            self.name_postings.setdefault(trigram, set()).add(number)
+        for bigram in _bigrams(search_document):
+            self.bigram_postings.setdefault(bigram, set()).add(number)
+
+    def _substring_matches(self, term: str) -> set[int]:
+        if len(term) >= 3 and _WORD_PATTERN.fullmatch(term):
+            candidates = set.intersection(
+                *sorted(
+                    (self.postings.get(term[i : i + 3], set()) for i in range(len(term) - 2)),
+                    key=len,
+                )
+            )
+        elif len(term) == 2 and _WORD_PATTERN.fullmatch(term):
+            return set(self.bigram_postings.get(term, set()))
+        else:
+            candidates = set(range(len(self.documents)))
+        return {number for number in candidates if term in self.documents[number].text}
+
+    def _match(self, term: str) -> dict[int, float]:
+        """語に一致する店舗の番号と関連度（類似度、店名の類似度を加点）
+
+        語の n 個のトライグラムのうち k 個以上を含む店舗は、ポスティングの小さい順に
+        n - k + 1 個のトライグラムのいずれかを必ず含むため、それらの和集合を候補にして数える。
+        """
+        term = term.casefold()
+        term_trigrams = sorted(
+            trigrams(term), key=lambda trigram: len(self.postings.get(trigram, ()))
+        )
+        size = len(term_trigrams) or 1
+        required = math.ceil(WORD_SIMILARITY_THRESHOLD * size)
+        substrings = self._substring_matches(term)
+        candidates = set(substrings)
+        for trigram in term_trigrams[: len(term_trigrams) - required + 1]:
+            candidates |= self.postings.get(trigram, set())
+
+        counts: Counter[int] = Counter()
+        name_counts: Counter[int] = Counter()
+        for trigram in term_trigrams:
+            counts.update(self.postings.get(trigram, set()) & candidates)
+            name_counts.update(self.name_postings.get(trigram, set()) & candidates)
+        return {
+            number: (counts[number] + name_counts[number]) / size
+            for number in candidates
+            if counts[number] >= required or number in substrings
+        }
+
+    def _scores(self, terms: list[str]) -> dict[int, float]:
+        """すべての語に一致する店舗の番号と関連度の合計"""
+        scores: dict[int, float] = {}
+        for i, term in enumerate(terms):
+            matched = self._match(term)
+            if i == 0:
+                scores = matched
+            else:
+                scores = {
+                    number: score + matched[number]
+                    for number, score in scores.items()
+                    if number in matched
+                }
+            if not scores:
+                break
+        return scores
+
+    def matching_ids(self, terms: list[str], *, status: str) -> list[str]:
+        """すべての語に一致する、指定ステータスの店舗ID（順不同）"""
+        numbers = self._scores(terms).keys() & self.by_status.get(status, set())
+        return [self.documents[number].id for number in numbers]
+
+    def search(
+        self,
+        terms: list[str],
+        *,
+        status: str,
+        genre: str | None = None,
+        area: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list[str]:
+        """すべての語に一致する店舗IDを関連度の高い順（同じなら登録順）に返す"""
+        scores = self._scores(terms)
+        numbers = scores.keys() & self.by_status.get(status, set())
+        if genre:
+            numbers &= self.by_genre.get(genre, set())
+        if area:
+            numbers &= self.by_area.get(area, set())
+        # 店舗の番号は登録順なので、関連度が同じ場合は番号の小さい順に並べる
+        ranked = heapq.nsmallest(
+            skip + limit, numbers, key=lambda number: (-scores[number], number)
+        )
+        return [self.documents[number].id for number in ranked[skip:]]
+
+
+class RestaurantSearch:
+    """店舗のキーワード検索（部分一致・あいまい一致、関連度順）
+
+    店名・ジャンル・エリア・説明を連結した生成列 search_document を対象にする。
+    pg_trgm のトライグラムインデックスがあれば、語ごとの部分一致（ILIKE）と
+    あいまい一致（<%）をインデックスで絞り込み、word_similarity の合計
+    （店名への一致は加点）で並べる。インデックスが無い場合はプロセス内の
+    転置インデックス（SearchIndex）で検索し、一致した店舗だけをDBから読み込む。
+    転置インデックスは SEARCH_INDEX_TTL_SECONDS ごと、または店舗の登録・更新時に作り直す。
+    インデックスの有無も同じ間隔で確認し直す（マイグレーションでの作成・削除に追従する）。
+    """
+
+    def __init__(self, *, ttl_seconds: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._trigram_index: bool | None = None
+        self._trigram_checked_at = 0.0
+        self._index: SearchIndex | None = None
+        self._lock = asyncio.Lock()
+
+    async def _has_trigram_index(self, db: AsyncSession) -> bool:
+        now = time_module.monotonic()
+        if self._trigram_index is None or now - self._trigram_checked_at >= self.ttl_seconds:
+            result = await db.execute(
+                text("SELECT 1 FROM pg_indexes WHERE indexname = :name"),
+                {"name": TRIGRAM_INDEX_NAME},
+            )
+            available = result.first() is not None
+            self._trigram_checked_at = now
+            if available != self._trigram_index:
+                if available:
+                    logger.info("pg_trgm のインデックスを使用して店舗を検索します")
+                else:
+                    logger.warning(
+                        "pg_trgm のインデックスが無いため、店舗検索はプロセス内の索引を使用します"
+                    )
+                self._trigram_index = available
+        return self._trigram_index
+
+    def invalidate(self) -> None:
+        """店舗の登録・更新時に、プロセス内の転置インデックスを破棄する"""
+        self._index = None
+
+    async def _load_index(self, db: AsyncSession) -> SearchIndex:
+        index = self._index
+        if index is not None and time_module.monotonic() - index.loaded_at < self.ttl_seconds:
+            return index
+        async with self._lock:
+            index = self._index
+            if index is not None and time_module.monotonic() - index.loaded_at < self.ttl_seconds:
+                return index
+            loaded_at = time_module.monotonic()
+            result = await db.execute(
+                select(
+                    Restaurant.id,
+                    Restaurant.name,
+                    Restaurant.search_document,
+                    Restaurant.status,
+                    Restaurant.genre,
+                    Restaurant.area,
+                ).order_by(Restaurant.created_at, Restaurant.id)
+            )
+            # 件数が多いと構築に時間がかかるため、イベントループを止めないよう別スレッドで行う
+            index = await asyncio.to_thread(SearchIndex.build, result.all(), loaded_at)
+            self._index = index
+            return index
+
+    def _trigram_condition(self, terms: list[str]) -> ColumnElement[bool]:
+        return and_(
+            *(
+                or_(
+                    Restaurant.search_document.ilike(f"%{_escape_like(term)}%", escape="\\"),
+                    literal(term).op("<%")(Restaurant.search_document),
+                )
+                for term in terms
+            )
+        )
+
+    def _trigram_query(self, query: Select, terms: list[str]) -> Select:
+        query = query.where(self._trigram_condition(terms))
+        rank = literal(0.0)
+        for term in terms:
+            rank = (
+                rank
+                + func.word_similarity(term, Restaurant.search_document)
+                + func.word_similarity(term, Restaurant.name)
+            )
+        return query.order_by(rank.desc(), Restaurant.created_at, Restaurant.id)
+
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        query: Select,
+        q: str,
+        status: str,
+        genre: str | None = None,
+        area: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list[Restaurant]:
+        """ステータス・ジャンル・エリアで絞り込み済みの query を、キーワードで検索して関連度順に返す"""
+        terms = search_terms(q)
+        if not terms:
+            return []
+        if await self._has_trigram_index(db):
+            result = await db.execute(self._trigram_query(query, terms).offset(skip).limit(limit))
+            return list(result.scalars().all())
+
+        index = await self._load_index(db)
+        ids = index.search(terms, status=status, genre=genre, area=area, skip=skip, limit=limit)
+        if not ids:
+            return []
+        result = await db.execute(query.where(Restaurant.id.in_(ids)))
+        restaurants = {restaurant.id: restaurant for restaurant in result.scalars().all()}
+        return [restaurants[id] for id in ids if id in restaurants]
+
+    async def match_condition(
+        self, db: AsyncSession, *, q: str, status: str
+    ) -> ColumnElement[bool]:
+        """キーワードに一致する店舗に絞り込む条件（関連度の並べ替えを伴わない集計用）"""
+        terms = search_terms(q)
+        if not terms:
+            return false()
+        if await self._has_trigram_index(db):
+            return self._trigram_condition(terms)
+        index = await self._load_index(db)
+        ids = index.matching_ids(terms, status=status)
+        return Restaurant.id == any_(literal(ids, ARRAY(String)))
+
+
+restaurant_search = RestaurantSearch(ttl_seconds=settings.SEARCH_INDEX_TTL_SECONDS)
@@ -0,0 +1,189 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.reservation import PaymentStatus, Reservation, ReservationStatus
+from app.models.sales import DailySales
+
+SALES_FIELDS = ("reservation_count", "sales_amount", "paid_amount", "refunded_amount")
+
+
+@dataclass(frozen=True)
+class SalesContribution:
+    """1件の予約が売上ロールアップに寄与する値"""
+
+    restaurant_id: str
+    sales_date: date
+    payment_method: str
+    reservation_count: int
+    sales_amount: int
+    paid_amount: int
+    refunded_amount: int
+
+
+class SalesRollupService:
+    """日次売上ロールアップ（daily_sales）の差分更新と再構築"""
+
+    def contribution(self, reservation: Reservation) -> SalesContribution:
+        """予約の現在の状態から、ロールアップへの寄与を計算する"""
+        is_counted = reservation.status != ReservationStatus.CANCELLED.value
+        return SalesContribution(
+            restaurant_id=reservation.restaurant_id,
+            sales_date=reservation.reservation_date,
+            payment_method=reservation.payment_method,
+            reservation_count=1 if is_counted else 0,
+            sales_amount=reservation.amount if is_counted else 0,
+            paid_amount=(
+                reservation.amount
+                if reservation.payment_status == PaymentStatus.PAID.value
+                else 0
+            ),
+            refunded_amount=(
+                reservation.amount
+                if reservation.payment_status == PaymentStatus.REFUNDED.value
+                else 0
+            ),
+        )
+
+    async def apply_change(
+        self,
+        db: AsyncSession,
+        *,
+        before: SalesContribution | None,
+        after: SalesContribution | None,
+    ) -> None:
+        """予約の変更前後の寄与の差分をロールアップに加算する
+
+        呼び出し元のトランザクション内で実行し、コミットは呼び出し元が行う。
+        行ロックの保持時間を短くするため、コミット直前に呼ぶこと。
+        """
+        await self.apply_changes(db, [(before, after)])
+
+    async def apply_changes(
+        self,
+        db: AsyncSession,
+        changes: Iterable[tuple[SalesContribution | None, SalesContribution | None]],
+    ) -> None:
+        """複数の予約の変更前後の差分を、ロールアップの行ごとにまとめて加算する
+
+        一括更新で使う。行は常に同じ順序で更新し、並行する一括更新とのデッドロックを避ける。
+        """
+        totals: dict[tuple[str, date, str], dict[str, int]] = {}
+
+        def add(contribution: SalesContribution, sign: int) -> None:
+            key = (
+                contribution.restaurant_id,
+                contribution.sales_date,
+                contribution.payment_method,
+            )
+            deltas = totals.setdefault(key, dict.fromkeys(SALES_FIELDS, 0))
+            for field in SALES_FIELDS:
+                deltas[field] += sign * getattr(contribution, field)
+
+        for before, after in changes:
+            if before is not None:
+                add(before, -1)
+            if after is not None:
+                add(after, 1)
+
+        for key in sorted(totals):
+            await self._increment(db, key=key, deltas=totals[key])
+
+    async def _increment(
+        self, db: AsyncSession, *, key: tuple[str, date, str], deltas: dict[str, int]
+    ) -> None:
+        if not any(deltas.values()):
+            return
+        restaurant_id, sales_date, payment_method = key
+        statement = insert(DailySales).values(
+            restaurant_id=restaurant_id,
+            sales_date=sales_date,
+            payment_method=payment_method,
+            **deltas,
+        )
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["restaurant_id", "sales_date", "payment_method"],
+                set_={
+                    field: getattr(DailySales, field) + getattr(statement.excluded, field)
+                    for field in SALES_FIELDS
+                }
+                | {"updated_at": func.now()},
+            )
+        )
+
+    async def rebuild(
+        self,
+        db: AsyncSession,
+        *,
+        date_from: date | None = None,
+        date_to: date | None = None,
+    ) -> int:
+        """予約テーブルからロールアップを再構築する（バックフィル用）
+
+        指定期間のロールアップ行を削除し、予約を集計し直して挿入する。
+        再構築中は daily_sales を SHARE ROW EXCLUSIVE モードでロックし、予約・決済の
+        差分更新（apply_changes）をコミットまで待たせる（削除と挿入の間に差分が入ると、
+        二重に数えるか失われるため）。ロックは差分を加算済みのトランザクションの終了を
+        待って取得するため、それらの予約は集計に含まれる。
+
+        Returns:
+            挿入したロールアップ行数
+        """
+        await db.execute(text("LOCK TABLE daily_sales IN SHARE ROW EXCLUSIVE MODE"))
+        delete_query = delete(DailySales)
+        if date_from:
+            delete_query = delete_query.where(DailySales.sales_date >= date_from)
+        if date_to:
+            delete_query = delete_query.where(DailySales.sales_date <= date_to)
+        await db.execute(delete_query)
+
+        is_counted = Reservation.status != ReservationStatus.CANCELLED.value
+        aggregate = select(
+            Reservation.restaurant_id,
+            Reservation.reservation_date,
+            Reservation.payment_method,
+            func.count(Reservation.id).filter(is_counted),
+            func.coalesce(func.sum(Reservation.amount).filter(is_counted), 0),
+            func.coalesce(
+                func.sum(Reservation.amount).filter(
+                    Reservation.payment_status == PaymentStatus.PAID.value
+                ),
+                0,
+            ),
+            func.coalesce(
+                func.sum(Reservation.amount).filter(
+                    Reservation.payment_status == PaymentStatus.REFUNDED.value
+                ),
+                0,
+            ),
+        ).group_by(
+            Reservation.restaurant_id,
+            Reservation.reservation_date,
+            Reservation.payment_method,
+        )
+        if date_from:
+            aggregate = aggregate.where(Reservation.reservation_date >= date_from)
+        if date_to:
+            aggregate = aggregate.where(Reservation.reservation_date <= date_to)
+
+        result = await db.execute(
+            insert(DailySales).from_select(
+                [
+                    "restaurant_id",
+                    "sales_date",
+                    "payment_method",
+                    *SALES_FIELDS,
+                ],
+                aggregate,
+            )
+        )
+        await db.commit()
+        return result.rowcount
+
+
+sales_rollup_service = SalesRollupService()
@@ -0,0 +1,153 @@
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+
+# 組み合わせて1組に案内できるテーブルの最大数
+MAX_COMBINED_TABLES = 4
+
+
+@dataclass(frozen=True)
+class SeatSpec:
+    """割り当て対象の席（テーブル）"""
+
+    id: str
+    capacity: int
+    combine_group: str | None = None
+
+
+@dataclass(frozen=True)
+class TableLayout:
+    """店舗の席構成と、席の使用状況を表すビットセットの対応
+
+    席はキャパシティの昇順に並べ、i番目の席をビット i に対応させる。
+    予約枠ごとの使用中の席は int のビットセット（occupied）で表す。
+    combine_group が同じ席どうしは組み合わせて1組に案内できる。
+    """
+
+    seats: tuple[SeatSpec, ...]
+    groups: tuple[tuple[int, ...], ...] = field(init=False)
+    index: dict[str, int] = field(init=False, compare=False)
+
+    def __post_init__(self) -> None:
+        grouped: dict[str, list[int]] = {}
+        for i, seat in enumerate(self.seats):
+            if seat.combine_group:
+                grouped.setdefault(seat.combine_group, []).append(i)
+        groups = tuple(tuple(indexes) for indexes in grouped.values() if len(indexes) > 1)
+        object.__setattr__(self, "groups", groups)
+        object.__setattr__(self, "index", {seat.id: i for i, seat in enumerate(self.seats)})
+
+    @classmethod
+    def from_seats(cls, seats: Iterable[SeatSpec]) -> "TableLayout":
+        return cls(tuple(sorted(seats, key=lambda seat: (seat.capacity, seat.id))))
+
+    @property
+    def seat_count(self) -> int:
+        return len(self.seats)
+
+    @property
+    def total_capacity(self) -> int:
+        return sum(seat.capacity for seat in self.seats)
+
+    @property
+    def max_party_size(self) -> int:
+        """1組に案内できる最大人数（単独のテーブル、または組み合わせ可能なテーブルの合計）"""
+        largest = max((seat.capacity for seat in self.seats), default=0)
+        for group in self.groups:
+            capacities = sorted((self.seats[i].capacity for i in group), reverse=True)
+            largest = max(largest, sum(capacities[:MAX_COMBINED_TABLES]))
+        return largest
+
+    def mask(self, seat_ids: Iterable[str]) -> int:
+        """席IDの集合をビットセットに変換する（レイアウトにない席は無視する）"""
+        bits = 0
+        for seat_id in seat_ids:
+            i = self.index.get(seat_id)
+            if i is not None:
+                bits |= 1 << i
+        return bits
+
+    def seat_ids(self, bits: int) -> list[str]:
+        return [seat.id for i, seat in enumerate(self.seats) if bits >> i & 1]
+
+    def free_capacity(self, occupied: int) -> int:
+        """空いている席のキャパシティの合計"""
+        return sum(seat.capacity for i, seat in enumerate(self.seats) if not occupied >> i & 1)
+
+    def find_tables(self, occupied: int, party_size: int) -> int | None:
+        """空いている席から人数分の席を選び、ビットセットで返す。案内できなければNone
+
+        1. 人数以上のキャパシティを持つ空きテーブルのうち最小のもの（ベストフィット）
+        2. 1が無ければ、同じ combine_group の空きテーブルの組み合わせのうち、
+           合計キャパシティが最小（同じならテーブル数が最少）のもの
+        """
+        if party_size < 1:
+            return None
+        for i, seat in enumerate(self.seats):
+            if seat.capacity >= party_size and not occupied >> i & 1:
+                return 1 << i
+
+        best: tuple[int, int, int] | None = None  # (合計キャパシティ, テーブル数, ビットセット)
+        for group in self.groups:
+            free = sorted(
+                (i for i in group if not occupied >> i & 1),
+                key=lambda i: self.seats[i].capacity,
+                reverse=True,
+            )
+            candidate = _best_combination(
+                [self.seats[i].capacity for i in free], free, party_size, best
+            )
+            if candidate is not None:
+                best = candidate
+        return best[2] if best is not None else None
+
+
+def _best_combination(
+    capacities: Sequence[int],
+    indexes: Sequence[int],
+    party_size: int,
+    best: tuple[int, int, int] | None,
+) -> tuple[int, int, int] | None:
+    """キャパシティの降順に並んだテーブルから、人数を満たす最小の組み合わせを分枝限定法で探す
+
+    best より良い組み合わせが見つかった場合のみそれを返す。
+    """
+    # suffix[k]: k番目以降のテーブルのキャパシティの合計（これ以上は積み上げられない）
+    suffix = [0] * (len(capacities) + 1)
+    for k in range(len(capacities) - 1, -1, -1):
+        suffix[k] = suffix[k + 1] + capacities[k]
+    if suffix[0] < party_size:
+        return None
+
+    found: tuple[int, int, int] | None = None
+
+    def search(start: int, total: int, count: int, bits: int) -> None:
+        nonlocal found
+        if total >= party_size:
+            candidate = (total, count, bits)
+            current = found or best
+            if current is None or candidate[:2] < current[:2]:
+                found = candidate
+            return
+        current = found or best
+        if current is not None and total >= current[0]:
+            return
+        if count == MAX_COMBINED_TABLES or total + suffix[start] < party_size:
+            return
+        for k in range(start, len(capacities)):
+            search(k + 1, total + capacities[k], count + 1, bits | 1 << indexes[k])
+
+    search(0, 0, 0, 0)
+    return found
+
+
+def assign_tables(
+    layout: TableLayout, *, occupied: int, reserved: int, party_size: int
+) -> int | None:
+    """予約枠に人数分の席を割り当てる。割り当てられなければNone
+
+    席単位の割り当てを導入する前の予約（席の割り当てが無い予約）があっても
+    超過しないよう、予約済み人数の合計が総キャパシティ以内であることも確認する。
+    """
+    if reserved + party_size > layout.total_capacity:
+        return None
+    return layout.find_tables(occupied, party_size)
@@ -1,7 +1,7 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
+from app.core.security import password_hasher
 from app.models.user import User
 from app.schemas.user import UserCreate
 
@@ -18,7 +18,7 @@ class UserService:
     async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
         db_obj = User(
             email=obj_in.email,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=await password_hasher.hash(obj_in.password),
             name=obj_in.name,
             role=obj_in.role,
         )
@@ -33,7 +33,7 @@ class UserService:
         user = await self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await password_hasher.verify(password, user.hashed_password):
             return None
         return user
 
@@ -0,0 +1,124 @@
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# 変更されたらキャッシュを破棄する属性
+CACHED_ATTRIBUTES = ("email", "role", "is_active")
+
+# コミット後に再度破棄するユーザーIDを保持する Session.info のキー
+PENDING_INVALIDATIONS_KEY = "user_cache_pending_invalidations"
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """認証済みユーザーのうち、リクエスト処理で参照する項目のスナップショット"""
+
+    id: str
+    email: str
+    role: str
+    is_active: bool
+
+
+class UserCache:
+    """ユーザーID → CurrentUser のキャッシュ
+
+    認証のたびに users テーブルを参照しないよう、JWTのsubから解決した
+    ユーザーを一定時間保持する。ORM経由でロール・有効フラグ・メールアドレスが
+    変更された場合はマッパーイベントで自動的に破棄する。
+    ORMを経由しない一括UPDATEで変更した場合は invalidate() を明示的に呼ぶこと。
+
+    DBからの読み込み中に同じユーザーが破棄された場合（読み込んだ行が変更の
+    コミット前のものである可能性がある）は、読み込んだ値をキャッシュしない。
+    """
+
+    def __init__(self, *, maxsize: int, ttl_seconds: float) -> None:
+        self._cache: TTLCache[str, CurrentUser] = TTLCache(
+            maxsize=maxsize, ttl_seconds=ttl_seconds
+        )
+        # 破棄の世代番号（ユーザーごと、clear() は全体）。読み込みの前後で比較する
+        self._generations: dict[str, int] = {}
+        self._epoch = 0
+
+    def _generation(self, user_id: str) -> tuple[int, int]:
+        return self._epoch, self._generations.get(user_id, 0)
+
+    async def get(self, db: AsyncSession, *, user_id: str) -> CurrentUser | None:
+        """キャッシュからユーザーを返す。ない場合はDBから読み込む"""
+        cached = self._cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        generation = self._generation(user_id)
+        result = await db.execute(
+            select(User.id, User.email, User.role, User.is_active).where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        user = CurrentUser(id=row.id, email=row.email, role=row.role, is_active=row.is_active)
+        if generation == self._generation(user_id):
+            self._cache.set(user_id, user)
+        return user
+
+    def invalidate(self, user_id: str) -> None:
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        self._cache.invalidate(user_id)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._generations.clear()
+        self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return self._cache.stats()
+
+
+user_cache = UserCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl_seconds=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def _schedule_invalidation(target: User) -> None:
+    """即時に破棄し、コミット後にもう一度破棄する
+
+    フラッシュからコミットまでの間に他のリクエストが古い値を読み込んで
+    キャッシュする可能性があるため、コミット後にも破棄する。
+    """
+    user_cache.invalidate(target.id)
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault(PENDING_INVALIDATIONS_KEY, set()).add(target.id)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_update(_mapper, _connection, target: User) -> None:
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in CACHED_ATTRIBUTES):
+        logger.info(f"ユーザーキャッシュを破棄: {target.id}")
+        _schedule_invalidation(target)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_delete(_mapper, _connection, target: User) -> None:
+    _schedule_invalidation(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    for user_id in session.info.pop(PENDING_INVALIDATIONS_KEY, ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session: Session) -> None:
+    session.info.pop(PENDING_INVALIDATIONS_KEY, None)
@@ -0,0 +1,122 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.waitlist import WaitlistEntry, WaitlistStatus
+from app.schemas.waitlist import WaitlistCreate
+from app.services.reservation import reservation_service
+
+
+class WaitlistError(Exception):
+    """キャンセル待ちのエラー"""
+
+    def __init__(self, message: str, code: str = "waitlist_error"):
+        self.message = message
+        self.code = code
+        super().__init__(self.message)
+
+
+class WaitlistService:
+    """満席の予約枠へのキャンセル待ちの登録・取り消し
+
+    キャンセル待ちから予約への変換は、予約のキャンセルと同じトランザクションで
+    予約サービスが行う（ReservationService._promote_waitlist）。
+    """
+
+    async def get(self, db: AsyncSession, *, id: str) -> WaitlistEntry | None:
+        result = await db.execute(select(WaitlistEntry).where(WaitlistEntry.id == id))
+        return result.scalar_one_or_none()
+
+    async def get_by_customer(
+        self, db: AsyncSession, *, customer_id: str, skip: int = 0, limit: int = 100
+    ) -> list[WaitlistEntry]:
+        result = await db.execute(
+            select(WaitlistEntry)
+            .where(WaitlistEntry.customer_id == customer_id)
+            .order_by(WaitlistEntry.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def join(
+        self, db: AsyncSession, *, obj_in: WaitlistCreate, customer_id: str
+    ) -> WaitlistEntry:
+        """キャンセル待ちに登録する
+
+        予約の作成と同じ店舗・予約日単位のロックの下で、いま予約できないことを確認してから
+        登録する。確認と登録の間にキャンセルが割り込んで、空席があるのに順番待ちが残ることはない。
+
+        Raises:
+            WaitlistError: 人数が不正、店舗の席では案内できない人数、空席がある、
+                または同じ予約枠に登録済みの場合
+        """
+        if obj_in.party_size < 1:
+            raise WaitlistError("人数は1名以上で指定してください", "invalid_party_size")
+
+        layout, tables = await reservation_service.find_tables(
+            db,
+            restaurant_id=obj_in.restaurant_id,
+            reservation_date=obj_in.reservation_date,
+            reservation_time=obj_in.reservation_time,
+            party_size=obj_in.party_size,
+        )
+        if obj_in.party_size > layout.max_party_size:
+            await db.rollback()
+            raise WaitlistError(
+                f"この店舗では{obj_in.party_size}名で案内できる席がありません",
+                "party_too_large",
+            )
+        if tables is not None:
+            await db.rollback()
+            raise WaitlistError(
+                "指定された日時には空席があります。予約してください", "seats_available"
+            )
+
+        result = await db.execute(
+            select(WaitlistEntry.id).where(
+                WaitlistEntry.customer_id == customer_id,
+                WaitlistEntry.restaurant_id == obj_in.restaurant_id,
+                WaitlistEntry.reservation_date == obj_in.reservation_date,
+                WaitlistEntry.reservation_time == obj_in.reservation_time,
+                WaitlistEntry.status == WaitlistStatus.WAITING.value,
+            )
+        )
+        if result.first() is not None:
+            await db.rollback()
+            raise WaitlistError("既にキャンセル待ちに登録されています", "already_waiting")
+
+        db_obj = WaitlistEntry(
+            customer_id=customer_id,
+            restaurant_id=obj_in.restaurant_id,
+            reservation_date=obj_in.reservation_date,
+            reservation_time=obj_in.reservation_time,
+            party_size=obj_in.party_size,
+            payment_method=obj_in.payment_method,
+            amount=obj_in.amount,
+            notes=obj_in.notes,
+        )
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def cancel(self, db: AsyncSession, *, db_obj: WaitlistEntry) -> WaitlistEntry:
+        """キャンセル待ちを取り消す
+
+        Raises:
+            WaitlistError: 既に予約に変換済み、または取り消し済みの場合
+        """
+        result = await db.execute(
+            select(WaitlistEntry).where(WaitlistEntry.id == db_obj.id).with_for_update()
+        )
+        db_obj = result.scalar_one()
+        if db_obj.status != WaitlistStatus.WAITING.value:
+            await db.rollback()
+            raise WaitlistError("このキャンセル待ちは取り消せません", "not_waiting")
+        db_obj.status = WaitlistStatus.CANCELLED.value
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+
+waitlist_service = WaitlistService()
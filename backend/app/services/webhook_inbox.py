@@ -0,0 +1,290 @@
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session import async_session_maker
+from app.models.webhook import WebhookEvent, WebhookEventStatus
+from app.services.payment import payment_service
+
+logger = logging.getLogger(__name__)
+
+# 停止時に処理中のバッチの完了を待つ時間（秒）
+SHUTDOWN_TIMEOUT_SECONDS = 10.0
+
+WebhookHandler = Callable[[AsyncSession, dict[str, Any]], Awaitable[None]]
+
+
+async def _handle_payment_intent_succeeded(db: AsyncSession, event: dict[str, Any]) -> None:
+    payment_intent_id = event["data"]["object"]["id"]
+    reservation = await payment_service.confirm_payment(db, payment_intent_id=payment_intent_id)
+    if reservation:
+        logger.info(f"Webhook処理完了: 予約ID {reservation.id} の決済を確認")
+    else:
+        logger.warning(
+            f"Webhook処理: 対応する予約が見つかりません (Payment Intent: {payment_intent_id})"
+        )
+
+
+# イベント種別ごとの処理。ここにない種別は受信を記録するだけで処理済みにする
+WEBHOOK_HANDLERS: dict[str, WebhookHandler] = {
+    "payment_intent.succeeded": _handle_payment_intent_succeeded,
+}
+
+
+class WebhookInbox:
+    """Webhookイベントの受信箱と、それを処理するプロセス内ワーカープール
+
+    受信時は署名検証後に webhook_events へ挿入するだけで応答し、処理はワーカーが
+    非同期に行う。同じイベントIDの再送は挿入時に無視されるため二重処理されない。
+
+    ワーカーは処理待ちのイベントを FOR UPDATE SKIP LOCKED でバッチ単位に取り出すため、
+    複数のワーカー・複数のプロセスで動かしても同じイベントを取り合わない。
+    イベントの処理と処理済みへの更新は同じトランザクションで確定する。
+    失敗したイベントは指数バックオフで再試行し、max_attempts 回失敗したら dead にする。
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        *,
+        workers: int,
+        batch_size: int,
+        max_attempts: int,
+        retry_base_seconds: float,
+        retry_max_seconds: float,
+        lease_seconds: int,
+        poll_interval_seconds: float,
+    ) -> None:
+        self.session_maker = session_maker
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self.received = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.processed = 0
+        self.retried = 0
+        self.dead = 0
+
+    async def enqueue(self, db: AsyncSession, event: dict[str, Any]) -> bool:
+        """署名検証済みのイベントを受信箱に入れる。既に受信済みのイベントならFalse"""
+        result = await db.execute(
+            pg_insert(WebhookEvent)
+            .values(id=event["id"], type=event["type"], payload=event)
+            .on_conflict_do_nothing(index_elements=[WebhookEvent.id])
+            .returning(WebhookEvent.id)
+        )
+        created = result.scalar_one_or_none() is not None
+        await db.commit()
+
+        if created:
+            self.received += 1
+            self._wakeup.set()
+        else:
+            self.duplicates += 1
+        return created
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = min(self.retry_base_seconds * 2 ** (attempts - 1), self.retry_max_seconds)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _claim_batch(self) -> list[Any]:
+        """処理期限を過ぎたイベントを取り出し、処理期限（リース）を先送りして返す"""
+        due = (
+            select(WebhookEvent.id)
+            .where(
+                WebhookEvent.status == WebhookEventStatus.PENDING.value,
+                WebhookEvent.next_attempt_at <= func.now(),
+            )
+            .order_by(WebhookEvent.next_attempt_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with self.session_maker() as session:
+            result = await session.execute(
+                update(WebhookEvent)
+                .where(WebhookEvent.id.in_(due))
+                .values(
+                    attempts=WebhookEvent.attempts + 1,
+                    next_attempt_at=func.now() + timedelta(seconds=self.lease_seconds),
+                )
+                .returning(
+                    WebhookEvent.id,
+                    WebhookEvent.type,
+                    WebhookEvent.payload,
+                    WebhookEvent.attempts,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            events = list(result.all())
+            await session.commit()
+        return events
+
+    async def _process(self, event: Any) -> None:
+        handler = WEBHOOK_HANDLERS.get(event.type)
+        try:
+            async with self.session_maker() as session:
+                await session.execute(
+                    update(WebhookEvent)
+                    .where(WebhookEvent.id == event.id)
+                    .values(
+                        status=WebhookEventStatus.PROCESSED.value,
+                        processed_at=func.now(),
+                        last_error=None,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                if handler is not None:
+                    await handler(session, event.payload)
+                else:
+                    logger.info(f"Webhookイベント受信: {event.type}")
+                await session.commit()
+            self.processed += 1
+        except Exception as e:
+            await self._record_failure(event, e)
+
+    async def _record_failure(self, event: Any, error: Exception) -> None:
+        if event.attempts >= self.max_attempts:
+            values: dict[str, Any] = {"status": WebhookEventStatus.DEAD.value}
+            self.dead += 1
+            logger.error(
+                f"Webhookイベント {event.id} ({event.type}) の処理を{event.attempts}回失敗したため"
+                f"dead にしました: {error}"
+            )
+        else:
+            delay = self._retry_delay(event.attempts)
+            values = {"next_attempt_at": func.now() + timedelta(seconds=delay)}
+            self.retried += 1
+            logger.warning(
+                f"Webhookイベント {event.id} ({event.type}) の処理に失敗しました"
+                f"（{event.attempts}回目、{delay:.1f}秒後に再試行）: {error}"
+            )
+        async with self.session_maker() as session:
+            await session.execute(
+                update(WebhookEvent)
+                .where(WebhookEvent.id == event.id)
+                .values(last_error=str(error)[:2000], **values)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+    async def run_once(self) -> int:
+        """処理待ちのイベントを1バッチ処理し、取り出した件数を返す"""
+        events = await self._claim_batch()
+        if events:
+            self.batches += 1
+            for event in events:
+                await self._process(event)
+        return len(events)
+
+    async def drain(self) -> int:
+        """処理期限を過ぎたイベントがなくなるまで処理する（スクリプト・検証用）"""
+        total = 0
+        while count := await self.run_once():
+            total += count
+        return total
+
+    async def _worker(self, index: int) -> None:
+        while not self._stopping:
+            try:
+                if await self.run_once():
+                    continue
+            except Exception as e:
+                logger.error(f"Webhookワーカー{index}でエラーが発生しました: {e}")
+            self._wakeup.clear()
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+
+    async def start(self) -> None:
+        if self._tasks or self.workers <= 0:
+            return
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._worker(index), name=f"webhook-worker-{index}")
+            for index in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """ワーカーを停止する。処理中のバッチは完了を待ち、間に合わなければ中断する
+
+        中断したイベントは処理期限を過ぎると再び取り出される。
+        """
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        _, pending = await asyncio.wait(self._tasks, timeout=SHUTDOWN_TIMEOUT_SECONDS)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+
+    async def requeue(self, db: AsyncSession, *, event_id: str) -> WebhookEvent | None:
+        """dead のイベントを再処理の対象に戻す"""
+        event = await db.get(WebhookEvent, event_id)
+        if event is None:
+            return None
+        event.status = WebhookEventStatus.PENDING.value
+        event.attempts = 0
+        event.next_attempt_at = func.now()
+        event.last_error = None
+        await db.commit()
+        await db.refresh(event)
+        self._wakeup.set()
+        return event
+
+    async def get_list(
+        self, db: AsyncSession, *, status: str | None = None, limit: int = 100
+    ) -> list[WebhookEvent]:
+        query = select(WebhookEvent)
+        if status:
+            query = query.where(WebhookEvent.status == status)
+        query = query.order_by(WebhookEvent.created_at.desc()).limit(limit)
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    async def stats(self, db: AsyncSession) -> dict[str, Any]:
+        result = await db.execute(
+            select(WebhookEvent.status, func.count()).group_by(WebhookEvent.status)
+        )
+        return {
+            "workers": len(self._tasks),
+            "batch_size": self.batch_size,
+            "max_attempts": self.max_attempts,
+            "received": self.received,
+            "duplicates": self.duplicates,
+            "batches": self.batches,
+            "processed": self.processed,
+            "retried": self.retried,
+            "dead": self.dead,
+            "by_status": dict(result.tuples().all()),
+        }
+
+
+webhook_inbox = WebhookInbox(
+    async_session_maker,
+    workers=settings.WEBHOOK_WORKERS,
+    batch_size=settings.WEBHOOK_BATCH_SIZE,
+    max_attempts=settings.WEBHOOK_MAX_ATTEMPTS,
+    retry_base_seconds=settings.WEBHOOK_RETRY_BASE_SECONDS,
+    retry_max_seconds=settings.WEBHOOK_RETRY_MAX_SECONDS,
+    lease_seconds=settings.WEBHOOK_LEASE_SECONDS,
+    poll_interval_seconds=settings.WEBHOOK_POLL_INTERVAL_SECONDS,
+)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Rebuild the daily_sales rollup from the reservations table.
+
+Safe to run while the app is serving traffic: the rebuild locks
+daily_sales for its transaction, so bookings and payment updates that
+touch the rollup wait until it commits.
+
+Usage:
+    python scripts/backfill_daily_sales.py                    # rebuild everything
+    python scripts/backfill_daily_sales.py --date-from 2026-01-01 --date-to 2026-01-31
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import date
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.session import async_session_maker
+from app.models.restaurant import Restaurant  # noqa: F401
+from app.models.user import User  # noqa: F401
+from app.services.sales_rollup import sales_rollup_service
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--date-from", type=date.fromisoformat, default=None)
+    parser.add_argument("--date-to", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    print("Rebuilding daily_sales rollup...")
+    async with async_session_maker() as session:
+        rows = await sales_rollup_service.rebuild(
+            session, date_from=args.date_from, date_to=args.date_to
+        )
+    print(f"  Wrote {rows} rollup rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Assign tables to reservations made before per-table seat assignment.
+
+Reservations created before seats were assigned per table only count
+towards the slot's party total. This assigns concrete tables to every
+upcoming non-cancelled reservation that has none, so the table-level
+availability check sees them.
+
+Usage:
+    python scripts/backfill_seat_assignments.py                     # from today
+    python scripts/backfill_seat_assignments.py --date-from 2026-01-01
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import date
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.session import async_session_maker
+from app.models.user import User  # noqa: F401
+from app.services.reservation import reservation_service
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--date-from", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    print("Assigning tables to reservations without seat assignments...")
+    async with async_session_maker() as session:
+        assigned, unassigned = await reservation_service.assign_missing_seats(
+            session, date_from=args.date_from
+        )
+    print(f"  Assigned {assigned} reservations")
+    if unassigned:
+        print(f"  {unassigned} reservations could not be seated (left counted by party size)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Show that the streaming reservation export runs in constant memory.
+
+Inserts a throwaway restaurant with N reservations, streams them through
+the export service (the same generator the export endpoints hand to
+StreamingResponse) and samples the process RSS while consuming the chunks.
+With --materialized the same rows are also loaded as ORM objects in one
+list, the way the paginated listing endpoints would, for comparison. All
+inserted rows are removed afterwards.
+
+Usage:
+    python scripts/benchmark_export.py --rows 2000000 --format csv --materialized
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import delete, select, text
+
+from app.db.session import async_session_maker
+from app.models.reservation import Reservation
+from app.models.restaurant import Restaurant
+from app.models.user import User
+from app.services.reservation_export import reservation_export_service
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * PAGE_SIZE / 1024 / 1024
+
+
+async def setup(rows: int) -> tuple[str, str]:
+    suffix = uuid.uuid4().hex[:8]
+    async with async_session_maker() as session:
+        user = User(
+            email=f"export-{suffix}@reservation.local",
+            hashed_password="!",
+            name="export benchmark",
+            role="store",
+        )
+        session.add(user)
+        await session.flush()
+        restaurant = Restaurant(
+            owner_id=user.id,
+            name=f"export {suffix}",
+            genre="benchmark",
+            area="benchmark",
+            address="-",
+            phone="-",
+            email=user.email,
+            opening_hours="00:00-24:00",
+            status="inactive",
+        )
+        session.add(restaurant)
+        await session.flush()
+        await session.execute(
+            text(
+                """
+                INSERT INTO reservations (id, customer_id, restaurant_id, reservation_date,
+                                          reservation_time, party_size, status, payment_method,
+                                          payment_status, amount)
+                SELECT :prefix || g, :customer_id, :restaurant_id,
+                       DATE '2030-01-01' + (g % 3650),
+                       TIME '11:00' + ((g % 22) * INTERVAL '30 minutes'),
+                       1 + g % 6, 'confirmed', 'onsite', 'pending', 1000 * (1 + g % 10)
+                FROM generate_series(1, :rows) g
+                """
+            ),
+            {
+                "prefix": f"bx-{suffix}-",
+                "customer_id": user.id,
+                "restaurant_id": restaurant.id,
+                "rows": rows,
+            },
+        )
+        await session.commit()
+        return user.id, restaurant.id
+
+
+async def teardown(user_id: str, restaurant_id: str) -> None:
+    async with async_session_maker() as session:
+        await session.execute(delete(Reservation).where(Reservation.restaurant_id == restaurant_id))
+        await session.execute(delete(Restaurant).where(Restaurant.id == restaurant_id))
+        await session.execute(delete(User).where(User.id == user_id))
+        await session.commit()
+
+
+async def run_streaming(restaurant_id: str, export_format: str) -> None:
+    gc.collect()
+    baseline = peak = rss_mb()
+    total_bytes = chunks = 0
+    started = time.perf_counter()
+    async for chunk in reservation_export_service.stream(
+        async_session_maker, export_format=export_format, restaurant_id=restaurant_id
+    ):
+        total_bytes += len(chunk)
+        chunks += 1
+        if chunks % 50 == 0:
+            peak = max(peak, rss_mb())
+    elapsed = time.perf_counter() - started
+    peak = max(peak, rss_mb())
+    print(
+        f"  streaming ({export_format}): {total_bytes / 1024 / 1024:.1f} MB in {elapsed:.1f}s, "
+        f"RSS {baseline:.0f} MB -> peak {peak:.0f} MB (+{peak - baseline:.0f} MB)"
+    )
+
+
+async def run_materialized(restaurant_id: str) -> None:
+    gc.collect()
+    baseline = rss_mb()
+    started = time.perf_counter()
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Reservation).where(Reservation.restaurant_id == restaurant_id)
+        )
+        reservations = list(result.scalars().all())
+        peak = rss_mb()
+    elapsed = time.perf_counter() - started
+    print(
+        f"  materialized: {len(reservations)} objects in {elapsed:.1f}s, "
+        f"RSS {baseline:.0f} MB -> peak {peak:.0f} MB (+{peak - baseline:.0f} MB)"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--materialized", action="store_true", help="also load all rows at once")
+    args = parser.parse_args()
+
+    print(f"Inserting {args.rows} reservations...")
+    user_id, restaurant_id = await setup(args.rows)
+    try:
+        await run_streaming(restaurant_id, args.format)
+        if args.materialized:
+            await run_materialized(restaurant_id)
+    finally:
+        await teardown(user_id, restaurant_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
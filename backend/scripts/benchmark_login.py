@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Measure login latency under concurrent load, inline bcrypt vs. worker pool.
+
+Drives POST /auth/login through the ASGI app in-process while a stream of
+/health probes runs alongside. With inline hashing every bcrypt call blocks
+the event loop, so the probes (and the other logins) queue behind it; with
+the worker pool they keep flowing.
+
+Usage:
+    python scripts/benchmark_login.py --concurrency 50 --logins 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from app.core.security import password_hasher
+from app.main import app
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_phase(
+    client: httpx.AsyncClient, *, email: str, password: str, logins: int, concurrency: int
+) -> dict[str, float]:
+    login_latencies: list[float] = []
+    probe_latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async def login() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/v1/auth/login", data={"username": email, "password": password}
+            )
+            response.raise_for_status()
+            login_latencies.append(time.perf_counter() - started)
+
+    async def probe() -> None:
+        while not done.is_set():
+            started = time.perf_counter()
+            await client.get("/health")
+            probe_latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.01)
+
+    probe_task = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probe_task
+
+    return {
+        "login_p50_ms": statistics.median(login_latencies) * 1000,
+        "login_p99_ms": percentile(login_latencies, 99) * 1000,
+        "health_p99_ms": percentile(probe_latencies, 99) * 1000,
+        "logins_per_sec": logins / elapsed,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--email", default="customer@reservation.local")
+    parser.add_argument("--password", default="Customer123!")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    transport = httpx.ASGITransport(app=app)
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client,
+    ):
+        configured = password_hasher.executor_kind
+        results = {}
+        for executor in ("inline", configured if configured != "inline" else "thread"):
+            password_hasher.executor_kind = executor
+            results[executor] = await run_phase(
+                client,
+                email=args.email,
+                password=args.password,
+                logins=args.logins,
+                concurrency=args.concurrency,
+            )
+        password_hasher.executor_kind = configured
+
+    print(f"{args.logins} logins, concurrency {args.concurrency}")
+    for executor, metrics in results.items():
+        summary = ", ".join(f"{name}={value:.1f}" for name, value in metrics.items())
+        print(f"  {executor:7s} {summary}")
+    print(f"  hasher stats: {password_hasher.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
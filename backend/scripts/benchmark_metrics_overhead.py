@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Measure the per-request overhead of the /metrics middleware.
+
+Calls a minimal Starlette app (one templated route returning a small JSON
+body) directly through the ASGI interface, with and without
+MetricsMiddleware, so that the difference is the cost of the middleware
+itself rather than of HTTP parsing or the database. Also times
+MetricsRegistry.observe on its own and how long rendering /metrics takes
+with --routes distinct route templates.
+
+Usage:
+    python scripts/benchmark_metrics_overhead.py --requests 20000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.metrics import MetricsMiddleware, MetricsRegistry
+
+
+async def restaurant(request):
+    return JSONResponse({"id": request.path_params["restaurant_id"], "name": "bench"})
+
+
+def build_app(registry: MetricsRegistry | None) -> Starlette:
+    app = Starlette(routes=[Route("/api/v1/restaurants/{restaurant_id}", restaurant)])
+    if registry is not None:
+        app.add_middleware(MetricsMiddleware, registry=registry)
+    return app
+
+
+async def drive(app: Starlette, requests: int) -> float:
+    """Send requests GETs straight into the ASGI app; returns seconds per request."""
+    scope_template = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "server": ("bench", 80),
+        "client": ("127.0.0.1", 1234),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for index in range(requests):
+        path = f"/api/v1/restaurants/{index}"
+        scope = {**scope_template, "path": path, "raw_path": path.encode()}
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+def bench_observe(calls: int) -> float:
+    registry = MetricsRegistry()
+    started = time.perf_counter()
+    for index in range(calls):
+        registry.observe("GET", "/api/v1/restaurants/{restaurant_id}", 200, index * 1e-6, 512)
+    return (time.perf_counter() - started) / calls
+
+
+def bench_render(routes: int) -> float:
+    registry = MetricsRegistry()
+    for index in range(routes):
+        for status in (200, 404):
+            registry.observe("GET", f"/api/v1/route_{index}/{{id}}", status, 0.01, 512)
+    started = time.perf_counter()
+    registry.render()
+    return time.perf_counter() - started
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000, help="requests per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--routes", type=int, default=100, help="route templates to render")
+    args = parser.parse_args()
+
+    plain_app = build_app(None)
+    registry = MetricsRegistry()
+    metered_app = build_app(registry)
+    # Warm up both stacks (middleware build, route compilation)
+    await drive(plain_app, 1000)
+    await drive(metered_app, 1000)
+
+    plain: list[float] = []
+    metered: list[float] = []
+    for _ in range(args.rounds):
+        plain.append(await drive(plain_app, args.requests))
+        metered.append(await drive(metered_app, args.requests))
+
+    plain_us = statistics.median(plain) * 1e6
+    metered_us = statistics.median(metered) * 1e6
+    print(f"without middleware: {plain_us:.1f} us/request")
+    print(f"with middleware:    {metered_us:.1f} us/request")
+    print(
+        f"overhead:           {metered_us - plain_us:.1f} us/request "
+        f"({(metered_us - plain_us) / plain_us * 100:.1f}%)"
+    )
+    print(f"observe():          {bench_observe(200_000) * 1e6:.2f} us/call")
+    print(f"render() with {args.routes} routes: {bench_render(args.routes) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Measure restaurant keyword search latency on a large synthetic catalogue.
+
+Seeds a throwaway store owner with --restaurants active restaurants whose
+names, genres, areas and descriptions are drawn from small vocabularies
+(romaji and Japanese), then runs a mix of exact, multi-word, substring and
+misspelled queries through RestaurantService.get_list(q=...) and reports
+p50/p95 per backend: the pg_trgm index when the database has it, and the
+in-process inverted index fallback either way. All created rows are
+removed afterwards.
+
+Usage:
+    python scripts/benchmark_restaurant_search.py --restaurants 100000 --rounds 20
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import delete, insert
+
+from app.db.session import async_session_maker
+from app.models.restaurant import Restaurant, RestaurantStatus
+from app.models.user import User
+from app.services.restaurant import restaurant_service
+from app.services.restaurant_search import restaurant_search
+
+GENRES = ["寿司", "イタリアン", "焼肉", "ラーメン", "フレンチ", "中華", "居酒屋", "カフェ"]
+AREAS = ["銀座", "渋谷", "新宿", "池袋", "六本木", "恵比寿", "浅草", "上野"]
+NAME_WORDS = [
+    "sushi", "trattoria", "bistro", "ramen", "yakiniku", "izakaya", "cafe", "osteria",
+    "kitchen", "dining", "tei", "ya", "zen", "hana", "sakura", "umi", "yama", "kaze",
+]
+DESCRIPTION_WORDS = [
+    "江戸前", "握り", "手打ち", "パスタ", "黒毛和牛", "炭火", "自家製", "個室", "カウンター",
+    "wine", "sake", "course", "lunch", "dinner", "organic", "seasonal",
+]
+QUERIES = [
+    "sushi", "trattoria", "寿司", "銀座 寿司", "黒毛和牛", "izakaya 新宿", "sushu", "trattorai",
+    "zen", "パスタ", "osteria organic", "kaze",
+]
+INSERT_CHUNK_SIZE = 5000
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def setup(count: int, seed: int) -> str:
+    """Create a store owner and count active restaurants; returns the owner id."""
+    rng = random.Random(seed)
+    suffix = uuid.uuid4().hex[:8]
+    async with async_session_maker() as session:
+        user = User(
+            email=f"search-bench-{suffix}@reservation.local",
+            hashed_password="!",
+            name="search benchmark",
+            role="store",
+        )
+        session.add(user)
+        await session.flush()
+        for start in range(0, count, INSERT_CHUNK_SIZE):
+            rows = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "owner_id": user.id,
+                    "name": " ".join(rng.sample(NAME_WORDS, 2)) + f" {index}",
+                    "description": " ".join(rng.sample(DESCRIPTION_WORDS, 3)),
+                    "genre": rng.choice(GENRES),
+                    "area": rng.choice(AREAS),
+                    "address": "-",
+                    "phone": "-",
+                    "email": user.email,
+                    "opening_hours": "11:00-23:00",
+                    "status": RestaurantStatus.ACTIVE.value,
+                }
+                for index in range(start, min(start + INSERT_CHUNK_SIZE, count))
+            ]
+            await session.execute(insert(Restaurant), rows)
+        await session.commit()
+        return user.id
+
+
+async def teardown(user_id: str) -> None:
+    async with async_session_maker() as session:
+        await session.execute(delete(Restaurant).where(Restaurant.owner_id == user_id))
+        await session.execute(delete(User).where(User.id == user_id))
+        await session.commit()
+
+
+async def run_queries(rounds: int, limit: int) -> dict[str, float]:
+    latencies: list[float] = []
+    for _ in range(rounds):
+        for q in QUERIES:
+            async with async_session_maker() as session:
+                started = time.perf_counter()
+                await restaurant_service.get_list(session, q=q, limit=limit)
+                latencies.append(time.perf_counter() - started)
+    return {
+        "queries": len(latencies),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--restaurants", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=20, help="passes over the query mix")
+    parser.add_argument("--limit", type=int, default=20, help="page size per query")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    user_id = await setup(args.restaurants, args.seed)
+    print(f"seeded {args.restaurants} restaurants in {time.perf_counter() - started:.1f}s")
+    try:
+        async with async_session_maker() as session:
+            has_trigram_index = await restaurant_search._has_trigram_index(session)
+        if has_trigram_index:
+            result = await run_queries(args.rounds, args.limit)
+            print(f"pg_trgm:   {result}")
+
+        restaurant_search._trigram_index = False
+        restaurant_search.invalidate()
+        async with async_session_maker() as session:
+            started = time.perf_counter()
+            await restaurant_search._load_index(session)
+        print(f"in-process index built in {time.perf_counter() - started:.2f}s")
+        result = await run_queries(args.rounds, args.limit)
+        print(f"in-process: {result}")
+    finally:
+        await teardown(user_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,576 @@
+#!/usr/bin/env python3
+"""Benchmark the hot endpoints on a scaled synthetic dataset and check for regressions.
+
+Seeds a dedicated store owner with --restaurants active restaurants (with
+tables), --customers customers and --reservations reservations spread over
+the past year and the next --future-days days, using set-based
+INSERT ... SELECT generate_series statements so that millions of rows load
+in minutes. The daily_sales rollup is built for the seeded rows; future
+reservations are left without table assignments, so availability counts
+them by party size.
+
+Then drives each scenario through the ASGI app in-process (httpx
+ASGITransport, with the app's lifespan running):
+
+    login                POST /auth/login
+    check_availability   GET  /restaurants/{id}/availability
+    get_list             GET  /restaurants (optionally by genre or area)
+    get_sales            GET  /restaurants/{id}/sales (a year, by month)
+    create_reservation   POST /reservations
+
+and records p50/p95/p99 latency, throughput and the mean number of SQL
+statements per request (from the Server-Timing header) per scenario.
+
+The results are compared against a JSON baseline: a latency or query count
+that grows, or a throughput that drops, by more than --tolerance fails the
+run (exit status 1), as does any unexpected response status. The first run,
+or a run with --update-baseline, writes the baseline instead. Baselines are
+only comparable at the same scale, requests and concurrency.
+
+The dataset is removed afterwards unless --keep-data is given; a later run
+at the same scale reuses a kept dataset (seeding is the slow part).
+
+Usage:
+    python scripts/benchmark_suite.py --restaurants 10000 --reservations 10000000 --keep-data
+    python scripts/benchmark_suite.py --restaurants 10000 --reservations 10000000 --update-baseline
+    python scripts/benchmark_suite.py --scenarios get_list,check_availability --tolerance 0.3
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from sqlalchemy import bindparam, delete, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import String
+
+from app.core.security import get_password_hash
+from app.db.session import async_session_maker
+from app.main import app
+from app.models.reservation import Reservation, ReservationSeat
+from app.models.restaurant import Restaurant, Seat
+from app.models.sales import DailySales
+from app.models.user import User
+from app.models.waitlist import WaitlistEntry
+
+OWNER_EMAIL = "benchmark-owner@reservation.local"
+CUSTOMER_EMAIL = "benchmark-customer-{}@reservation.local"
+PASSWORD = "Benchmark123!"
+GENRES = ["寿司", "イタリアン", "焼肉", "ラーメン", "フレンチ", "中華", "居酒屋", "カフェ"]
+AREAS = ["銀座", "渋谷", "新宿", "池袋", "六本木", "恵比寿", "浅草", "上野"]
+# (capacity, tables) per restaurant
+TABLES = [(2, 4), (4, 8), (6, 3)]
+PAST_DAYS = 365
+SLOTS = 22  # 11:00 to 21:30 every 30 minutes
+RESERVATION_CHUNK_SIZE = 1_000_000
+SCENARIOS = ["login", "check_availability", "get_list", "get_sales", "create_reservation"]
+# Lower is better for these metrics; throughput is the only higher-is-better one
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms", "queries_per_request")
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+SEED_RESTAURANTS = text(
+    """
+    INSERT INTO restaurants (
+        id, owner_id, name, description, genre, area, address, phone, email,
+        opening_hours, status, created_at, updated_at
+    )
+    SELECT
+        gen_random_uuid()::text, :owner_id, 'benchmark restaurant ' || n,
+        'benchmark ' || n, (:genres)[1 + n % cardinality(:genres)],
+        (:areas)[1 + (n / cardinality(:genres)) % cardinality(:areas)],
+        '-', '-', :email, '11:00-23:00', 'active',
+        now() - n * interval '1 second', now() - n * interval '1 second'
+    FROM generate_series(0, :count - 1) AS n
+    """
+).bindparams(
+    bindparam("genres", type_=ARRAY(String)), bindparam("areas", type_=ARRAY(String))
+)
+
+SEED_SEATS = text(
+    """
+    INSERT INTO seats (id, restaurant_id, name, capacity, created_at, updated_at)
+    SELECT gen_random_uuid()::text, r.id, 'table ' || c || '-' || t, c, now(), now()
+    FROM restaurants AS r, CAST(:capacity AS int) AS c, generate_series(1, :tables) AS t
+    WHERE r.owner_id = :owner_id
+    """
+)
+
+SEED_CUSTOMERS = text(
+    """
+    INSERT INTO users (id, email, hashed_password, name, role, is_active, created_at, updated_at)
+    SELECT gen_random_uuid()::text, replace(:email, '{}', n::text),
+           CASE WHEN n = 0 THEN :hashed_password ELSE '!' END,
+           'benchmark customer ' || n, 'customer', true, now(), now()
+    FROM generate_series(0, :count - 1) AS n
+    """
+)
+
+# Reservation g goes to restaurant g % restaurants, on a pseudo-random day of
+# [today - PAST_DAYS, today + future_days) and slot; past ones are completed,
+# future ones confirmed, and every tenth is cancelled.
+SEED_RESERVATIONS = text(
+    """
+    WITH r AS (
+        SELECT id, row_number() OVER (ORDER BY id) - 1 AS n
+        FROM restaurants WHERE owner_id = :owner_id
+    ), c AS (
+        SELECT id, row_number() OVER (ORDER BY id) - 1 AS n
+        FROM users WHERE email LIKE 'benchmark-customer-%'
+    ), g AS (
+        SELECT
+            g,
+            CAST(:today AS date) - CAST(:past_days AS int)
+                + ((g * 7919) % CAST(:past_days + :future_days AS int))::int AS day
+        FROM generate_series(CAST(:start AS bigint), CAST(:stop AS bigint) - 1) AS g
+    )
+    INSERT INTO reservations (
+        id, customer_id, restaurant_id, reservation_date, reservation_time, party_size,
+        duration_minutes, status, payment_method, payment_status, amount,
+        created_at, updated_at
+    )
+    SELECT
+        gen_random_uuid()::text, c.id, r.id, g.day,
+        time '11:00' + ((g.g * 31) % :slots) * interval '30 minutes',
+        1 + g.g % 6, 120,
+        CASE WHEN g.g % 10 = 0 THEN 'cancelled'
+             WHEN g.day < CAST(:today AS date) THEN 'completed' ELSE 'confirmed' END,
+        CASE WHEN g.g % 3 = 0 THEN 'online' ELSE 'onsite' END,
+        CASE WHEN g.g % 3 = 0 THEN 'paid' ELSE 'pending' END,
+        1000 * (1 + g.g % 6) * (1 + g.g % 5),
+        now(), now()
+    FROM g
+    JOIN r ON r.n = g.g % :restaurants
+    JOIN c ON c.n = g.g % :customers
+    """
+)
+
+SEED_DAILY_SALES = text(
+    """
+    INSERT INTO daily_sales (
+        restaurant_id, sales_date, payment_method, reservation_count, sales_amount,
+        paid_amount, refunded_amount, created_at, updated_at
+    )
+    SELECT
+        restaurant_id, reservation_date, payment_method,
+        count(*) FILTER (WHERE status <> 'cancelled'),
+        coalesce(sum(amount) FILTER (WHERE status <> 'cancelled'), 0),
+        coalesce(sum(amount) FILTER (WHERE payment_status = 'paid'), 0),
+        coalesce(sum(amount) FILTER (WHERE payment_status = 'refunded'), 0),
+        now(), now()
+    FROM reservations
+    WHERE restaurant_id IN (SELECT id FROM restaurants WHERE owner_id = :owner_id)
+    GROUP BY restaurant_id, reservation_date, payment_method
+    """
+)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def dataset_name(args: argparse.Namespace) -> str:
+    """Owner name recording the scale, so a kept dataset is only reused at the same scale."""
+    return (
+        f"benchmark {args.restaurants}/{args.reservations}/{args.customers}/{args.future_days}"
+    )
+
+
+async def existing_dataset() -> str | None:
+    """Return the dataset name of a kept dataset, if any."""
+    async with async_session_maker() as session:
+        return await session.scalar(select(User.name).where(User.email == OWNER_EMAIL))
+
+
+async def seed(args: argparse.Namespace) -> None:
+    today = date.today()
+    hashed_password = get_password_hash(PASSWORD)
+    async with async_session_maker() as session:
+        owner = User(
+            email=OWNER_EMAIL,
+            hashed_password=hashed_password,
+            name="benchmark (seeding)",
+            role="store",
+        )
+        session.add(owner)
+        await session.flush()
+        owner_id = owner.id
+        await session.execute(
+            SEED_RESTAURANTS,
+            {
+                "owner_id": owner_id,
+                "email": OWNER_EMAIL,
+                "genres": GENRES,
+                "areas": AREAS,
+                "count": args.restaurants,
+            },
+        )
+        for capacity, tables in TABLES:
+            await session.execute(
+                SEED_SEATS, {"owner_id": owner_id, "capacity": capacity, "tables": tables}
+            )
+        await session.execute(
+            SEED_CUSTOMERS,
+            {"email": CUSTOMER_EMAIL, "hashed_password": hashed_password, "count": args.customers},
+        )
+        await session.commit()
+    print(f"  {args.restaurants} restaurants, {args.customers} customers")
+
+    for start in range(0, args.reservations, RESERVATION_CHUNK_SIZE):
+        stop = min(start + RESERVATION_CHUNK_SIZE, args.reservations)
+        async with async_session_maker() as session:
+            await session.execute(
+                SEED_RESERVATIONS,
+                {
+                    "owner_id": owner_id,
+                    "today": today,
+                    "past_days": PAST_DAYS,
+                    "future_days": args.future_days,
+                    "slots": SLOTS,
+                    "restaurants": args.restaurants,
+                    "customers": args.customers,
+                    "start": start,
+                    "stop": stop,
+                },
+            )
+            await session.commit()
+        print(f"  {stop}/{args.reservations} reservations")
+
+    async with async_session_maker() as session:
+        await session.execute(SEED_DAILY_SALES, {"owner_id": owner_id})
+        for table in ("users", "restaurants", "seats", "reservations", "daily_sales"):
+            await session.execute(text(f"ANALYZE {table}"))
+        # Only a fully seeded dataset carries its scale and can be reused
+        await session.execute(
+            update(User).where(User.id == owner_id).values(name=dataset_name(args))
+        )
+        await session.commit()
+
+
+async def teardown() -> None:
+    async with async_session_maker() as session:
+        owner_id = await session.scalar(select(User.id).where(User.email == OWNER_EMAIL))
+        customer_ids = select(User.id).where(User.email.like(CUSTOMER_EMAIL.format("%")))
+        restaurant_ids = select(Restaurant.id).where(Restaurant.owner_id == owner_id)
+        await session.execute(
+            delete(WaitlistEntry).where(WaitlistEntry.restaurant_id.in_(restaurant_ids))
+        )
+        await session.execute(
+            delete(ReservationSeat).where(ReservationSeat.restaurant_id.in_(restaurant_ids))
+        )
+        await session.execute(
+            delete(Reservation).where(
+                Reservation.restaurant_id.in_(restaurant_ids)
+                | Reservation.customer_id.in_(customer_ids)
+            )
+        )
+        await session.execute(
+            delete(DailySales).where(DailySales.restaurant_id.in_(restaurant_ids))
+        )
+        await session.execute(delete(Seat).where(Seat.restaurant_id.in_(restaurant_ids)))
+        await session.execute(delete(Restaurant).where(Restaurant.owner_id == owner_id))
+        await session.execute(
+            delete(User).where(
+                (User.email == OWNER_EMAIL) | User.email.like(CUSTOMER_EMAIL.format("%"))
+            )
+        )
+        await session.commit()
+
+
+async def login(client: httpx.AsyncClient, email: str) -> dict[str, str]:
+    response = await client.post(
+        "/api/v1/auth/login", data={"username": email, "password": PASSWORD}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def build_scenarios(
+    client: httpx.AsyncClient,
+    *,
+    restaurant_ids: list[str],
+    customer: dict[str, str],
+    owner: dict[str, str],
+    future_days: int,
+    rng: random.Random,
+) -> dict[str, tuple[int, Callable[[], Awaitable[httpx.Response]]]]:
+    """Map each scenario to (expected status, request factory)."""
+    today = date.today()
+
+    def future_date() -> str:
+        return (today + timedelta(days=rng.randrange(1, future_days))).isoformat()
+
+    def slot_time() -> str:
+        slot = rng.randrange(SLOTS)
+        return f"{11 + slot // 2:02d}:{slot % 2 * 30:02d}"
+
+    def check_availability() -> Awaitable[httpx.Response]:
+        return client.get(
+            f"/api/v1/restaurants/{rng.choice(restaurant_ids)}/availability",
+            params={"date": future_date(), "time": slot_time(), "party_size": rng.randint(1, 6)},
+        )
+
+    def get_list() -> Awaitable[httpx.Response]:
+        params: dict[str, Any] = {"limit": 20}
+        choice = rng.randrange(3)
+        if choice == 1:
+            params["genre"] = rng.choice(GENRES)
+        elif choice == 2:
+            params["area"] = rng.choice(AREAS)
+        return client.get("/api/v1/restaurants", params=params)
+
+    def get_sales() -> Awaitable[httpx.Response]:
+        return client.get(
+            f"/api/v1/restaurants/{rng.choice(restaurant_ids)}/sales",
+            params={
+                "date_from": (today - timedelta(days=PAST_DAYS)).isoformat(),
+                "date_to": today.isoformat(),
+                "granularity": "month",
+            },
+            headers=owner,
+        )
+
+    def create_reservation() -> Awaitable[httpx.Response]:
+        return client.post(
+            "/api/v1/reservations",
+            json={
+                "restaurant_id": rng.choice(restaurant_ids),
+                "reservation_date": future_date(),
+                "reservation_time": slot_time(),
+                "party_size": 2,
+                "payment_method": "onsite",
+                "amount": 3000,
+            },
+            headers=customer,
+        )
+
+    def login_request() -> Awaitable[httpx.Response]:
+        return client.post(
+            "/api/v1/auth/login",
+            data={"username": CUSTOMER_EMAIL.format(0), "password": PASSWORD},
+        )
+
+    return {
+        "login": (200, login_request),
+        "check_availability": (200, check_availability),
+        "get_list": (200, get_list),
+        "get_sales": (200, get_sales),
+        "create_reservation": (201, create_reservation),
+    }
+
+
+async def run_scenario(
+    expected_status: int,
+    request: Callable[[], Awaitable[httpx.Response]],
+    *,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> dict[str, float]:
+    for _ in range(warmup):
+        await request()
+
+    latencies: list[float] = []
+    queries: list[int] = []
+    errors: list[str] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await request()
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != expected_status:
+                errors.append(f"{response.status_code} {response.text[:200]}")
+            match = SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+            if match:
+                queries.append(int(match.group(1)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    for error in errors[:3]:
+        print(f"    unexpected response: {error}")
+
+    result = {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput_rps": requests / elapsed,
+        "errors": len(errors),
+    }
+    if queries:
+        result["queries_per_request"] = statistics.fmean(queries)
+    return result
+
+
+def compare(
+    baseline: dict[str, dict[str, float]],
+    results: dict[str, dict[str, float]],
+    *,
+    tolerance: float,
+    min_delta_ms: float,
+) -> list[str]:
+    """Return a description of every metric that regressed beyond the tolerance."""
+    regressions: list[str] = []
+    for scenario, metrics in results.items():
+        base = baseline.get(scenario)
+        if base is None:
+            continue
+        for name in LATENCY_METRICS:
+            if name not in metrics or name not in base:
+                continue
+            limit = base[name] * (1 + tolerance)
+            # Sub-millisecond jitter is not a regression, however large relatively
+            if name.endswith("_ms"):
+                limit = max(limit, base[name] + min_delta_ms)
+            if metrics[name] > limit:
+                regressions.append(
+                    f"{scenario}.{name}: {metrics[name]:.2f} > {limit:.2f} "
+                    f"(baseline {base[name]:.2f})"
+                )
+        limit = base["throughput_rps"] * (1 - tolerance)
+        if metrics["throughput_rps"] < limit:
+            regressions.append(
+                f"{scenario}.throughput_rps: {metrics['throughput_rps']:.1f} < {limit:.1f} "
+                f"(baseline {base['throughput_rps']:.1f})"
+            )
+    return regressions
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--restaurants", type=int, default=10_000)
+    parser.add_argument("--reservations", type=int, default=1_000_000)
+    parser.add_argument("--customers", type=int, default=1_000)
+    parser.add_argument("--future-days", type=int, default=30, help="days of upcoming bookings")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests first")
+    parser.add_argument("--baseline", type=Path, default=Path("benchmark_baseline.json"))
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression ratio")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0)
+    parser.add_argument("--keep-data", action="store_true", help="keep the seeded dataset")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    kept = await existing_dataset()
+    if kept is not None and kept != dataset_name(args):
+        print(f"Removing kept dataset ({kept})...")
+        await teardown()
+        kept = None
+    if kept is None:
+        print("Seeding dataset...")
+        started = time.perf_counter()
+        try:
+            await seed(args)
+        except BaseException:
+            await teardown()
+            raise
+        print(f"  seeded in {time.perf_counter() - started:.1f}s")
+    else:
+        print(f"Reusing kept dataset ({kept})")
+
+    scale = {
+        "restaurants": args.restaurants,
+        "reservations": args.reservations,
+        "customers": args.customers,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+    }
+    try:
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(Restaurant.id)
+                .join(User, User.id == Restaurant.owner_id)
+                .where(User.email == OWNER_EMAIL)
+            )
+            restaurant_ids = list(result.scalars().all())
+
+        rng = random.Random(args.seed)
+        results: dict[str, dict[str, float]] = {}
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://benchmark"
+        async with (
+            app.router.lifespan_context(app),
+            httpx.AsyncClient(transport=transport, base_url=base_url) as client,
+        ):
+            requests = build_scenarios(
+                client,
+                restaurant_ids=restaurant_ids,
+                customer=await login(client, CUSTOMER_EMAIL.format(0)),
+                owner=await login(client, OWNER_EMAIL),
+                future_days=args.future_days,
+                rng=rng,
+            )
+            for name in scenarios:
+                expected_status, request = requests[name]
+                results[name] = await run_scenario(
+                    expected_status,
+                    request,
+                    requests=args.requests,
+                    concurrency=args.concurrency,
+                    warmup=args.warmup,
+                )
+                summary = ", ".join(
+                    f"{metric}={value:.1f}" if isinstance(value, float) else f"{metric}={value}"
+                    for metric, value in results[name].items()
+                )
+                print(f"  {name:20s} {summary}")
+    finally:
+        if not args.keep_data:
+            print("Removing dataset...")
+            await teardown()
+
+    failed = False
+    errored = [name for name, metrics in results.items() if metrics["errors"]]
+    if errored:
+        print(f"Unexpected responses in: {', '.join(errored)}")
+        failed = True
+
+    if args.update_baseline or not args.baseline.exists():
+        args.baseline.write_text(
+            json.dumps({"scale": scale, "results": results}, indent=2, ensure_ascii=False) + "\n"
+        )
+        print(f"Baseline written to {args.baseline}")
+        return 1 if failed else 0
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("scale") != scale:
+        print(f"Baseline {args.baseline} was recorded at {baseline.get('scale')}, not {scale}")
+        return 1
+    regressions = compare(
+        baseline["results"], results, tolerance=args.tolerance, min_delta_ms=args.min_delta_ms
+    )
+    for regression in regressions:
+        print(f"  REGRESSION {regression}")
+    if regressions:
+        failed = True
+    else:
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
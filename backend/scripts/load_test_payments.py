@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Load-test the payment flow offline against the in-process fake gateway.
+
+For each iteration a customer books an online reservation, creates a
+Payment Intent, the gateway "succeeds" it and the signed webhook is posted
+back to /payments/confirm, which only stores it in the webhook inbox; the
+script then waits for the inbox workers to mark every reservation paid.
+Everything runs through the ASGI app in-process
+with PAYMENT_GATEWAY=fake, so no Stripe account or network is needed. The
+simulated gateway latency shows that slow gateway calls no longer block the
+other requests.
+
+Usage:
+    python scripts/load_test_payments.py --payments 200 --concurrency 20 --latency-ms 150
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# app をインポートする前にフェイクゲートウェイを選択する
+os.environ["PAYMENT_GATEWAY"] = "fake"
+
+import httpx
+from sqlalchemy import func, select
+
+from app.db.session import async_session_maker
+from app.main import app
+from app.models.reservation import PaymentStatus, Reservation
+from app.services.payment_gateway import FakePaymentGateway, payment_gateway
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def count_paid(reservation_ids: list[str]) -> int:
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(func.count()).where(
+                Reservation.id.in_(reservation_ids),
+                Reservation.payment_status == PaymentStatus.PAID.value,
+            )
+        )
+        return result.scalar_one()
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> dict[str, str]:
+    response = await client.post(
+        "/api/v1/auth/login", data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--email", default="customer@reservation.local")
+    parser.add_argument("--password", default="Customer123!")
+    parser.add_argument("--payments", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=int, default=150, help="simulated gateway latency")
+    args = parser.parse_args()
+
+    assert isinstance(payment_gateway, FakePaymentGateway)
+    payment_gateway.latency_seconds = args.latency_ms / 1000
+
+    latencies: list[float] = []
+    reservation_ids: list[str] = []
+    failures = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+    slot_date = date.today() + timedelta(days=400)
+
+    transport = httpx.ASGITransport(app=app)
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client,
+    ):
+        headers = await login(client, args.email, args.password)
+        restaurants = (await client.get("/api/v1/restaurants")).json()
+        if not restaurants:
+            print("No active restaurants; run scripts/seed_data.py first")
+            return 1
+
+        async def pay(index: int) -> None:
+            nonlocal failures
+            async with semaphore:
+                started = time.perf_counter()
+                reservation = await client.post(
+                    "/api/v1/reservations",
+                    headers=headers,
+                    json={
+                        "restaurant_id": restaurants[index % len(restaurants)]["id"],
+                        "reservation_date": (slot_date + timedelta(days=index)).isoformat(),
+                        "reservation_time": "18:00",
+                        "party_size": 1,
+                        "payment_method": "online",
+                        "amount": 1000,
+                    },
+                )
+                if reservation.status_code != 201:
+                    failures += 1
+                    return
+                intent = await client.post(
+                    "/api/v1/payments/create-intent",
+                    headers=headers,
+                    json={"reservation_id": reservation.json()["id"]},
+                )
+                if intent.status_code != 200:
+                    failures += 1
+                    return
+                payload, signature = payment_gateway.succeed_payment_intent(
+                    intent.json()["payment_intent_id"]
+                )
+                confirm = await client.post(
+                    "/api/v1/payments/confirm",
+                    content=payload,
+                    headers={"Stripe-Signature": signature},
+                )
+                if confirm.status_code != 200 or not confirm.json()["success"]:
+                    failures += 1
+                    return
+                latencies.append(time.perf_counter() - started)
+                reservation_ids.append(reservation.json()["id"])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(pay(index) for index in range(args.payments)))
+        elapsed = time.perf_counter() - started
+
+        # Webhookはワーカーが非同期に処理するため、全件が決済済みになるまで待つ
+        paid = 0
+        deadline = time.perf_counter() + 30
+        while time.perf_counter() < deadline:
+            paid = await count_paid(reservation_ids)
+            if paid == len(reservation_ids):
+                break
+            await asyncio.sleep(0.1)
+        settled = time.perf_counter() - started
+
+    print(
+        f"{args.payments} payments, concurrency {args.concurrency}, "
+        f"gateway latency {args.latency_ms}ms"
+    )
+    if latencies:
+        print(
+            f"  p50={statistics.median(latencies) * 1000:.1f}ms "
+            f"p99={percentile(latencies, 99) * 1000:.1f}ms "
+            f"throughput={len(latencies) / elapsed:.1f}/s failures={failures}"
+        )
+        print(f"  paid {paid}/{len(reservation_ids)} after {settled:.1f}s (webhook inbox)")
+    return 1 if failures or paid != len(reservation_ids) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
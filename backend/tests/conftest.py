@@ -0,0 +1,91 @@
+import os
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+import pytest
+from sqlalchemy import delete
+
+DATABASE_REQUIRED = "DATABASE_URL が設定されていないため、DBを使うテストをスキップします"
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    # db マーカーのテストは DATABASE_URL が設定されている場合だけ実行する
+    if os.environ.get("DATABASE_URL"):
+        return
+    skip = pytest.mark.skip(reason=DATABASE_REQUIRED)
+    for item in items:
+        if "db" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+async def session_maker():
+    """DBセッションのファクトリ（テストごとにイベントループが変わるため、終了時に接続を破棄する）"""
+    from app.db.session import async_session_maker, engine
+
+    yield async_session_maker
+    await engine.dispose()
+
+
+@pytest.fixture
+async def make_restaurant(
+    session_maker,
+) -> AsyncIterator[Callable[..., Awaitable[tuple[str, str]]]]:
+    """席を持つ営業中の店舗（と、予約にも使うオーナー）を作成し、終了時に関連する行ごと削除する"""
+    from app.models.reservation import Reservation
+    from app.models.restaurant import Restaurant, RestaurantStatus, Seat
+    from app.models.sales import DailySales
+    from app.models.user import User
+    from app.models.waitlist import WaitlistEntry
+
+    created: list[tuple[str, str]] = []
+
+    async def factory(*, tables: int, table_size: int) -> tuple[str, str]:
+        suffix = uuid.uuid4().hex[:8]
+        async with session_maker() as session:
+            user = User(
+                email=f"test-{suffix}@reservation.local",
+                hashed_password="!",
+                name="test",
+                role="store",
+            )
+            session.add(user)
+            await session.flush()
+            restaurant = Restaurant(
+                owner_id=user.id,
+                name=f"test {suffix}",
+                genre="test",
+                area="test",
+                address="-",
+                phone="-",
+                email=user.email,
+                opening_hours="00:00-24:00",
+                status=RestaurantStatus.ACTIVE.value,
+            )
+            session.add(restaurant)
+            await session.flush()
+            session.add_all(
+                Seat(restaurant_id=restaurant.id, name=f"test {index}", capacity=table_size)
+                for index in range(tables)
+            )
+            await session.commit()
+            created.append((user.id, restaurant.id))
+            return user.id, restaurant.id
+
+    yield factory
+
+    async with session_maker() as session:
+        for user_id, restaurant_id in created:
+            await session.execute(
+                delete(WaitlistEntry).where(WaitlistEntry.restaurant_id == restaurant_id)
+            )
+            await session.execute(
+                delete(Reservation).where(Reservation.restaurant_id == restaurant_id)
+            )
+            await session.execute(
+                delete(DailySales).where(DailySales.restaurant_id == restaurant_id)
+            )
+            await session.execute(delete(Seat).where(Seat.restaurant_id == restaurant_id))
+            await session.execute(delete(Restaurant).where(Restaurant.id == restaurant_id))
+            await session.execute(delete(User).where(User.id == user_id))
+        await session.commit()
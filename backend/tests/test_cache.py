@@ -0,0 +1,97 @@
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", fake)
+    return fake
+
+
+def test_get_returns_value_until_expired(clock: FakeClock) -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl_seconds=60)
+    cache.set("a", 1)
+
+    clock.now += 59.9
+    assert cache.get("a") == 1
+    clock.now += 0.1
+    assert cache.get("a") is None
+    # 期限切れのエントリは参照時に破棄する
+    assert len(cache) == 0
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_set_refreshes_expiry(clock: FakeClock) -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl_seconds=60)
+    cache.set("a", 1)
+    clock.now += 50
+    cache.set("a", 2)
+    clock.now += 50
+
+    assert cache.get("a") == 2
+
+
+def test_evicts_least_recently_used(clock: FakeClock) -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a を最近参照したため、b が先に破棄される
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.parametrize(("maxsize", "ttl_seconds"), [(0, 60), (10, 0)])
+def test_disabled_cache_stores_nothing(clock: FakeClock, maxsize: int, ttl_seconds: float) -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_invalidate_and_clear(clock: FakeClock) -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_stats_hit_rate(clock: FakeClock) -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl_seconds=60)
+    assert cache.stats()["hit_rate"] is None
+
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    assert cache.stats() == {
+        "size": 1,
+        "maxsize": 10,
+        "ttl_seconds": 60,
+        "hits": 2,
+        "misses": 1,
+        "evictions": 0,
+        "hit_rate": 0.6667,
+    }
@@ -0,0 +1,79 @@
+from datetime import time
+
+from app.services.occupancy import DayOccupancy, Stay, from_minutes, to_minutes
+
+T1 = 1 << 0
+T2 = 1 << 1
+T3 = 1 << 2
+
+
+def minutes(hour: int, minute: int = 0) -> int:
+    return to_minutes(time(hour, minute))
+
+
+def test_minutes_round_trip() -> None:
+    assert to_minutes(time(19, 30)) == 1170
+    assert from_minutes(1170) == time(19, 30)
+
+
+def test_back_to_back_stays_do_not_overlap() -> None:
+    day = DayOccupancy({"r1": Stay(minutes(18), minutes(20), 2, T1)})
+
+    # [start, end) は終了時刻を含まないため、終了と同時に始まる予約は同じ席を使える
+    assert day.occupied_seats(minutes(20), minutes(22)) == 0
+    assert day.max_concurrent(minutes(20), minutes(22)) == 0
+    assert day.occupied_seats(minutes(16), minutes(18)) == 0
+    assert day.occupied_seats(minutes(19, 59), minutes(22)) == T1
+    assert day.occupied_seats(minutes(16), minutes(18, 1)) == T1
+
+
+def test_departure_counted_before_arrival() -> None:
+    day = DayOccupancy(
+        {
+            "early": Stay(minutes(18), minutes(20), 2, T1),
+            "late": Stay(minutes(20), minutes(22), 4, T2),
+        }
+    )
+
+    assert day.occupied_seats(minutes(18), minutes(22)) == T1 | T2
+    assert day.max_concurrent(minutes(18), minutes(22)) == 4
+
+
+def test_max_concurrent_with_overlapping_stays() -> None:
+    day = DayOccupancy(
+        {
+            "a": Stay(minutes(17), minutes(19), 2, T1),
+            "b": Stay(minutes(18), minutes(20), 3, T2),
+            "c": Stay(minutes(19), minutes(21), 4, T3),
+        }
+    )
+
+    assert day.max_concurrent(minutes(17), minutes(21)) == 7
+    assert day.max_concurrent(minutes(17), minutes(19)) == 5
+    # 問い合わせの開始前に始まった予約も数える
+    assert day.max_concurrent(minutes(18, 30), minutes(18, 45)) == 5
+    assert day.occupied_seats(minutes(20), minutes(21)) == T3
+
+
+def test_long_stay_found_from_later_window() -> None:
+    day = DayOccupancy(
+        {
+            "long": Stay(minutes(11), minutes(23), 2, T1),
+            "short": Stay(minutes(12), minutes(13), 2, T2),
+        }
+    )
+
+    assert day.occupied_seats(minutes(21), minutes(22)) == T1
+
+
+def test_remove_and_replace_stay() -> None:
+    day = DayOccupancy({"r1": Stay(minutes(18), minutes(20), 2, T1)})
+
+    day.add("r1", Stay(minutes(20), minutes(22), 2, T2))
+    assert len(day) == 1
+    assert day.occupied_seats(minutes(18), minutes(20)) == 0
+    assert day.occupied_seats(minutes(20), minutes(22)) == T2
+
+    assert day.remove("r1") == Stay(minutes(20), minutes(22), 2, T2)
+    assert day.remove("r1") is None
+    assert day.max_concurrent(0, minutes(23, 59)) == 0
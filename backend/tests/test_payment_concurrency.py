@@ -0,0 +1,62 @@
+import asyncio
+from datetime import date, timedelta
+from datetime import time as dt_time
+
+import pytest
+from sqlalchemy import select, update
+
+from app.models.reservation import PaymentStatus, Reservation
+from app.models.sales import DailySales
+from app.schemas.reservation import ReservationCreate
+from app.services.payment import payment_service
+from app.services.reservation import reservation_service
+
+pytestmark = pytest.mark.db
+
+AMOUNT = 5000
+
+
+async def test_duplicate_payment_confirmations_count_once(session_maker, make_restaurant):
+    """同じ Payment Intent の決済完了を同時に処理しても、入金額は1回分だけ集計される"""
+    customer_id, restaurant_id = await make_restaurant(tables=1, table_size=4)
+    slot_date = date.today() + timedelta(days=400)
+    async with session_maker() as session:
+        reservation = await reservation_service.create(
+            session,
+            obj_in=ReservationCreate(
+                restaurant_id=restaurant_id,
+                reservation_date=slot_date,
+                reservation_time=dt_time(19, 0),
+                party_size=2,
+                payment_method="online",
+                amount=AMOUNT,
+            ),
+            customer_id=customer_id,
+        )
+        payment_intent_id = f"pi_test_{reservation.id}"
+        await session.execute(
+            update(Reservation)
+            .where(Reservation.id == reservation.id)
+            .values(stripe_payment_intent_id=payment_intent_id)
+        )
+        await session.commit()
+
+    async def confirm() -> None:
+        async with session_maker() as session:
+            await payment_service.confirm_payment(session, payment_intent_id=payment_intent_id)
+
+    await asyncio.gather(confirm(), confirm())
+
+    async with session_maker() as session:
+        payment_status = await session.scalar(
+            select(Reservation.payment_status).where(Reservation.id == reservation.id)
+        )
+        paid_amount = await session.scalar(
+            select(DailySales.paid_amount).where(
+                DailySales.restaurant_id == restaurant_id,
+                DailySales.sales_date == slot_date,
+                DailySales.payment_method == "online",
+            )
+        )
+    assert payment_status == PaymentStatus.PAID.value
+    assert paid_amount == AMOUNT
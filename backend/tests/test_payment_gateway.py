@@ -0,0 +1,122 @@
+import httpx
+import pytest
+
+from app.services import payment_gateway as gateway_module
+from app.services.payment_gateway import PaymentGatewayError, StripeGateway
+
+INTENT = {
+    "id": "pi_test",
+    "client_secret": "pi_test_secret",
+    "status": "requires_payment_method",
+    "amount": 5000,
+}
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """リトライ間のバックオフ待ちを記録だけして即座に返す"""
+    delays: list[float] = []
+
+    async def fake_sleep(seconds: float) -> None:
+        delays.append(seconds)
+
+    monkeypatch.setattr(gateway_module.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+async def make_gateway(handler, max_retries: int = 2) -> StripeGateway:
+    gateway = StripeGateway(
+        secret_key="sk_test",
+        webhook_secret="whsec_test",
+        api_version="2025-12-15.clover",
+        timeout_seconds=1.0,
+        max_retries=max_retries,
+        max_connections=1,
+    )
+    # 本物と同じ設定のクライアントを作り、通信部分だけMockTransportに差し替える
+    client = gateway._get_client()
+    gateway._client = httpx.AsyncClient(
+        base_url=client.base_url,
+        auth=client.auth,
+        headers=client.headers,
+        transport=httpx.MockTransport(handler),
+    )
+    await client.aclose()
+    return gateway
+
+
+async def test_retries_with_same_idempotency_key(no_backoff: list[float]) -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) < 3:
+            return httpx.Response(503, json={"error": {"message": "unavailable"}})
+        return httpx.Response(200, json=INTENT)
+
+    gateway = await make_gateway(handler)
+    intent = await gateway.create_payment_intent(
+        amount=5000, currency="jpy", metadata={"reservation_id": "1"}, idempotency_key="key-1"
+    )
+    await gateway.aclose()
+
+    assert intent.id == "pi_test"
+    assert len(requests) == 3
+    assert len(no_backoff) == 2
+    assert {r.headers["Idempotency-Key"] for r in requests} == {"key-1"}
+    assert {r.content for r in requests} == {requests[0].content}
+    assert requests[0].url.path == "/v1/payment_intents"
+    assert requests[0].headers["Stripe-Version"] == "2025-12-15.clover"
+
+
+async def test_non_retryable_error_raises_stripe_code() -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            400, json={"error": {"message": "Invalid amount", "code": "amount_too_small"}}
+        )
+
+    gateway = await make_gateway(handler)
+    with pytest.raises(PaymentGatewayError) as exc_info:
+        await gateway.create_refund(payment_intent_id="pi_test", idempotency_key="key-2")
+    await gateway.aclose()
+
+    assert exc_info.value.code == "amount_too_small"
+    assert exc_info.value.message == "Invalid amount"
+    assert len(requests) == 1
+
+
+async def test_retryable_error_gives_up_after_max_retries() -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(429, json={"error": {"message": "Too many requests"}})
+
+    gateway = await make_gateway(handler, max_retries=1)
+    with pytest.raises(PaymentGatewayError) as exc_info:
+        await gateway.retrieve_payment_intent("pi_test")
+    await gateway.aclose()
+
+    assert exc_info.value.message == "Too many requests"
+    assert len(requests) == 2
+    assert "Idempotency-Key" not in requests[0].headers
+
+
+async def test_transport_error_retried_then_raised(no_backoff: list[float]) -> None:
+    attempts = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal attempts
+        attempts += 1
+        raise httpx.ConnectError("connection refused", request=request)
+
+    gateway = await make_gateway(handler)
+    with pytest.raises(PaymentGatewayError):
+        await gateway.retrieve_payment_intent("pi_test")
+    await gateway.aclose()
+
+    assert attempts == 3
+    assert len(no_backoff) == 2
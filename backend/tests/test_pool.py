@@ -0,0 +1,38 @@
+from app.db.pool import InstrumentedAsyncPool
+
+
+class FakeConnection:
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def test_exhausted_when_pool_and_overflow_in_use() -> None:
+    pool = InstrumentedAsyncPool(FakeConnection, pool_size=1, max_overflow=1)
+    assert pool._is_exhausted() is False
+
+    first = pool.connect()
+    assert pool._is_exhausted() is False
+    second = pool.connect()
+    assert pool._is_exhausted() is True
+
+    second.close()
+    assert pool._is_exhausted() is False
+    first.close()
+    assert pool.telemetry()["waits"] == 0
+
+
+def test_unlimited_overflow_never_waits() -> None:
+    # DB_MAX_OVERFLOW=-1: 上限なしで接続を作るため、取得を待ちとして数えない
+    pool = InstrumentedAsyncPool(FakeConnection, pool_size=1, max_overflow=-1)
+    connections = [pool.connect() for _ in range(3)]
+
+    assert pool._is_exhausted() is False
+    telemetry = pool.telemetry()
+    assert telemetry["checked_out"] == 3
+    assert telemetry["waits"] == 0
+    assert telemetry["max_overflow"] == -1
+    for connection in connections:
+        connection.close()
@@ -0,0 +1,231 @@
+"""予約の主要なクエリが想定したインデックスで実行されることを確認する
+
+合成データをトランザクション内に投入し、サービスのメソッドが実行したSQLを
+EXPLAIN して、想定したインデックスが使われていること・大きなテーブルを
+シーケンシャルスキャンしていないことを確認する。最後にロールバックするため、
+データは残らない。
+"""
+
+import json
+from collections.abc import AsyncIterator
+from datetime import UTC, date, datetime, time
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.db.session import engine
+from app.models.user import User  # noqa: F401
+from app.services.capacity_ledger import capacity_ledger
+from app.services.payment import payment_service
+from app.services.reservation import (
+    ALL_RESERVATION_ORDER,
+    CUSTOMER_RESERVATION_ORDER,
+    RESTAURANT_RESERVATION_ORDER,
+    reservation_service,
+)
+from app.services.restaurant import RESTAURANT_LIST_ORDER, restaurant_service
+from app.services.sales_rollup import sales_rollup_service
+
+# データの投入は時間がかかるため、モジュール内のテストで1回だけ行う
+pytestmark = [pytest.mark.db, pytest.mark.asyncio(loop_scope="module")]
+
+RESTAURANTS = 2000
+RESERVATIONS = 200000
+
+# シーケンシャルスキャンを許容しないテーブル
+LARGE_TABLES = {"daily_sales", "reservations", "restaurants", "seats"}
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, email, hashed_password, name, role, is_active)
+    SELECT 'qp-u-' || g, 'qp-' || g || '@plan.local', '!', 'qp', 'store', true
+    FROM generate_series(1, :restaurants) g
+    """,
+    """
+    INSERT INTO restaurants (id, owner_id, name, genre, area, address, phone, email,
+                             opening_hours, status)
+    SELECT 'qp-r-' || g, 'qp-u-' || g, 'qp ' || g, 'genre' || (g % 20), 'area' || (g % 50),
+           '-', '-', '-', '11:00-22:00', 'active'
+    FROM generate_series(1, :restaurants) g
+    """,
+    """
+    INSERT INTO seats (id, restaurant_id, name, capacity)
+    SELECT 'qp-s-' || r || '-' || s, 'qp-r-' || r, 'seat' || s, 2 + (s % 3) * 2
+    FROM generate_series(1, :restaurants) r, generate_series(1, 4) s
+    """,
+    """
+    INSERT INTO reservations (id, customer_id, restaurant_id, reservation_date, reservation_time,
+                              party_size, status, payment_method, payment_status, amount,
+                              stripe_payment_intent_id)
+    SELECT 'qp-v-' || g,
+           'qp-u-' || (1 + g % :restaurants),
+           'qp-r-' || (1 + (g * 7) % :restaurants),
+           DATE '2030-01-01' + (g % 365),
+           TIME '17:00' + ((g % 10) * INTERVAL '30 minutes'),
+           1 + g % 6,
+           CASE WHEN g % 10 = 0 THEN 'cancelled' ELSE 'confirmed' END,
+           CASE WHEN g % 2 = 0 THEN 'online' ELSE 'onsite' END,
+           'pending',
+           1000 * (1 + g % 10),
+           CASE WHEN g % 2 = 0 THEN 'pi_qp_' || g END
+    FROM generate_series(1, :reservations) g
+    """,
+]
+
+
+RESTAURANT_ID = "qp-r-42"
+# 深いページのカーソル（途中の行のキー）
+RESERVATION_KEY = SimpleNamespace(
+    reservation_date=date(2030, 6, 1), reservation_time=time(19, 0), id="qp-v-5"
+)
+RESTAURANT_KEY = SimpleNamespace(created_at=datetime(2000, 1, 1, tzinfo=UTC), id="qp-r-1000")
+
+CHECKS = [
+    pytest.param(
+        lambda db: restaurant_service.check_availability(
+            db,
+            restaurant_id=RESTAURANT_ID,
+            reservation_date=date(2030, 3, 1),
+            reservation_time=time(19, 0),
+            party_size=2,
+        ),
+        {"ix_reservations_active_slot", "restaurants_pkey", "ix_seats_restaurant_id"},
+        id="check_availability",
+    ),
+    pytest.param(
+        lambda db: reservation_service.get_by_customer(db, customer_id="qp-u-42"),
+        {"ix_reservations_customer_date"},
+        id="get_by_customer",
+    ),
+    pytest.param(
+        lambda db: reservation_service.get_by_customer(
+            db,
+            customer_id="qp-u-42",
+            cursor=CUSTOMER_RESERVATION_ORDER.encode(RESERVATION_KEY),
+        ),
+        {"ix_reservations_customer_date"},
+        id="get_by_customer-cursor",
+    ),
+    pytest.param(
+        lambda db: reservation_service.get_by_restaurant(db, restaurant_id=RESTAURANT_ID),
+        {"ix_reservations_restaurant_date"},
+        id="get_by_restaurant",
+    ),
+    pytest.param(
+        lambda db: reservation_service.get_by_restaurant(
+            db,
+            restaurant_id=RESTAURANT_ID,
+            cursor=RESTAURANT_RESERVATION_ORDER.encode(RESERVATION_KEY),
+        ),
+        {"ix_reservations_restaurant_date"},
+        id="get_by_restaurant-cursor",
+    ),
+    pytest.param(
+        lambda db: reservation_service.get_all(
+            db, cursor=ALL_RESERVATION_ORDER.encode(RESERVATION_KEY)
+        ),
+        {"ix_reservations_date_time_id"},
+        id="get_all-cursor",
+    ),
+    pytest.param(
+        lambda db: restaurant_service.get_list(
+            db, cursor=RESTAURANT_LIST_ORDER.encode(RESTAURANT_KEY)
+        ),
+        {"ix_restaurants_status_created_at"},
+        id="get_list-cursor",
+    ),
+    pytest.param(
+        lambda db: payment_service.confirm_payment(db, payment_intent_id="pi_qp_missing"),
+        {"ix_reservations_stripe_payment_intent_id"},
+        id="confirm_payment",
+    ),
+    pytest.param(
+        lambda db: restaurant_service.get_by_owner(db, owner_id="qp-u-42"),
+        {"ix_restaurants_owner_id", "ix_seats_restaurant_id"},
+        id="get_by_owner",
+    ),
+    pytest.param(
+        lambda db: restaurant_service.get_sales(
+            db,
+            restaurant_id=RESTAURANT_ID,
+            date_from=date(2030, 1, 1),
+            date_to=date(2030, 1, 31),
+        ),
+        {"daily_sales_pkey"},
+        id="get_sales",
+    ),
+]
+
+
+def collect_plan_nodes(plan: dict[str, Any]) -> list[dict[str, Any]]:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(collect_plan_nodes(child))
+    return nodes
+
+
+async def explain(conn: AsyncConnection, statement: str, parameters: Any) -> list[dict[str, Any]]:
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return collect_plan_nodes(plan[0]["Plan"])
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def seeded() -> AsyncIterator[tuple[AsyncConnection, AsyncSession]]:
+    """合成データを投入した接続と、その上のセッション（終了時にロールバックする）"""
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            for sql in SEED_SQL:
+                await conn.execute(
+                    text(sql), {"restaurants": RESTAURANTS, "reservations": RESERVATIONS}
+                )
+            await sales_rollup_service.rebuild(
+                AsyncSession(bind=conn, join_transaction_mode="create_savepoint")
+            )
+            for table in sorted(LARGE_TABLES):
+                await conn.execute(text(f"ANALYZE {table}"))
+
+            session = AsyncSession(
+                bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False
+            )
+            yield conn, session
+            await session.close()
+        finally:
+            await transaction.rollback()
+    await engine.dispose()
+
+
+@pytest.mark.parametrize(("call", "expected_indexes"), CHECKS)
+async def test_query_uses_indexes(seeded, call, expected_indexes: set[str]) -> None:
+    conn, session = seeded
+    captured: list[tuple[str, Any]] = []
+
+    def capture(_conn, _cursor, statement, parameters, _context, _executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        capacity_ledger.clear()
+        await call(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    used_indexes: set[str] = set()
+    seq_scans: set[str] = set()
+    for statement, parameters in captured:
+        for node in await explain(conn, statement, parameters):
+            if "Index Name" in node:
+                used_indexes.add(node["Index Name"])
+            if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES:
+                seq_scans.add(node["Relation Name"])
+
+    assert expected_indexes <= used_indexes, f"使われたインデックス: {sorted(used_indexes)}"
+    assert not seq_scans
@@ -0,0 +1,43 @@
+import pytest
+
+from app.core.query_stats import RequestQueries, statement_shape
+
+
+@pytest.mark.parametrize(
+    ("statement", "shape"),
+    [
+        (
+            "SELECT a FROM t WHERE id IN ($1::VARCHAR, $2::VARCHAR, $3::VARCHAR) AND x = $4",
+            "SELECT a FROM t WHERE id IN (?) AND x = ?",
+        ),
+        ("SELECT a FROM t WHERE id = $1::VARCHAR", "SELECT a FROM t WHERE id = ?"),
+        ("SELECT a FROM t WHERE id = ANY($1::VARCHAR[])", "SELECT a FROM t WHERE id = ANY(?)"),
+        ("SELECT a\n  FROM t\n WHERE x = $12", "SELECT a FROM t WHERE x = ?"),
+        ("SELECT 1", "SELECT 1"),
+    ],
+)
+def test_statement_shape(statement: str, shape: str) -> None:
+    assert statement_shape(statement) == shape
+
+
+def test_statement_shape_ignores_in_list_length() -> None:
+    one = "SELECT a FROM t WHERE id IN ($1::VARCHAR)"
+    many = "SELECT a FROM t WHERE id IN ($1::VARCHAR, $2::VARCHAR, $3::VARCHAR, $4::VARCHAR)"
+
+    assert statement_shape(one) == statement_shape(many)
+
+
+def test_request_queries_groups_statements_by_shape() -> None:
+    queries = RequestQueries()
+    queries.record("SELECT a FROM t WHERE id = $1::VARCHAR", 0.001)
+    queries.record("SELECT a FROM t WHERE id = $1::VARCHAR", 0.002)
+    queries.record("SELECT a FROM t WHERE id IN ($1::VARCHAR, $2::VARCHAR)", 0.001)
+    queries.record("SELECT b FROM u", 0.001)
+
+    assert queries.count == 4
+    assert queries.shapes() == {
+        "SELECT a FROM t WHERE id = ?": 2,
+        "SELECT a FROM t WHERE id IN (?)": 1,
+        "SELECT b FROM u": 1,
+    }
+    assert queries.server_timing() == 'db;dur=5.0;desc="4 queries"'
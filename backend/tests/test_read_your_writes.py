@@ -0,0 +1,68 @@
+import httpx
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.db.replica import READ_YOUR_WRITES_COOKIE, ReadYourWritesMiddleware, ReplicaRouter
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    router = ReplicaRouter(
+        replica_engine=None,
+        max_lag_seconds=1.0,
+        lag_check_interval_seconds=1.0,
+        read_your_writes_seconds=10,
+    )
+    app.add_middleware(ReadYourWritesMiddleware, router=router, excluded_prefix="/auth/")
+
+    @app.get("/items")
+    async def list_items():
+        return []
+
+    @app.post("/items")
+    async def create_item():
+        return {"id": 1}
+
+    @app.post("/items/invalid")
+    async def create_invalid_item():
+        raise HTTPException(status_code=400, detail="invalid")
+
+    @app.post("/auth/login")
+    async def login():
+        return {"access_token": "token"}
+
+    @app.post("/exports")
+    async def export():
+        async def rows():
+            yield b"a\n"
+            yield b"b\n"
+
+        return StreamingResponse(rows(), media_type="text/csv")
+
+    return app
+
+
+async def test_cookie_set_only_after_successful_writes() -> None:
+    transport = httpx.ASGITransport(app=make_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        written = await client.post("/items")
+        read = await client.get("/items")
+        failed = await client.post("/items/invalid")
+        login = await client.post("/auth/login")
+
+    cookie = written.headers["set-cookie"]
+    assert cookie.startswith(f"{READ_YOUR_WRITES_COOKIE}=")
+    assert "Max-Age=10" in cookie
+    assert "HttpOnly" in cookie
+    assert "set-cookie" not in read.headers
+    assert "set-cookie" not in failed.headers
+    assert "set-cookie" not in login.headers
+
+
+async def test_streaming_response_passes_through() -> None:
+    transport = httpx.ASGITransport(app=make_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/exports")
+
+    assert response.text == "a\nb\n"
+    assert READ_YOUR_WRITES_COOKIE in response.headers["set-cookie"]
@@ -0,0 +1,71 @@
+import asyncio
+from datetime import date, timedelta
+from datetime import time as dt_time
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.reservation import Reservation, ReservationStatus
+from app.schemas.reservation import ReservationCreate
+from app.services.reservation import ReservationError, reservation_service
+
+pytestmark = pytest.mark.db
+
+CAPACITY = 20
+PARTY_SIZE = 2
+REQUESTS_PER_SLOT = 60
+
+
+async def book(session_maker, obj_in: ReservationCreate, customer_id: str) -> bool:
+    async with session_maker() as session:
+        try:
+            await reservation_service.create(session, obj_in=obj_in, customer_id=customer_id)
+            return True
+        except ReservationError:
+            return False
+
+
+async def booked_party_size(
+    session_maker, restaurant_id: str, slot_date: date, slot_time: dt_time
+) -> int:
+    async with session_maker() as session:
+        result = await session.execute(
+            select(func.coalesce(func.sum(Reservation.party_size), 0)).where(
+                Reservation.restaurant_id == restaurant_id,
+                Reservation.reservation_date == slot_date,
+                Reservation.reservation_time == slot_time,
+                Reservation.status != ReservationStatus.CANCELLED.value,
+            )
+        )
+        return result.scalar() or 0
+
+
+async def test_concurrent_bookings_never_overbook(session_maker, make_restaurant):
+    """同じ枠への同時予約は席数を超えて受け付けない（別の日の枠は互いに影響しない）"""
+    user_id, restaurant_id = await make_restaurant(
+        tables=CAPACITY // PARTY_SIZE, table_size=PARTY_SIZE
+    )
+    first_date = date.today() + timedelta(days=365)
+    slot_time = dt_time(19, 0)
+    slots = [first_date, first_date + timedelta(days=1)]
+    requests = [
+        ReservationCreate(
+            restaurant_id=restaurant_id,
+            reservation_date=slot_date,
+            reservation_time=slot_time,
+            party_size=PARTY_SIZE,
+            payment_method="onsite",
+            amount=1000,
+        )
+        for slot_date in slots
+        for _ in range(REQUESTS_PER_SLOT)
+    ]
+
+    results = await asyncio.gather(*(book(session_maker, obj_in, user_id) for obj_in in requests))
+
+    for index, slot_date in enumerate(slots):
+        accepted = sum(results[index * REQUESTS_PER_SLOT : (index + 1) * REQUESTS_PER_SLOT])
+        booked = await booked_party_size(session_maker, restaurant_id, slot_date, slot_time)
+        assert booked <= CAPACITY
+        assert accepted == CAPACITY // PARTY_SIZE
+        assert booked == accepted * PARTY_SIZE
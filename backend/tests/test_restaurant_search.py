@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import restaurant_search as search_module
+from app.services.restaurant_search import RestaurantSearch, SearchIndex
+
+
+class FakeResult:
+    def __init__(self, row: tuple | None) -> None:
+        self.row = row
+
+    def first(self) -> tuple | None:
+        return self.row
+
+
+class FakeSession:
+    """pg_indexes への問い合わせだけに答えるセッション"""
+
+    def __init__(self) -> None:
+        self.has_index = False
+        self.queries = 0
+
+    async def execute(self, statement, parameters=None) -> FakeResult:
+        self.queries += 1
+        return FakeResult((1,) if self.has_index else None)
+
+
+async def test_trigram_index_rechecked_after_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(search_module.time_module, "monotonic", lambda: now[0])
+    search = RestaurantSearch(ttl_seconds=60)
+    db = FakeSession()
+
+    assert await search._has_trigram_index(db) is False
+    db.has_index = True
+    now[0] += 59
+    assert await search._has_trigram_index(db) is False
+    assert db.queries == 1
+
+    # 有効期間が過ぎたら、マイグレーションで作成されたインデックスを使い始める
+    now[0] += 1
+    assert await search._has_trigram_index(db) is True
+    assert db.queries == 2
+
+
+RESTAURANTS = [
+    # (name, genre, area, description, status)
+    ("Sakura Sushi", "sushi", "shibuya", "omakase counter", "active"),
+    ("Tempura Kondo", "japanese", "ginza", "classic tempura", "active"),
+    ("Trattoria Roma", "italian", "ginza", "pizza and pasta", "active"),
+    ("Pizza Napoli", "italian", "shibuya", "wood fired", "active"),
+    ("Sushi Zanmai", "sushi", "tsukiji", "", "active"),
+    ("Sushi Closed", "sushi", "shibuya", "", "inactive"),
+]
+
+
+def make_index() -> SearchIndex:
+    rows = [
+        SimpleNamespace(
+            id=name,
+            name=name,
+            search_document=f"{name} {genre} {area} {description}",
+            status=status,
+            genre=genre,
+            area=area,
+        )
+        for name, genre, area, description, status in RESTAURANTS
+    ]
+    return SearchIndex.build(rows, loaded_at=0.0)
+
+
+def test_search_index_matches_typo() -> None:
+    assert make_index().search(["tempra"], status="active") == ["Tempura Kondo"]
+
+
+def test_search_index_matches_substring() -> None:
+    # トライグラムの類似度はしきい値未満でも、語の内側の部分一致で見つかる
+    assert make_index().search(["apol"], status="active") == ["Pizza Napoli"]
+
+
+def test_search_index_matches_two_character_term() -> None:
+    index = make_index()
+    assert index.search(["ra"], status="active") == [
+        "Sakura Sushi",
+        "Tempura Kondo",
+        "Trattoria Roma",
+    ]
+    # 関連度が同じ場合は登録順
+    assert index.search(["zz"], status="active") == ["Trattoria Roma", "Pizza Napoli"]
+
+
+def test_search_index_requires_every_term() -> None:
+    index = make_index()
+    assert index.search(["sushi", "shibuya"], status="active") == ["Sakura Sushi"]
+    assert index.search(["sushi", "ginza"], status="active") == []
+    assert index.search(["sushi"], status="inactive") == ["Sushi Closed"]
+
+
+def test_search_index_ranks_name_matches_first() -> None:
+    # 店名に一致する店舗は加点され、登録順が後でも説明だけに一致する店舗より上に並ぶ
+    index = make_index()
+    assert index.search(["pizza"], status="active") == ["Pizza Napoli", "Trattoria Roma"]
+    assert index.search(["sushi"], status="active") == ["Sakura Sushi", "Sushi Zanmai"]
+    assert index.search(["sushi"], status="active", area="tsukiji") == ["Sushi Zanmai"]
+    assert index.search(["sushi"], status="active", skip=1, limit=1) == ["Sushi Zanmai"]
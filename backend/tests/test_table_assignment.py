@@ -0,0 +1,87 @@
+from app.services.table_assignment import (
+    MAX_COMBINED_TABLES,
+    SeatSpec,
+    TableLayout,
+    assign_tables,
+)
+
+
+def make_layout(*seats: SeatSpec) -> TableLayout:
+    return TableLayout.from_seats(seats)
+
+
+def test_exact_fit_uses_matching_table() -> None:
+    layout = make_layout(SeatSpec("t6", 6), SeatSpec("t2", 2), SeatSpec("t4", 4))
+
+    assert layout.seat_ids(layout.find_tables(0, 4)) == ["t4"]
+    assert layout.seat_ids(layout.find_tables(0, 2)) == ["t2"]
+
+
+def test_best_fit_picks_smallest_free_table() -> None:
+    layout = make_layout(SeatSpec("t2", 2), SeatSpec("t4", 4), SeatSpec("t6", 6))
+
+    assert layout.seat_ids(layout.find_tables(0, 3)) == ["t4"]
+    occupied = layout.mask(["t4"])
+    assert layout.seat_ids(layout.find_tables(occupied, 3)) == ["t6"]
+
+
+def test_no_table_for_party() -> None:
+    layout = make_layout(SeatSpec("t2", 2), SeatSpec("t4", 4))
+
+    assert layout.find_tables(0, 5) is None
+    assert layout.find_tables(0, 0) is None
+    assert layout.find_tables(layout.mask(["t2", "t4"]), 1) is None
+
+
+def test_combines_tables_in_same_group() -> None:
+    layout = make_layout(
+        SeatSpec("a2", 2, "window"),
+        SeatSpec("b2", 2, "window"),
+        SeatSpec("c4", 4, "window"),
+    )
+
+    # 合計キャパシティが最小の組み合わせ（2+4）を選ぶ
+    assert sorted(layout.seat_ids(layout.find_tables(0, 6))) == ["a2", "c4"]
+    assert sorted(layout.seat_ids(layout.find_tables(0, 8))) == ["a2", "b2", "c4"]
+    # 使用中のテーブルは組み合わせに含めない
+    occupied = layout.mask(["a2"])
+    assert sorted(layout.seat_ids(layout.find_tables(occupied, 6))) == ["b2", "c4"]
+
+
+def test_single_table_preferred_over_combination() -> None:
+    layout = make_layout(
+        SeatSpec("a2", 2, "window"), SeatSpec("b2", 2, "window"), SeatSpec("t4", 4)
+    )
+
+    assert layout.seat_ids(layout.find_tables(0, 4)) == ["t4"]
+
+
+def test_does_not_combine_across_groups() -> None:
+    layout = make_layout(
+        SeatSpec("a2", 2, "window"),
+        SeatSpec("b2", 2, "window"),
+        SeatSpec("c2", 2, "terrace"),
+        SeatSpec("d2", 2),
+    )
+
+    assert layout.find_tables(0, 5) is None
+    assert layout.max_party_size == 4
+
+
+def test_combined_table_limit() -> None:
+    seats = [SeatSpec(f"t{i}", 2, "hall") for i in range(MAX_COMBINED_TABLES + 1)]
+    layout = make_layout(*seats)
+    limit = 2 * MAX_COMBINED_TABLES
+
+    assert bin(layout.find_tables(0, limit)).count("1") == MAX_COMBINED_TABLES
+    # キャパシティの合計は足りても、上限を超えるテーブル数は組み合わせない
+    assert layout.find_tables(0, limit + 1) is None
+    assert layout.max_party_size == limit
+
+
+def test_assign_tables_checks_reserved_party_size() -> None:
+    layout = make_layout(SeatSpec("t2", 2), SeatSpec("t4", 4))
+
+    assert assign_tables(layout, occupied=0, reserved=0, party_size=4) == layout.mask(["t4"])
+    # 席の割り当てが無い予約の人数で総キャパシティを超える場合は割り当てない
+    assert assign_tables(layout, occupied=0, reserved=3, party_size=4) is None
@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+from app.services.user_cache import UserCache
+
+USER_ID = "user-1"
+
+
+class FakeResult:
+    def __init__(self, row: SimpleNamespace) -> None:
+        self.row = row
+
+    def one_or_none(self) -> SimpleNamespace:
+        return self.row
+
+
+class FakeSession:
+    """users の行を返すセッション。SELECT の実行中に on_execute を呼ぶ"""
+
+    def __init__(self, on_execute=None) -> None:
+        self.role = "customer"
+        self.queries = 0
+        self.on_execute = on_execute
+
+    async def execute(self, statement) -> FakeResult:
+        self.queries += 1
+        row = SimpleNamespace(id=USER_ID, email="a@example.com", role=self.role, is_active=True)
+        if self.on_execute is not None:
+            self.on_execute()
+        return FakeResult(row)
+
+
+async def test_get_caches_loaded_user() -> None:
+    cache = UserCache(maxsize=10, ttl_seconds=60)
+    db = FakeSession()
+
+    assert (await cache.get(db, user_id=USER_ID)).role == "customer"
+    assert (await cache.get(db, user_id=USER_ID)).role == "customer"
+    assert db.queries == 1
+
+
+async def test_invalidation_during_load_is_not_overwritten() -> None:
+    cache = UserCache(maxsize=10, ttl_seconds=60)
+    # 行を読んだ後、キャッシュに入れる前に別のリクエストの変更がコミットされて破棄される
+    db = FakeSession(on_execute=lambda: cache.invalidate(USER_ID))
+
+    assert (await cache.get(db, user_id=USER_ID)).role == "customer"
+    db.on_execute = None
+    db.role = "admin"
+    assert (await cache.get(db, user_id=USER_ID)).role == "admin"
+    assert db.queries == 2
+
+
+async def test_clear_during_load_is_not_overwritten() -> None:
+    cache = UserCache(maxsize=10, ttl_seconds=60)
+    db = FakeSession(on_execute=cache.clear)
+
+    await cache.get(db, user_id=USER_ID)
+    assert len(cache._cache) == 0
+
+
+async def test_invalidation_of_other_user_keeps_load() -> None:
+    cache = UserCache(maxsize=10, ttl_seconds=60)
+    db = FakeSession(on_execute=lambda: cache.invalidate("user-2"))
+
+    await cache.get(db, user_id=USER_ID)
+    db.on_execute = None
+    await cache.get(db, user_id=USER_ID)
+    assert db.queries == 1
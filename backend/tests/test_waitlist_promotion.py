@@ -0,0 +1,92 @@
+import asyncio
+from datetime import date, timedelta
+from datetime import time as dt_time
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.sales import DailySales
+from app.models.waitlist import WaitlistEntry, WaitlistStatus
+from app.schemas.reservation import ReservationCreate, ReservationUpdate
+from app.schemas.waitlist import WaitlistCreate
+from app.services.reservation import ReservationError, reservation_service
+from app.services.waitlist import waitlist_service
+
+pytestmark = pytest.mark.db
+
+SLOT_TIME = dt_time(19, 0)
+
+
+async def test_duplicate_cancel_promotes_one_waitlist_entry(session_maker, make_restaurant):
+    """同じ予約への同時のキャンセルは1回だけ反映され、キャンセル待ちも1件だけ繰り上がる"""
+    owner_id, restaurant_id = await make_restaurant(tables=1, table_size=2)
+    # キャンセル待ちに登録する別のユーザー（同じ枠には1人1件まで）
+    waiting_ids = [(await make_restaurant(tables=0, table_size=2))[0] for _ in range(2)]
+    slot_date = date.today() + timedelta(days=400)
+    booking = {
+        "restaurant_id": restaurant_id,
+        "reservation_date": slot_date,
+        "reservation_time": SLOT_TIME,
+        "party_size": 2,
+        "payment_method": "onsite",
+        "amount": 1000,
+    }
+
+    async with session_maker() as session:
+        reservation = await reservation_service.create(
+            session, obj_in=ReservationCreate(**booking), customer_id=owner_id
+        )
+    for customer_id in waiting_ids:
+        async with session_maker() as session:
+            await waitlist_service.join(
+                session, obj_in=WaitlistCreate(**booking), customer_id=customer_id
+            )
+
+    # 両方のリクエストが、ロックを取らずに確定済みの予約を読んだ状態から同時にキャンセルする
+    sessions = [session_maker() for _ in range(2)]
+    loaded = [await reservation_service.get(session, id=reservation.id) for session in sessions]
+
+    async def cancel(session, db_obj) -> bool:
+        try:
+            await reservation_service.update(
+                session,
+                db_obj=db_obj,
+                obj_in=ReservationUpdate(status=ReservationStatus.CANCELLED.value),
+                expected_status=ReservationStatus.CONFIRMED.value,
+            )
+            return True
+        except ReservationError:
+            return False
+
+    try:
+        results = await asyncio.gather(
+            *(cancel(session, obj) for session, obj in zip(sessions, loaded, strict=True))
+        )
+    finally:
+        for session in sessions:
+            await session.close()
+
+    assert sorted(results) == [False, True]
+    async with session_maker() as session:
+        promoted = await session.scalar(
+            select(func.count()).where(
+                WaitlistEntry.restaurant_id == restaurant_id,
+                WaitlistEntry.status == WaitlistStatus.PROMOTED.value,
+            )
+        )
+        active = await session.scalar(
+            select(func.count()).where(
+                Reservation.restaurant_id == restaurant_id,
+                Reservation.status != ReservationStatus.CANCELLED.value,
+            )
+        )
+        counted = await session.scalar(
+            select(func.coalesce(func.sum(DailySales.reservation_count), 0)).where(
+                DailySales.restaurant_id == restaurant_id,
+                DailySales.sales_date == slot_date,
+            )
+        )
+    assert promoted == 1
+    assert active == 1
+    assert counted == 1